@@ -0,0 +1,64 @@
+from logging.config import fileConfig
+import os
+import sys
+
+from sqlalchemy import create_engine, pool
+
+from alembic import context
+
+# database.py and models.py live in server/models and are imported flat
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from database import DATABASE_URL
+from models import Base
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def _database_url() -> str:
+    # upgrade_to_head(url) or `alembic -x url=...` can target a scratch or load-test database
+    if config.attributes.get("database_url"):
+        return config.attributes["database_url"]
+    return context.get_x_argument(as_dictionary=True).get("url", DATABASE_URL)
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running it (alembic upgrade --sql)"""
+    url = _database_url()
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Run migrations against the configured database"""
+    url = _database_url()
+    connectable = create_engine(url, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can't ALTER most things in place; batch mode recreates tables
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,183 @@
+"""Initial schema (tables as previously created by Base.metadata.create_all)
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 12:58:11.870300
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('firebase_uid', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('first_name', sa.String(), nullable=False),
+    sa.Column('last_name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_firebase_uid', 'users', ['firebase_uid'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table('audit_logs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('resource_type', sa.String(), nullable=False),
+    sa.Column('resource_id', sa.Integer(), nullable=False),
+    sa.Column('old_values', sa.JSON(), nullable=True),
+    sa.Column('new_values', sa.JSON(), nullable=True),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+
+    op.create_table('properties',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('address', sa.String(), nullable=False),
+    sa.Column('city', sa.String(), nullable=False),
+    sa.Column('state', sa.String(), nullable=False),
+    sa.Column('zip_code', sa.String(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=True),
+    sa.Column('longitude', sa.Float(), nullable=True),
+    sa.Column('property_type', sa.String(), nullable=False),
+    sa.Column('year_built', sa.Integer(), nullable=True),
+    sa.Column('square_feet', sa.Integer(), nullable=True),
+    sa.Column('bedrooms', sa.Integer(), nullable=True),
+    sa.Column('bathrooms', sa.Float(), nullable=True),
+    sa.Column('lot_size', sa.Float(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('verification_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_properties_id', 'properties', ['id'], unique=False)
+
+    op.create_table('community_updates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=True),
+    sa.Column('neighborhood_id', sa.String(), nullable=True),
+    sa.Column('update_type', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('impact_level', sa.String(), nullable=False),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('location', sa.JSON(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_community_updates_id', 'community_updates', ['id'], unique=False)
+
+    op.create_table('contractor_assignments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('contractor_id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('assignment_type', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('assigned_date', sa.DateTime(), nullable=True),
+    sa.Column('completed_date', sa.DateTime(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['contractor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_contractor_assignments_id', 'contractor_assignments', ['id'], unique=False)
+
+    op.create_table('renovations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('contractor_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('renovation_type', sa.String(), nullable=False),
+    sa.Column('start_date', sa.DateTime(), nullable=True),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('cost', sa.Float(), nullable=True),
+    sa.Column('materials', sa.JSON(), nullable=True),
+    sa.Column('blueprints', sa.JSON(), nullable=True),
+    sa.Column('photos', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['contractor_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_renovations_id', 'renovations', ['id'], unique=False)
+
+    op.create_table('reports',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('submitter_id', sa.Integer(), nullable=False),
+    sa.Column('report_type', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('report_data', sa.JSON(), nullable=True),
+    sa.Column('attachments', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('reviewed_by', sa.Integer(), nullable=True),
+    sa.Column('reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.ForeignKeyConstraint(['reviewed_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['submitter_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reports_id', 'reports', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_id', table_name='reports')
+    op.drop_table('reports')
+
+    op.drop_index('ix_renovations_id', table_name='renovations')
+    op.drop_table('renovations')
+
+    op.drop_index('ix_contractor_assignments_id', table_name='contractor_assignments')
+    op.drop_table('contractor_assignments')
+
+    op.drop_index('ix_community_updates_id', table_name='community_updates')
+    op.drop_table('community_updates')
+
+    op.drop_index('ix_properties_id', table_name='properties')
+    op.drop_table('properties')
+
+    op.drop_index('ix_audit_logs_id', table_name='audit_logs')
+    op.drop_table('audit_logs')
+
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_users_firebase_uid', table_name='users')
+    op.drop_index('ix_users_email', table_name='users')
+
+    op.drop_table('users')
@@ -0,0 +1,70 @@
+"""Indexes for the filters used by the routers
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 13:10:00.000000
+
+Index plan (column order follows the equality filters first, then sort keys):
+
+    properties              (city, property_type)          GET /api/properties?city=&property_type=
+                            (owner_id)                     claim / owner lookups
+    reports                 (property_id, status)          GET /api/reports?property_id=&status=
+                            (status, created_at)           admin pending-reports queue, oldest first
+                            (submitter_id)                 permission checks on update
+    renovations             (property_id)                  property history tab
+                            (contractor_id, status)        GET /api/contractor/projects?status=
+    contractor_assignments  (contractor_id, status)        GET /api/contractor/assignments?status=
+                            (property_id)                  property history tab
+    community_updates       (neighborhood_id, update_type) GET /api/community?neighborhood_id=&update_type=
+                            (is_verified, created_at)      admin pending-updates queue
+                            (property_id)                  property page
+    audit_logs              (resource_type, resource_id)   change history of one resource
+                            (user_id)                      activity of one user
+
+On PostgreSQL the indexes are built CONCURRENTLY so large tables stay writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_properties_city_property_type', 'properties', ['city', 'property_type']),
+    ('ix_properties_owner_id', 'properties', ['owner_id']),
+    ('ix_reports_property_id_status', 'reports', ['property_id', 'status']),
+    ('ix_reports_status_created_at', 'reports', ['status', 'created_at']),
+    ('ix_reports_submitter_id', 'reports', ['submitter_id']),
+    ('ix_renovations_property_id', 'renovations', ['property_id']),
+    ('ix_renovations_contractor_id_status', 'renovations', ['contractor_id', 'status']),
+    ('ix_contractor_assignments_contractor_id_status', 'contractor_assignments', ['contractor_id', 'status']),
+    ('ix_contractor_assignments_property_id', 'contractor_assignments', ['property_id']),
+    ('ix_community_updates_neighborhood_id_update_type', 'community_updates', ['neighborhood_id', 'update_type']),
+    ('ix_community_updates_is_verified_created_at', 'community_updates', ['is_verified', 'created_at']),
+    ('ix_community_updates_property_id', 'community_updates', ['property_id']),
+    ('ix_audit_logs_resource_type_resource_id', 'audit_logs', ['resource_type', 'resource_id']),
+    ('ix_audit_logs_user_id', 'audit_logs', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,56 @@
+"""Durable queue for neighborhood notification fan-out
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 13:40:00.000000
+
+Workers claim jobs by (status, next_attempt_at), so that is the only
+secondary index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('neighborhood_id', sa.String(), nullable=False),
+    sa.Column('notification_type', sa.String(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('audience', sa.JSON(), nullable=True),
+    sa.Column('channels', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('total_recipients', sa.Integer(), nullable=True),
+    sa.Column('delivered', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('cursor', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_jobs_id', 'notification_jobs', ['id'], unique=False)
+    op.create_index('ix_notification_jobs_status_next_attempt_at', 'notification_jobs',
+                    ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_jobs_status_next_attempt_at', table_name='notification_jobs')
+    op.drop_index('ix_notification_jobs_id', table_name='notification_jobs')
+    op.drop_table('notification_jobs')
@@ -0,0 +1,32 @@
+"""Neighborhood of each property
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 14:30:00.000000
+
+Filled in on create/update from the boundary polygons; existing rows are
+backfilled with `python -m jobs.assign_neighborhoods`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('neighborhood_id', sa.String(), nullable=True))
+    op.create_index('ix_properties_neighborhood_id', 'properties', ['neighborhood_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_neighborhood_id', table_name='properties')
+    # SQLite can't drop columns in place; batch mode rebuilds the table there
+    with op.batch_alter_table('properties') as batch_op:
+        batch_op.drop_column('neighborhood_id')
@@ -0,0 +1,37 @@
+"""Near-duplicate community updates
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 16:00:00.000000
+
+duplicate_of points a near-duplicate submission at the first report of the
+same event, so the admin queue can show each group once.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Batch mode so SQLite gets the foreign key too (it rebuilds the table there)
+    with op.batch_alter_table('community_updates') as batch_op:
+        batch_op.add_column(sa.Column('duplicate_of', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_community_updates_duplicate_of', 'community_updates', ['duplicate_of'], ['id']
+        )
+        batch_op.create_index('ix_community_updates_duplicate_of', ['duplicate_of'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('community_updates') as batch_op:
+        batch_op.drop_index('ix_community_updates_duplicate_of')
+        batch_op.drop_constraint('fk_community_updates_duplicate_of', type_='foreignkey')
+        batch_op.drop_column('duplicate_of')
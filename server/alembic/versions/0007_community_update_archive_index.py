@@ -0,0 +1,36 @@
+"""Index for the community update archiver
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 17:30:00.000000
+
+`python -m jobs.archive_updates` looks for verified updates whose
+end_date has passed; this keeps that scan off the rest of the table.
+Built CONCURRENTLY on PostgreSQL, where the table is at its largest.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index('ix_community_updates_is_verified_end_date', 'community_updates',
+                            ['is_verified', 'end_date'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index('ix_community_updates_is_verified_end_date', 'community_updates',
+                        ['is_verified', 'end_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_community_updates_is_verified_end_date', table_name='community_updates')
@@ -0,0 +1,32 @@
+"""Precision of geocoded property coordinates
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 18:30:00.000000
+
+'address' or 'zip' (a zip centroid) when the coordinates came from the
+geocoder, NULL when the client supplied them. `python -m
+jobs.geocode_properties` revisits 'zip' rows, so a centroid stored after
+a provider outage is replaced once the address resolves.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('geocode_precision', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    # SQLite can't drop columns in place; batch mode rebuilds the table there
+    with op.batch_alter_table('properties') as batch_op:
+        batch_op.drop_column('geocode_precision')
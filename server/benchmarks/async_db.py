@@ -0,0 +1,125 @@
+"""Concurrent-request throughput: sync Session vs AsyncSession in async handlers.
+
+Runs the same query through two tiny FastAPI apps, one that uses a blocking
+``Session`` inside an ``async def`` handler (the old ``get_db``) and one that
+awaits an ``AsyncSession`` (the current ``get_db``), and prints requests/sec.
+
+    cd server
+    python -m benchmarks.async_db --requests 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models"))
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import to_async_url
+
+def _sleep_ms(ms):
+    time.sleep(ms / 1000.0)
+    return ms
+
+def _register_sleep(dbapi_connection, connection_record):
+    # SQLite has no sleep(); emulate the network round trip of a remote database
+    dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+def build_apps(database_url: str, latency_ms: int, pool_size: int):
+    # Size both pools for the full concurrency so only the driver differs
+    sync_engine = create_engine(
+        database_url,
+        pool_size=pool_size,
+        connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    )
+    # aiosqlite defaults to NullPool (a fresh connection per checkout)
+    async_engine = create_async_engine(
+        to_async_url(database_url),
+        **({} if database_url.startswith("sqlite") else {"pool_size": pool_size})
+    )
+    if database_url.startswith("sqlite"):
+        query = text("SELECT sleep_ms(:ms)")
+        event.listen(sync_engine, "connect", _register_sleep)
+        event.listen(async_engine.sync_engine, "connect", _register_sleep)
+    else:
+        query = text("SELECT pg_sleep(:ms / 1000.0)")
+    params = {"ms": latency_ms}
+
+    SyncSession = sessionmaker(bind=sync_engine)
+    AsyncSessionFactory = async_sessionmaker(bind=async_engine)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with AsyncSessionFactory() as db:
+            yield db
+
+    sync_app = FastAPI()
+    async_app = FastAPI()
+
+    @sync_app.get("/q")
+    async def sync_query(db: Session = Depends(get_sync_db)):
+        return {"result": db.execute(query, params).scalar()}
+
+    @async_app.get("/q")
+    async def async_query(db: AsyncSession = Depends(get_async_db)):
+        return {"result": (await db.execute(query, params)).scalar()}
+
+    return sync_app, async_app, sync_engine, async_engine
+
+async def drive(app, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                response = await client.get("/q")
+                response.raise_for_status()
+
+        await one()  # warm up the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=20, help="simulated time spent in the database per query")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+
+    sync_app, async_app, sync_engine, async_engine = build_apps(database_url, args.latency_ms, args.concurrency + 1)
+    try:
+        results = {}
+        for name, app in (("sync Session", sync_app), ("AsyncSession", async_app)):
+            elapsed = await drive(app, args.requests, args.concurrency)
+            results[name] = args.requests / elapsed
+            print(f"{name:>13}: {args.requests} requests in {elapsed:.2f}s -> {results[name]:.1f} req/s")
+        print(f"speedup: {results['AsyncSession'] / results['sync Session']:.2f}x")
+    finally:
+        sync_engine.dispose()
+        await async_engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+if __name__ == "__main__":
+    asyncio.run(main())
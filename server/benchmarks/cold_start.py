@@ -0,0 +1,76 @@
+"""Cold start: process spawn to first successful response.
+
+Starts the API under uvicorn in a fresh interpreter several times and
+measures how long each takes to answer its first request (GET /health by
+default), which is what autoscaling and rolling deploys wait on. Exits 1
+when the median misses --target-ms.
+
+    cd server
+    python -m benchmarks.cold_start --runs 5 --target-ms 2500
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def cold_start(path: str, token: str, timeout: float) -> float:
+    """Seconds from spawning uvicorn to the first 2xx on path"""
+    port = free_port()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SERVER_DIR, os.path.join(SERVER_DIR, "models"), env.get("PYTHONPATH")]))
+    headers = {"Authorization": f"Bearer {token}"}
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - start < timeout:
+                if process.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with code {process.returncode}")
+                try:
+                    if client.get(path, headers=headers).is_success:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    time.sleep(0.005)
+        raise SystemExit(f"no successful response within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API cold start to first response")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--token", default="mock_jwt_token_1")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--target-ms", type=float, default=2500.0, help="fail when the median is slower")
+    args = parser.parse_args()
+
+    samples = []
+    for run in range(1, args.runs + 1):
+        samples.append(cold_start(args.path, args.token, args.timeout) * 1000)
+        print(f"run {run}: {samples[-1]:.0f} ms")
+
+    median = statistics.median(samples)
+    print(f"\nGET {args.path}: median {median:.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms "
+          f"(target {args.target_ms:.0f} ms)")
+    if median > args.target_ms:
+        print("Cold start target missed", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
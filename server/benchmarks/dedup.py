@@ -0,0 +1,104 @@
+"""Near-duplicate lookup latency for community update submissions.
+
+Fills ``utils.dedup.DuplicateIndex`` with N synthetic updates spread over
+the continental US inside one dedup window, written from a small
+vocabulary so that unrelated updates share plenty of phrasing (as real
+"road closed on ..." reports do). Then submits reworded copies of indexed
+updates, which should be found, and fresh updates, which should not, and
+prints per-lookup latency and recall.
+
+    cd server
+    python -m benchmarks.dedup --updates 200000 --queries 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from utils.dedup import DEDUP_WINDOW_HOURS, DuplicateIndex
+
+STREETS = ["Main", "Oak", "Pine", "Market", "Mission", "Folsom", "Elm", "Maple", "Cedar", "Lake", "Hill", "Park"]
+SUFFIXES = ["St", "Ave", "Blvd", "Rd"]
+EVENTS = [
+    ("Road closed on {street}", "{street} closed between {a}th and {b}th for {reason}"),
+    ("Construction on {street}", "Crews working on {street} near {a}th, expect {reason} delays"),
+    ("Power outage near {street}", "No power on {street} from {a}th to {b}th after {reason}"),
+    ("Water main break on {street}", "{street} flooded near {a}th, {reason} until further notice"),
+]
+REASONS = ["utility work", "a water main break", "repaving", "a gas leak", "tree removal", "an accident"]
+
+def random_update(rng: random.Random, start: datetime) -> dict:
+    street = f"{rng.choice(STREETS)} {rng.choice(SUFFIXES)}"
+    a = rng.randint(1, 30)
+    title, description = rng.choice(EVENTS)
+    fill = dict(street=street, a=a, b=a + 1, reason=rng.choice(REASONS))
+    return {
+        "title": title.format(**fill),
+        "description": description.format(**fill),
+        "location": {"type": "Point", "coordinates": [rng.uniform(-122, -72), rng.uniform(30, 47)]},
+        "neighborhood_id": None,
+        "created_at": start + timedelta(seconds=rng.uniform(0, DEDUP_WINDOW_HOURS * 3600 / 2)),
+    }
+
+def reword(rng: random.Random, update: dict) -> dict:
+    """The same report from another user: different casing and punctuation, a few words dropped, posted nearby"""
+    words = update["description"].split()
+    kept = [w for w in words if rng.random() > 0.15] or words
+    lon, lat = update["location"]["coordinates"]
+    return {
+        **update,
+        "title": update["title"].upper() + "!!",
+        "description": " ".join(kept) + ".",
+        "location": {"type": "Point", "coordinates": [lon + rng.uniform(-0.001, 0.001), lat + rng.uniform(-0.001, 0.001)]},
+        "created_at": update["created_at"] + timedelta(minutes=rng.uniform(1, 120)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection")
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    start_time = datetime(2024, 1, 1)
+    updates = [random_update(rng, start_time) for _ in range(args.updates)]
+
+    start = time.perf_counter()
+    index = DuplicateIndex()
+    for key, update in enumerate(updates):
+        index.upsert(key, update)
+    build = time.perf_counter() - start
+
+    originals = rng.sample(range(args.updates), args.queries // 2)
+    copies = [(key, reword(rng, updates[key])) for key in originals]
+    fresh = [random_update(rng, start_time) for _ in range(args.queries - len(copies))]
+
+    timings = []
+    found = 0
+    for key, update in copies:
+        began = time.perf_counter()
+        match = index.find(update)
+        timings.append(time.perf_counter() - began)
+        found += match is not None and match[0] == key
+    false_matches = 0
+    for update in fresh:
+        began = time.perf_counter()
+        false_matches += index.find(update) is not None
+        timings.append(time.perf_counter() - began)
+
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[int(len(timings) * 0.99)] * 1000
+    print(f"{args.updates:,} updates indexed in {build:.1f}s ({build / args.updates * 1e6:.0f} us each)")
+    print(f"lookup p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    print(f"reworded copies found: {found}/{len(copies)}; fresh updates matched: {false_matches}/{len(fresh)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Impact aggregate oracle check: ImpactIndex vs recomputing from scratch.
+
+Runs --operations random steps against ``utils.impact.ImpactIndex`` while
+a clock moves forward in random jumps: upserts of new and existing keys
+(open-ended, reversed and already-ended intervals included, some without
+a neighborhood), removes, and summary reads. Every read is compared with
+a brute-force summary over all current updates: active count and types,
+impact score, and the next upcoming event. Exits 1 on the first
+disagreement, then prints read latency against the recompute.
+
+    cd server
+    python -m benchmarks.impact --operations 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from utils.impact import ImpactIndex, update_weight
+from utils.interval_index import MAX_TIME, MIN_TIME, as_naive_utc
+
+NEIGHBORHOODS = ["mission", "soma", "nob-hill", "sunset", "richmond"]
+UPDATE_TYPES = ["construction", "road_closure", "utility", "event"]
+IMPACT_LEVELS = ["low", "medium", "high", "unknown"]
+
+def random_update(rng: random.Random, key: int, now: datetime) -> dict:
+    start = now + timedelta(hours=rng.randint(-24 * 14, 24 * 14))
+    end = start + timedelta(hours=rng.randint(0, 24 * 30))
+    roll = rng.random()
+    if roll < 0.05:
+        start = None
+    elif roll < 0.10:
+        end = None
+    elif roll < 0.15:
+        start, end = end, start
+    return {
+        "id": key,
+        "neighborhood_id": None if rng.random() < 0.05 else rng.choice(NEIGHBORHOODS),
+        "update_type": rng.choice(UPDATE_TYPES),
+        "impact_level": rng.choice(IMPACT_LEVELS),
+        "is_verified": rng.random() < 0.7,
+        "title": f"Update {key}",
+        "start_date": start,
+        "end_date": end,
+    }
+
+def brute_summary(updates: dict, order: dict, seen: set, neighborhood_id: str, now: datetime):
+    """What ImpactIndex.summary should return, from every current update"""
+    if neighborhood_id not in seen:
+        return None
+    active, upcoming = [], []
+    for key, update in updates.items():
+        if update["neighborhood_id"] != neighborhood_id:
+            continue
+        start = as_naive_utc(update["start_date"], MIN_TIME)
+        end = as_naive_utc(update["end_date"], MAX_TIME)
+        if end < start:
+            start, end = end, start
+        if start <= now <= end:
+            active.append((update, start, end))
+        elif start > now:
+            # Ties on start go to the earliest write, as in the index's heap
+            upcoming.append((start, order[key], update))
+    score = sum(update_weight(update, start, end) for update, start, end in active)
+    first = min(upcoming, key=lambda item: item[:2]) if upcoming else None
+    return {
+        "active_updates": len(active),
+        "active_by_type": dict(Counter(update["update_type"] for update, _, _ in active)),
+        "impact_score": round(score, 2),
+        "next_event": None if first is None else (first[2]["id"], first[0]),
+    }
+
+def comparable(summary):
+    if summary is None:
+        return None
+    event = summary["next_event"]
+    return {
+        "active_updates": summary["active_updates"],
+        "active_by_type": summary["active_by_type"],
+        "impact_score": summary["impact_score"],
+        "next_event": None if event is None else (event["id"], event["start_date"]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check ImpactIndex against a brute-force recompute")
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime(2024, 1, 1)
+    index = ImpactIndex()
+    updates, order, seen = {}, {}, set()
+    writes = 0
+    reads = 0
+    index_time = brute_time = 0.0
+
+    for step in range(args.operations):
+        now += timedelta(minutes=rng.choice([0, 0, 1, 30, 60 * 6, 60 * 24]))
+        roll = rng.random()
+        if roll < 0.45 or not updates:
+            key = rng.choice(list(updates)) if updates and rng.random() < 0.3 else len(order)
+            update = random_update(rng, key, now)
+            index.upsert(key, update, now=now)
+            updates[key] = update
+            order[key] = writes
+            writes += 1
+            if update["neighborhood_id"]:
+                seen.add(update["neighborhood_id"])
+        elif roll < 0.65:
+            key = rng.choice(list(updates))
+            index.remove(key)
+            del updates[key]
+        else:
+            reads += 1
+            neighborhood_id = rng.choice(NEIGHBORHOODS)
+            began = time.perf_counter()
+            got = comparable(index.summary(neighborhood_id, now=now))
+            index_time += time.perf_counter() - began
+            began = time.perf_counter()
+            expected = brute_summary(updates, order, seen, neighborhood_id, now)
+            brute_time += time.perf_counter() - began
+            scores_match = got is None or expected is None or abs(got["impact_score"] - expected["impact_score"]) <= 0.011
+            if not scores_match or (got and {**got, "impact_score": 0}) != (expected and {**expected, "impact_score": 0}):
+                print(f"FAIL at step {step} ({now}), {neighborhood_id}:\n  index {got}\n  brute {expected}")
+                sys.exit(1)
+
+    print(f"OK: {reads:,} summaries over {args.operations:,} operations matched the brute-force recompute")
+    print(f"{len(updates):,} live updates: index {index_time / reads * 1e6:.1f} us/read, "
+          f"recompute {brute_time / reads * 1e6:.1f} us/read")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Import-time profile of the API process (python -X importtime, summarized).
+
+Imports a module in a fresh interpreter with ``-X importtime`` and prints
+the slowest modules by cumulative and by self time, plus totals per
+top-level package, so heavy SDKs that sneak into the boot path show up.
+
+    cd server
+    python -m benchmarks.import_profile                 # import main
+    python -m benchmarks.import_profile --module routes.auth --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def profile_imports(module: str):
+    """(module, self_us, cumulative_us, depth) for every import, in import order"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SERVER_DIR, os.path.join(SERVER_DIR, "models"), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip().splitlines()[-1])
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of the API")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module)
+    total = next((cumulative for name, _, cumulative, _ in reversed(entries) if name == args.module), 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms, {len(entries)} modules\n")
+
+    print(f"Slowest by cumulative time (top {args.top}):")
+    for name, _, cumulative, depth in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {'  ' * min(depth, 6)}{name}")
+
+    print(f"\nSlowest by self time (top {args.top}):")
+    for name, self_us, _, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    packages = {}
+    for name, self_us, _, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+    print(f"\nSelf time per top-level package (top {args.top}):")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Interval index cross-check: IntervalIndex vs a linear scan.
+
+Inserts --intervals random intervals (some open-ended, some single
+instants, some given end-before-start), then runs --operations random
+steps against ``utils.interval_index.IntervalIndex`` and a plain dict:
+inserts, re-inserts of an existing key, removes, and ``at`` / ``overlapping``
+queries, each query compared with a linear scan. Exits 1 on the first
+disagreement, then prints per-write and per-query latency against the scan.
+
+    cd server
+    python -m benchmarks.intervals --intervals 3000 --operations 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from utils.interval_index import MAX_TIME, MIN_TIME, IntervalIndex, as_naive_utc
+
+EPOCH = datetime(2024, 1, 1)
+SPAN_HOURS = 24 * 90
+
+def random_instant(rng: random.Random) -> datetime:
+    # Whole hours, so endpoints often coincide and the closed-interval edges get exercised
+    return EPOCH + timedelta(hours=rng.randint(0, SPAN_HOURS))
+
+def random_interval(rng: random.Random):
+    start = random_instant(rng)
+    roll = rng.random()
+    if roll < 0.05:
+        return None, start
+    if roll < 0.10:
+        return start, None
+    if roll < 0.15:
+        return start, start
+    end = start + timedelta(hours=rng.randint(0, 24 * 7))
+    if roll < 0.20:
+        return end, start  # swapped, the index normalizes it
+    return start, end
+
+def scan(intervals: dict, start, end) -> set:
+    start = as_naive_utc(start, MIN_TIME)
+    end = as_naive_utc(end, MAX_TIME)
+    if end < start:
+        start, end = end, start
+    found = set()
+    for key, (a, b) in intervals.items():
+        a, b = as_naive_utc(a, MIN_TIME), as_naive_utc(b, MAX_TIME)
+        if b < a:
+            a, b = b, a
+        if a <= end and b >= start:
+            found.add(key)
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-check IntervalIndex against a linear scan")
+    parser.add_argument("--intervals", type=int, default=3000)
+    parser.add_argument("--operations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = IntervalIndex()
+    intervals = {}
+    for key in range(args.intervals):
+        intervals[key] = random_interval(rng)
+        index.insert(key, *intervals[key])
+    next_key = args.intervals
+
+    queries = 0
+    for step in range(args.operations):
+        roll = rng.random()
+        if roll < 0.15:
+            intervals[next_key] = random_interval(rng)
+            index.insert(next_key, *intervals[next_key])
+            next_key += 1
+        elif roll < 0.25 and intervals:
+            key = rng.choice(list(intervals))
+            intervals[key] = random_interval(rng)
+            index.insert(key, *intervals[key])
+        elif roll < 0.40 and intervals:
+            key = rng.choice(list(intervals))
+            del intervals[key]
+            index.remove(key)
+        else:
+            queries += 1
+            if rng.random() < 0.5:
+                instant = random_instant(rng)
+                query, got, expected = f"at({instant})", index.at(instant), scan(intervals, instant, instant)
+            else:
+                start, end = random_interval(rng)
+                query, got = f"overlapping({start}, {end})", index.overlapping(start, end)
+                expected = scan(intervals, start, end)
+            if len(got) != len(set(got)) or set(got) != expected:
+                print(f"FAIL at step {step}: {query} returned {len(got)} keys, "
+                      f"missing {sorted(expected - set(got))[:10]}, extra {sorted(set(got) - expected)[:10]}")
+                sys.exit(1)
+        if len(index) != len(intervals):
+            print(f"FAIL at step {step}: index holds {len(index)} intervals, expected {len(intervals)}")
+            sys.exit(1)
+
+    # A create followed by a list, as the API does it
+    probes = [(random_interval(rng), random_instant(rng)) for _ in range(1000)]
+    start = time.perf_counter()
+    for offset, (interval, instant) in enumerate(probes):
+        index.insert(next_key + offset, *interval)
+        index.at(instant)
+    indexed = (time.perf_counter() - start) / len(probes)
+    start = time.perf_counter()
+    for _, instant in probes[:100]:
+        scan(intervals, instant, instant)
+    scanned = (time.perf_counter() - start) / 100
+
+    print(f"OK: {queries:,} queries over {args.operations:,} interleaved operations matched the linear scan")
+    print(f"{len(index):,} intervals: insert + query {indexed * 1000:.3f} ms, "
+          f"scan {scanned * 1000:.3f} ms/query ({scanned / indexed:.0f}x slower)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""End-to-end load test of the API with latency percentiles per route.
+
+Starts the app from main.py in-process (httpx ASGI transport, no sockets)
+or as a uvicorn subprocess, or targets an already running server, then
+drives a weighted mix of requests across every router with concurrent
+clients. Results are printed/written as JSON: per route p50/p95/p99
+latency, throughput, error rate (5xx and transport errors) and a status
+code breakdown.
+
+    cd server
+    python -m benchmarks.load_test --duration 30 --concurrency 50 --output results.json
+    python -m benchmarks.load_test --mode subprocess --write-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --baseline benchmarks/baseline.json   # exit 1 on regression
+
+The mix can be replaced with --mix file.json, a list of
+{"name", "method", "path", "weight", "params"?, "json"?} objects where
+"{placeholders}" in path are filled from random picks out of "params".
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IDS = {"property_id": [1, 2, 3], "report_id": [1, 2], "update_id": [1, 2, 3]}
+
+DEFAULT_MIX = [
+    {"name": "GET /api/properties/", "method": "GET", "path": "/api/properties/", "weight": 20},
+    {"name": "GET /api/properties/{property_id}", "method": "GET", "path": "/api/properties/{property_id}", "weight": 15, "params": IDS},
+    {"name": "POST /api/properties/", "method": "POST", "path": "/api/properties/", "weight": 1,
+     "json": {"address": "1 Load Test Way", "city": "San Francisco", "state": "CA", "zip_code": "94102", "property_type": "condo"}},
+    {"name": "GET /api/reports/", "method": "GET", "path": "/api/reports/", "weight": 10},
+    {"name": "GET /api/reports/{report_id}", "method": "GET", "path": "/api/reports/{report_id}", "weight": 8, "params": IDS},
+    {"name": "GET /api/community/", "method": "GET", "path": "/api/community/", "weight": 15},
+    {"name": "GET /api/community/?neighborhood_id=", "method": "GET", "path": "/api/community/?neighborhood_id=sf_downtown", "weight": 8},
+    {"name": "GET /api/community/{update_id}", "method": "GET", "path": "/api/community/{update_id}", "weight": 5, "params": IDS},
+    {"name": "GET /api/auth/me", "method": "GET", "path": "/api/auth/me", "weight": 8},
+    {"name": "GET /api/admin/stats", "method": "GET", "path": "/api/admin/stats", "weight": 3},
+    {"name": "GET /api/admin/pending-reports", "method": "GET", "path": "/api/admin/pending-reports", "weight": 2},
+    {"name": "GET /api/contractor/assignments", "method": "GET", "path": "/api/contractor/assignments", "weight": 3},
+    {"name": "GET /api/contractor/projects", "method": "GET", "path": "/api/contractor/projects", "weight": 2},
+    {"name": "GET /health", "method": "GET", "path": "/health", "weight": 2},
+]
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+
+    def record(self, latency: float, status):
+        self.latencies.append(latency)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+        if status == "error" or status >= 500:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+            "statuses": self.statuses,
+        }
+
+async def run_load(client: httpx.AsyncClient, mix, concurrency: int, duration: float,
+                   max_requests: int, token: str, seed: int, warmup: float):
+    headers = {"Authorization": f"Bearer {token}"}
+    weights = [entry["weight"] for entry in mix]
+    stats = {entry["name"]: RouteStats() for entry in mix}
+    issued = 0
+
+    async def worker(worker_id: int, deadline: float, record: bool):
+        nonlocal issued
+        rng = random.Random(f"{seed}:{worker_id}:{record}")
+        while time.perf_counter() < deadline:
+            if record and max_requests and issued >= max_requests:
+                return
+            if record:
+                issued += 1
+            entry = rng.choices(mix, weights)[0]
+            path = entry["path"]
+            for key, choices in entry.get("params", {}).items():
+                path = path.replace("{" + key + "}", str(rng.choice(choices)))
+            start = time.perf_counter()
+            try:
+                response = await client.request(entry["method"], path, headers=headers, json=entry.get("json"))
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            if record:
+                stats[entry["name"]].record(time.perf_counter() - start, status)
+
+    if warmup > 0:
+        deadline = time.perf_counter() + warmup
+        await asyncio.gather(*(worker(i, deadline, False) for i in range(concurrency)))
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(worker(i, deadline, True) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    routes = {name: route.summary(elapsed) for name, route in stats.items() if route.latencies}
+    total = RouteStats()
+    for route in stats.values():
+        total.latencies.extend(route.latencies)
+        total.errors += route.errors
+    overall = total.summary(elapsed)
+    overall.pop("statuses")
+    return {
+        "config": {"concurrency": concurrency, "duration_s": round(elapsed, 3), "seed": seed},
+        "overall": overall,
+        "routes": routes,
+    }
+
+def compare_to_baseline(results: dict, baseline: dict, max_latency_regression: float,
+                        max_throughput_drop: float, max_error_rate_increase: float):
+    """Human-readable regressions of results against a baseline file"""
+    problems = []
+    for name, base in baseline.get("routes", {}).items():
+        current = results["routes"].get(name)
+        if current is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if base[key] > 0 and current[key] > base[key] * (1 + max_latency_regression):
+                problems.append(f"{name}: {key} {current[key]} > baseline {base[key]} (+{max_latency_regression:.0%} allowed)")
+        if base["throughput_rps"] > 0 and current["throughput_rps"] < base["throughput_rps"] * (1 - max_throughput_drop):
+            problems.append(f"{name}: throughput {current['throughput_rps']} < baseline {base['throughput_rps']}")
+        if current["error_rate"] > base["error_rate"] + max_error_rate_increase:
+            problems.append(f"{name}: error rate {current['error_rate']} > baseline {base['error_rate']}")
+    return problems
+
+def start_subprocess(port: int, timeout: float = 30.0) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SERVER_DIR, os.path.join(SERVER_DIR, "models"), env.get("PYTHONPATH")]))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("server did not become healthy in time")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the HomeFax API")
+    parser.add_argument("--mode", choices=["inprocess", "subprocess"], default="inprocess")
+    parser.add_argument("--base-url", help="target an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of measured load")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0 = duration only)")
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--mix", help="JSON file with the traffic mix")
+    parser.add_argument("--token", default="mock_jwt_token_1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against this results file and exit 1 on regression")
+    parser.add_argument("--write-baseline", help="save these results as the new baseline")
+    parser.add_argument("--max-latency-regression", type=float, default=0.25)
+    parser.add_argument("--max-throughput-drop", type=float, default=0.25)
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01)
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.mix:
+        with open(args.mix) as f:
+            mix = json.load(f)
+
+    process = None
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30.0,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    elif args.mode == "subprocess":
+        process = start_subprocess(args.port)
+        client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=30.0,
+                                   limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+            if path not in sys.path:
+                sys.path.insert(0, path)
+        from main import app
+        # Unhandled app exceptions become 500s, as they would behind uvicorn
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0)
+
+    try:
+        if args.mode == "inprocess" and not args.base_url:
+            async with app.router.lifespan_context(app):
+                results = await run_load(client, mix, args.concurrency, args.duration, args.requests,
+                                         args.token, args.seed, args.warmup)
+        else:
+            results = await run_load(client, mix, args.concurrency, args.duration, args.requests,
+                                     args.token, args.seed, args.warmup)
+    finally:
+        await client.aclose()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    results["config"]["mode"] = "external" if args.base_url else args.mode
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            f.write(output + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare_to_baseline(results, baseline, args.max_latency_regression,
+                                       args.max_throughput_drop, args.max_error_rate_increase)
+        if problems:
+            print("Regressions against baseline:", file=sys.stderr)
+            for problem in problems:
+                print(f"  {problem}", file=sys.stderr)
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Neighborhood notification fan-out throughput.
+
+Seeds a temporary SQLite database with N property owners inside one
+neighborhood, queues a notify-neighborhood job and lets
+``utils.notifications.NotificationDispatcher`` drain it through a stub
+channel that waits --latency-ms per send (a provider API round trip),
+then prints deliveries/sec.
+
+    cd server
+    python -m benchmarks.notifications --recipients 50000 --latency-ms 20 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+CENTER = (-122.415, 37.78)
+SPREAD = 0.01
+
+class SlowChannel:
+    name = "bench"
+
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000.0
+
+    async def send(self, recipient, job):
+        await asyncio.sleep(self.latency)
+
+def seed(engine, recipients: int):
+    from sqlalchemy import insert
+    from models import Property, User
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            dict(id=i, email=f"owner{i}@example.com", firebase_uid=f"bench-{i}", role="homeowner",
+                 first_name="Owner", last_name=str(i), is_active=True)
+            for i in range(1, recipients + 1)
+        ])
+        conn.execute(insert(Property), [
+            dict(id=i, address=f"{i} Main St", city="San Francisco", state="CA", zip_code="94103",
+                 property_type="single_family", owner_id=i,
+                 longitude=CENTER[0] + rng.uniform(-SPREAD, SPREAD),
+                 latitude=CENTER[1] + rng.uniform(-SPREAD, SPREAD))
+            for i in range(1, recipients + 1)
+        ])
+
+async def run(args) -> float:
+    from database import AsyncSessionLocal, async_engine
+    from models import NotificationJob
+    from utils.notifications import NotificationDispatcher, register_channel
+
+    register_channel(SlowChannel(args.latency_ms))
+    dispatcher = NotificationDispatcher(workers=1, batch_size=args.batch_size, concurrency=args.concurrency)
+    bbox = [CENTER[0] - SPREAD, CENTER[1] - SPREAD, CENTER[0] + SPREAD, CENTER[1] + SPREAD]
+    async with AsyncSessionLocal() as db:
+        job = await dispatcher.enqueue(db, "bench", "Benchmark", "general", ["bench"], {"bbox": bbox}, 1)
+
+    start = time.perf_counter()
+    await dispatcher.start()
+    while True:
+        await asyncio.sleep(0.05)
+        async with AsyncSessionLocal() as db:
+            row = await db.get(NotificationJob, job.id)
+        if row.status in ("completed", "failed"):
+            break
+    elapsed = time.perf_counter() - start
+    await dispatcher.stop()
+    await async_engine.dispose()
+    print(f"status={row.status} delivered={row.delivered} failed={row.failed} in {elapsed:.2f}s")
+    return row.delivered / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark notification fan-out")
+    parser.add_argument("--recipients", type=int, default=50000)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated provider latency per send")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ["DATABASE_URL"] = url
+        os.environ.setdefault("METRICS_ENABLED", "false")
+        from database import engine
+        from utils.migrations import upgrade_to_head
+        upgrade_to_head(url)
+        seed(engine, args.recipients)
+        engine.dispose()
+        rate = asyncio.run(run(args))
+    print(f"{rate:,.0f} deliveries/sec ({args.latency_ms:g} ms per send, {args.concurrency} in flight)")
+
+if __name__ == "__main__":
+    main()
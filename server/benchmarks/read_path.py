@@ -0,0 +1,108 @@
+"""Read path for list pages: ORM entities vs Core column selects.
+
+Loads the same page of properties three ways through an AsyncSession:
+full ``Property`` ORM instances (identity map, instance state, every
+column), ``utils.read_path.fetch_page`` slotted rows with only the
+``PropertyResponse`` columns, and the same as plain tuples. Reports
+pages/sec and tracemalloc memory (retained by the page, and peak while
+loading it).
+
+    cd server
+    python -m benchmarks.read_path --rows 5000 --iterations 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database import to_async_url
+from models import Base, Property
+from routes.properties import PropertyResponse
+from utils.read_path import fetch_page
+
+def seed(url: str, count: int):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Property), [
+            {
+                "address": f"{i} Benchmark St", "city": "San Francisco", "state": "CA",
+                "zip_code": f"94{i % 1000:03d}", "latitude": 37.7 + i * 1e-5, "longitude": -122.4 - i * 1e-5,
+                "property_type": ("single_family", "condo", "townhouse")[i % 3], "year_built": 1900 + i % 120,
+                "square_feet": 800 + i % 3000, "bedrooms": 1 + i % 5, "bathrooms": 1.0 + (i % 4) * 0.5,
+                "lot_size": 0.1 + (i % 10) * 0.05, "is_verified": i % 2 == 0, "verification_date": now,
+                "created_at": now, "updated_at": now,
+            }
+            for i in range(1, count + 1)
+        ])
+    engine.dispose()
+
+def make_loaders(Session, count: int):
+    async def orm():
+        async with Session() as db:
+            result = await db.execute(select(Property).order_by(Property.id).limit(count))
+            return result.scalars().all()
+
+    async def core_rows():
+        async with Session() as db:
+            return await fetch_page(db, Property, PropertyResponse, limit=count)
+
+    async def core_tuples():
+        async with Session() as db:
+            return await fetch_page(db, Property, PropertyResponse, limit=count, as_tuples=True)
+
+    return {"ORM Property": orm, "Core slotted rows": core_rows, "Core tuples": core_tuples}
+
+async def measure(load, iterations: int):
+    await load()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await load()
+    elapsed = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    page = await load()
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del page
+    return elapsed, retained, peak
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs Core list reads")
+    parser.add_argument("--rows", type=int, default=5000, help="rows per page")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'read_path.db')}"
+        seed(url, args.rows)
+        engine = create_async_engine(to_async_url(url))
+        Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        print(f"{args.rows} rows/page, {args.iterations} iterations")
+        baseline = None
+        for name, load in make_loaders(Session, args.rows).items():
+            elapsed, retained, peak = await measure(load, args.iterations)
+            baseline = baseline or elapsed
+            print(f"{name:<18} {elapsed * 1000:9.2f} ms/page ({baseline / elapsed:4.1f}x)  "
+                  f"{args.rows / elapsed:10.0f} rows/s  retained {retained / 1024:8.1f} KiB  "
+                  f"peak {peak / 1024:8.1f} KiB")
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
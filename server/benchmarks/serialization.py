@@ -0,0 +1,116 @@
+"""List endpoint serialization: response_model validation + stdlib JSON vs the fast path.
+
+Times the work FastAPI does after a list handler returns (validate every
+item against ``List[PropertyResponse]``, ``jsonable_encoder`` it, render
+with ``json.dumps``) against ``utils.fast_json.fast_json_response``
+(project to the model's fields, render with orjson). A second pair loads
+the same page from SQLite as ORM objects and as Core rows.
+
+    cd server
+    python -m benchmarks.serialization --items 100 --iterations 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from models import Base, Property
+from routes.properties import PropertyResponse
+from utils.fast_json import fast_json_response, orjson
+
+def make_rows(count: int) -> List[dict]:
+    verified_at = datetime(2024, 1, 1)
+    return [
+        {
+            "id": i,
+            "address": f"{i} Benchmark St",
+            "city": "San Francisco",
+            "state": "CA",
+            "zip_code": f"94{i % 1000:03d}",
+            "latitude": 37.7 + i * 1e-5,
+            "longitude": -122.4 - i * 1e-5,
+            "property_type": ("single_family", "condo", "townhouse")[i % 3],
+            "year_built": 1900 + i % 120,
+            "square_feet": 800 + i % 3000,
+            "bedrooms": 1 + i % 5,
+            "bathrooms": 1.0 + (i % 4) * 0.5,
+            "lot_size": 0.1 + (i % 10) * 0.05,
+            "is_verified": i % 2 == 0,
+            "verification_date": verified_at + timedelta(days=i) if i % 2 == 0 else None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+RESPONSE_FIELD = create_response_field(name="Response", type_=List[PropertyResponse])
+
+async def current_path(rows) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=rows)
+    return JSONResponse(content).body
+
+async def fast_path(rows) -> bytes:
+    return fast_json_response(rows, PropertyResponse).body
+
+async def timed(fn, rows, iterations: int) -> float:
+    await fn(rows)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn(rows)
+    return (time.perf_counter() - start) / iterations
+
+def load_orm(engine, count: int):
+    with Session(engine) as session:
+        return session.scalars(select(Property).limit(count)).all()
+
+def load_core(engine, count: int):
+    columns = [Property.__table__.c[name] for name in PropertyResponse.model_fields]
+    with engine.connect() as conn:
+        return conn.execute(select(*columns).limit(count)).all()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark list response serialization")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    print(f"{args.items} items/page, {args.iterations} iterations, encoder: {'orjson' if orjson else 'json'}")
+
+    current = await timed(current_path, rows, args.iterations)
+    fast = await timed(fast_path, rows, args.iterations)
+    print(f"dicts  response_model + json : {current * 1000:8.3f} ms/page")
+    print(f"dicts  fast_json_response    : {fast * 1000:8.3f} ms/page  ({current / fast:.1f}x)")
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Property), rows)
+
+    async def orm_current(_):
+        return await current_path(load_orm(engine, args.items))
+
+    async def core_fast(_):
+        return await fast_path(load_core(engine, args.items))
+
+    orm = await timed(orm_current, None, args.iterations)
+    core = await timed(core_fast, None, args.iterations)
+    print(f"sqlite ORM + response_model  : {orm * 1000:8.3f} ms/page")
+    print(f"sqlite Core + fast path      : {core * 1000:8.3f} ms/page  ({orm / core:.1f}x)")
+
+    assert (await current_path(rows)).count(b'"id"') == (await fast_path(rows)).count(b'"id"')
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""Smoke check for the pre-forking server: workers start, answer, and drain.
+
+Migrates a temporary SQLite database to head, starts ``serve.py`` on it
+with --workers workers on a free port, waits for a
+successful response on --path, sends a few more requests (so more than one
+worker is likely to answer), then sends SIGTERM and checks the master exits
+within the graceful timeout. Exits 1 on any failure, including a worker
+that accepts connections but never answers.
+
+    cd server
+    python -m benchmarks.serve_smoke --workers 2
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def smoke(database_url: str, workers: int, path: str, token: str, requests: int, timeout: float) -> str:
+    """Returns an error message, or an empty string when the server behaved"""
+    port = free_port()
+    env = dict(os.environ, DATABASE_URL=database_url)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SERVER_DIR, os.path.join(SERVER_DIR, "models"), env.get("PYTHONPATH")]))
+    env.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="homefax-smoke-metrics-"))
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+         "--graceful-timeout", "5", "--shutdown-hook-margin", "5", "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, start_new_session=True  # own process group, so workers die with it
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5.0) as client:
+            start = time.perf_counter()
+            while True:
+                if process.poll() is not None:
+                    return f"serve.py exited with code {process.returncode} before answering"
+                if time.perf_counter() - start > timeout:
+                    return f"no successful response on {path} within {timeout}s"
+                try:
+                    if client.get(path, headers=headers).is_success:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.05)
+            for _ in range(requests):
+                try:
+                    response = client.get(path, headers=headers)
+                except httpx.TransportError as e:
+                    return f"request failed after startup: {e!r}"
+                if not response.is_success:
+                    return f"{path} answered {response.status_code}"
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            return "serve.py did not exit within 15s of SIGTERM"
+        if process.returncode != 0:
+            return f"serve.py exited with code {process.returncode} after SIGTERM"
+        return ""
+    finally:
+        if process.poll() is None:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Smoke check serve.py with several workers")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--path", default="/api/community/")
+    parser.add_argument("--token", default="mock_jwt_token_1")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'smoke.db')}"
+        migrate = subprocess.run(
+            [sys.executable, "-c", f"from utils.migrations import upgrade_to_head; upgrade_to_head({url!r})"],
+            cwd=SERVER_DIR, env=dict(os.environ, PYTHONPATH=os.pathsep.join([SERVER_DIR, os.path.join(SERVER_DIR, "models")]),
+                                     DATABASE_URL=url),
+            capture_output=True, text=True
+        )
+        if migrate.returncode:
+            print(migrate.stderr)
+            sys.exit(1)
+        error = smoke(url, args.workers, args.path, args.token, args.requests, args.timeout)
+    if error:
+        print(f"FAIL: {error}")
+        sys.exit(1)
+    print(f"OK: {args.workers} workers answered {args.path} and drained on SIGTERM")
+
+if __name__ == "__main__":
+    main()
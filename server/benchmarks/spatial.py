@@ -0,0 +1,76 @@
+"""Nearby community updates: grid index vs scanning every geometry.
+
+Builds N random Point/LineString updates around San Francisco, then runs
+the property-page query (everything within --radius meters of a point)
+through ``utils.spatial_index.GridIndex`` and through a brute-force
+distance scan, checks they agree, and prints per-query latency.
+
+    cd server
+    python -m benchmarks.spatial --updates 50000 --queries 500 --radius 500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+from utils.geo import geometry_distance_m
+from utils.spatial_index import GridIndex
+
+CENTER = (-122.44, 37.76)
+SPREAD = 0.15  # degrees, roughly the city
+
+def random_geometry(rng: random.Random) -> dict:
+    lon = CENTER[0] + rng.uniform(-SPREAD, SPREAD)
+    lat = CENTER[1] + rng.uniform(-SPREAD, SPREAD)
+    if rng.random() < 0.7:
+        return {"type": "Point", "coordinates": [lon, lat]}
+    points = [[lon, lat]]
+    for _ in range(rng.randint(1, 4)):
+        lon += rng.uniform(-0.005, 0.005)
+        lat += rng.uniform(-0.005, 0.005)
+        points.append([lon, lat])
+    return {"type": "LineString", "coordinates": points}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spatial matching of updates to properties")
+    parser.add_argument("--updates", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--radius", type=float, default=500.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    geometries = {i: random_geometry(rng) for i in range(args.updates)}
+    queries = [(CENTER[0] + rng.uniform(-SPREAD, SPREAD), CENTER[1] + rng.uniform(-SPREAD, SPREAD))
+               for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = GridIndex()
+    for key, geometry in geometries.items():
+        index.insert(key, geometry)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [{key for key, _, _ in index.nearby(lon, lat, args.radius)} for lon, lat in queries]
+    grid = (time.perf_counter() - start) / args.queries
+
+    brute_queries = queries[:max(1, args.queries // 10)]
+    start = time.perf_counter()
+    scanned = [{key for key, geometry in geometries.items() if geometry_distance_m(geometry, lon, lat) <= args.radius}
+               for lon, lat in brute_queries]
+    brute = (time.perf_counter() - start) / len(brute_queries)
+
+    assert indexed[:len(scanned)] == scanned, "grid index disagrees with brute force"
+    matches = sum(len(found) for found in indexed) / len(indexed)
+    print(f"{args.updates} updates, radius {args.radius:.0f} m, {matches:.1f} matches/query")
+    print(f"grid build      : {build * 1000:9.1f} ms")
+    print(f"grid index      : {grid * 1000:9.3f} ms/query")
+    print(f"brute-force scan: {brute * 1000:9.3f} ms/query ({brute / grid:.0f}x slower)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Batch jobs (run with python -m jobs.<name> from server/)
@@ -0,0 +1,92 @@
+"""Move expired community updates out of the community_updates table.
+
+Verified updates whose end_date is more than --after-days in the past are
+appended to the compressed monthly archive (``utils.archive.UpdateArchive``,
+the same files ``include_archived=true`` reads) and then deleted, one batch
+per transaction, so the live table and its indexes only hold current
+updates. The archive write is fsynced before the delete commits; if the job
+dies in between, the rerun archives those rows again and readers keep one
+copy. Near-duplicates pointing at an archived update are detached from it.
+
+Run it from cron, e.g. nightly:
+
+    cd server
+    python -m jobs.archive_updates --after-days 30
+    python -m jobs.archive_updates --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from sqlalchemy import create_engine, select, text
+
+from models import CommunityUpdate
+from utils.archive import ARCHIVE_AFTER_DAYS, ARCHIVE_DIR, UpdateArchive, archive_cutoff
+
+def archive_expired(database_url: str, archive: UpdateArchive, after_days: float, batch_size: int,
+                    dry_run: bool) -> dict:
+    table = CommunityUpdate.__table__
+    engine = create_engine(database_url)
+    cutoff = archive_cutoff(after_days=after_days)
+    totals = {"archived": 0, "detached": 0}
+    started = time.perf_counter()
+    last_id = 0
+    while True:
+        # Served by ix_community_updates_is_verified_end_date
+        stmt = (
+            select(table)
+            .where(table.c.is_verified == True, table.c.end_date < cutoff, table.c.id > last_id)  # noqa: E712
+            .order_by(table.c.id)
+            .limit(batch_size)
+        )
+        with engine.begin() as connection:
+            rows = [dict(row) for row in connection.execute(stmt).mappings()]
+            if not rows:
+                break
+            ids = [row["id"] for row in rows]
+            last_id = ids[-1]
+            if not dry_run:
+                archive.append(rows)
+                detached = connection.execute(
+                    table.update().where(table.c.duplicate_of.in_(ids)).values(duplicate_of=None)
+                )
+                connection.execute(table.delete().where(table.c.id.in_(ids)))
+                totals["detached"] += detached.rowcount
+        totals["archived"] += len(rows)
+        elapsed = time.perf_counter() - started
+        print(f"  through id {last_id}: {totals['archived']:,} archived "
+              f"({totals['archived'] / elapsed:,.0f} rows/s)", flush=True)
+    if totals["archived"] and not dry_run:
+        # Refresh planner statistics; on PostgreSQL also make the freed space reusable now
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("VACUUM (ANALYZE) community_updates"))
+            else:
+                connection.execute(text("ANALYZE community_updates"))
+    engine.dispose()
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive expired community updates")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./homefax.db"))
+    parser.add_argument("--archive-dir", default=os.path.join(ARCHIVE_DIR, "community_updates"))
+    parser.add_argument("--after-days", type=float, default=ARCHIVE_AFTER_DAYS,
+                        help="archive updates that ended more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="count what would be archived")
+    args = parser.parse_args()
+
+    totals = archive_expired(args.database_url, UpdateArchive(args.archive_dir), args.after_days,
+                             args.batch_size, args.dry_run)
+    action = "Would archive" if args.dry_run else "Archived"
+    print(f"{action} {totals['archived']:,} community updates to {args.archive_dir}"
+          f" ({totals['detached']:,} duplicates detached)")
+
+if __name__ == "__main__":
+    main()
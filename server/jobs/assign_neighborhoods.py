@@ -0,0 +1,92 @@
+"""Backfill properties.neighborhood_id from the neighborhood boundary polygons.
+
+Walks the properties table in primary-key order, assigns each batch of
+coordinates with one vectorized point-in-polygon pass
+(``NeighborhoodIndex.assign_many``) and writes back only the rows whose
+neighborhood changed, committing per batch. Safe to interrupt and rerun;
+``--after-id`` resumes from the last id it printed.
+
+    cd server
+    python -m jobs.assign_neighborhoods --batch-size 50000
+    python -m jobs.assign_neighborhoods --only-missing --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from sqlalchemy import bindparam, create_engine, select
+
+from models import Property
+from utils.neighborhoods import NEIGHBORHOODS_DIR, load_neighborhoods
+
+def backfill(database_url: str, neighborhoods_dir: str, batch_size: int, only_missing: bool,
+             dry_run: bool, after_id: int = 0) -> dict:
+    index = load_neighborhoods(neighborhoods_dir)
+    if not len(index):
+        raise SystemExit(f"No neighborhood boundaries in {neighborhoods_dir}")
+    table = Property.__table__
+    engine = create_engine(database_url)
+    write = (
+        table.update()
+        .where(table.c.id == bindparam("property_id"))
+        .values(neighborhood_id=bindparam("new_neighborhood_id"))
+    )
+    totals = {"scanned": 0, "changed": 0, "unassigned": 0}
+    started = time.perf_counter()
+    last_id = after_id
+    while True:
+        stmt = (
+            select(table.c.id, table.c.longitude, table.c.latitude, table.c.neighborhood_id)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        )
+        if only_missing:
+            stmt = stmt.where(table.c.neighborhood_id.is_(None))
+        with engine.connect() as connection:
+            rows = connection.execute(stmt).all()
+        if not rows:
+            break
+        assigned = index.assign_many([row.longitude for row in rows], [row.latitude for row in rows])
+        changes = [
+            {"property_id": row.id, "new_neighborhood_id": neighborhood_id}
+            for row, neighborhood_id in zip(rows, assigned)
+            if neighborhood_id != row.neighborhood_id
+        ]
+        if changes and not dry_run:
+            with engine.begin() as connection:
+                connection.execute(write, changes)
+        last_id = rows[-1].id
+        totals["scanned"] += len(rows)
+        totals["changed"] += len(changes)
+        totals["unassigned"] += sum(1 for neighborhood_id in assigned if neighborhood_id is None)
+        elapsed = time.perf_counter() - started
+        print(f"  through id {last_id}: {totals['scanned']:,} scanned, {totals['changed']:,} changed "
+              f"({totals['scanned'] / elapsed:,.0f} rows/s)", flush=True)
+    engine.dispose()
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign properties to neighborhoods")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./homefax.db"))
+    parser.add_argument("--neighborhoods-dir", default=NEIGHBORHOODS_DIR)
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this property id")
+    parser.add_argument("--only-missing", action="store_true", help="skip properties that already have one")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    args = parser.parse_args()
+
+    totals = backfill(args.database_url, args.neighborhoods_dir, args.batch_size,
+                      args.only_missing, args.dry_run, args.after_id)
+    action = "would change" if args.dry_run else "changed"
+    print(f"Scanned {totals['scanned']:,} properties, {action} {totals['changed']:,}, "
+          f"{totals['unassigned']:,} outside every neighborhood")
+
+if __name__ == "__main__":
+    main()
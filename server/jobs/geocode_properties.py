@@ -0,0 +1,116 @@
+"""Geocode properties that are missing coordinates or only have a zip centroid.
+
+Walks the properties with no latitude/longitude, or with
+geocode_precision 'zip', in primary-key order and
+resolves each batch through ``utils.geocoding.Geocoder`` (gazetteer, on-disk
+cache, then the remote provider, then the zip centroid), with --concurrency
+remote lookups in flight. Writes coordinates, their precision and the
+neighborhood they fall in, committing per batch. Zip centroids (including
+ones stored because the provider was failing) are picked up again by the
+next run; addresses nobody can place are left NULL and counted. The
+negative cache keeps reruns from asking the provider about either again
+until GEOCODE_NEGATIVE_TTL passes.
+
+    cd server
+    python -m jobs.geocode_properties --batch-size 1000 --concurrency 8
+    GEOCODER_PROVIDER=stub python -m jobs.geocode_properties --dry-run
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from sqlalchemy import bindparam, create_engine, or_, select
+
+from models import Property
+from utils.geocoding import GAZETTEER_PATH, GEOCODE_CACHE_PATH, GEOCODER_PROVIDER, create_geocoder, create_provider
+from utils.neighborhoods import neighborhood_index
+
+async def geocode_missing(database_url: str, geocoder, batch_size: int, concurrency: int,
+                          dry_run: bool, after_id: int = 0) -> dict:
+    table = Property.__table__
+    engine = create_engine(database_url)
+    write = (
+        table.update()
+        .where(table.c.id == bindparam("property_id"))
+        .values(
+            latitude=bindparam("new_latitude"),
+            longitude=bindparam("new_longitude"),
+            neighborhood_id=bindparam("new_neighborhood_id"),
+            geocode_precision=bindparam("new_precision"),
+        )
+    )
+    totals = {"scanned": 0, "geocoded": 0, "zip_only": 0, "unresolved": 0}
+    started = time.perf_counter()
+    last_id = after_id
+    while True:
+        stmt = (
+            select(table.c.id, table.c.address, table.c.city, table.c.state, table.c.zip_code)
+            .where(table.c.id > last_id, or_(table.c.latitude.is_(None), table.c.longitude.is_(None),
+                                             table.c.geocode_precision == "zip"))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        )
+        with engine.connect() as connection:
+            rows = connection.execute(stmt).all()
+        if not rows:
+            break
+        results = await geocoder.geocode_many(
+            [(row.address, row.city, row.state, row.zip_code) for row in rows], concurrency=concurrency
+        )
+        found = [(row, result) for row, result in zip(rows, results) if result is not None]
+        assigned = neighborhood_index.assign_many(
+            [result.longitude for _, result in found], [result.latitude for _, result in found]
+        )
+        changes = [
+            {"property_id": row.id, "new_latitude": result.latitude, "new_longitude": result.longitude,
+             "new_neighborhood_id": neighborhood_id, "new_precision": result.precision}
+            for (row, result), neighborhood_id in zip(found, assigned)
+        ]
+        if changes and not dry_run:
+            with engine.begin() as connection:
+                connection.execute(write, changes)
+        last_id = rows[-1].id
+        totals["scanned"] += len(rows)
+        totals["geocoded"] += len(found)
+        totals["zip_only"] += sum(1 for _, result in found if result.precision == "zip")
+        totals["unresolved"] += len(rows) - len(found)
+        elapsed = time.perf_counter() - started
+        print(f"  through id {last_id}: {totals['scanned']:,} scanned, {totals['geocoded']:,} geocoded "
+              f"({totals['scanned'] / elapsed:,.0f} rows/s)", flush=True)
+    engine.dispose()
+    return totals
+
+async def run(args) -> dict:
+    geocoder = create_geocoder(create_provider(args.provider), args.cache_path, args.gazetteer_path)
+    try:
+        return await geocode_missing(args.database_url, geocoder, args.batch_size, args.concurrency,
+                                     args.dry_run, args.after_id)
+    finally:
+        await geocoder.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Geocode properties missing coordinates or placed by zip only")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./homefax.db"))
+    parser.add_argument("--provider", default=GEOCODER_PROVIDER, choices=["mapbox", "stub", "none"])
+    parser.add_argument("--gazetteer-path", default=GAZETTEER_PATH)
+    parser.add_argument("--cache-path", default=GEOCODE_CACHE_PATH)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8, help="remote lookups in flight")
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this property id")
+    parser.add_argument("--dry-run", action="store_true", help="geocode without writing coordinates")
+    args = parser.parse_args()
+
+    totals = asyncio.run(run(args))
+    action = "would geocode" if args.dry_run else "geocoded"
+    print(f"Scanned {totals['scanned']:,} properties, {action} {totals['geocoded']:,} "
+          f"({totals['zip_only']:,} to a zip centroid), {totals['unresolved']:,} unresolved")
+
+if __name__ == "__main__":
+    main()
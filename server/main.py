@@ -3,19 +3,37 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 import uvicorn
 from contextlib import asynccontextmanager
+import asyncio
 
-from database import engine
-from models import Base
+from database import engine, dispose_engines, replica_router
 from routes import properties, reports, community, admin, contractor, auth
+from utils.migrations import ensure_schema_current
+from utils.pool_metrics import get_pool_stats
+from utils.db_routing import ReadYourWritesMiddleware
+from utils.lazy_session import session_stats
+from utils.lifecycle import WorkerStatsMiddleware, begin_drain, run_shutdown_hooks, worker_state
+from utils.profiling import ProfilingMiddleware
+from utils.pubsub import feed_broker
+from utils.notifications import notification_dispatcher
+from utils.metrics import METRICS_ENABLED, MetricsMiddleware, metrics_response, refresh_pool_gauges
+from utils.query_stats import QueryStatsMiddleware, SQL_INSTRUMENTATION, install_query_hooks
 
-# Create database tables
+# Schema is managed by Alembic; refuse to start against an out-of-date database
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    ensure_schema_current(engine)
+    pool_gauges = asyncio.create_task(refresh_pool_gauges()) if METRICS_ENABLED else None
+    await feed_broker.start()
+    await notification_dispatcher.start()
+    await community.update_archiver.start()
     yield
-    # Shutdown
-    pass
+    if pool_gauges:
+        pool_gauges.cancel()
+    # Shutdown: flush background queues while the database is still reachable
+    begin_drain()
+    await run_shutdown_hooks()
+    await dispose_engines()
 
 app = FastAPI(
     title="HomeFax API",
@@ -31,8 +49,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Last-Write"],
 )
 
+# SQL instrumentation: query count / DB time per request, slow query plans, N+1 warnings
+if SQL_INSTRUMENTATION:
+    install_query_hooks()
+    app.add_middleware(QueryStatsMiddleware)
+
+app.add_middleware(WorkerStatsMiddleware)
+
+# Read replicas: a client that just wrote reads from the primary, whichever worker serves it
+app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
+
+# On-demand profiling: `X-Profile: 1` from admins, or 1 in PROFILE_SAMPLE_RATE requests
+app.add_middleware(ProfilingMiddleware)
+
+# Prometheus metrics (outermost, so latency includes the other middleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Security
 security = HTTPBearer()
 
@@ -52,5 +88,21 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def database_health():
+    """Connection pool telemetry, read replica health and lazy session usage"""
+    return {"pools": get_pool_stats(), "replicas": replica_router.status(), "sessions": session_stats.snapshot()}
+
+@app.get("/health/worker")
+async def worker_health():
+    """Identity and request counters of the worker process that served this request"""
+    return worker_state.snapshot()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus exposition, aggregated across workers under serve.py"""
+    return metrics_response()
+
 if __name__ == "__main__":
+    # Development server; production uses `python serve.py` (pre-forked workers)
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -28,11 +28,16 @@ class User(Base):
     
     # Relationships
     owned_properties = relationship("Property", back_populates="owner")
-    submitted_reports = relationship("Report", back_populates="submitter")
+    submitted_reports = relationship("Report", back_populates="submitter", foreign_keys="Report.submitter_id")
     contractor_assignments = relationship("ContractorAssignment", back_populates="contractor")
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (
+        Index("ix_properties_city_property_type", "city", "property_type"),
+        Index("ix_properties_owner_id", "owner_id"),
+        Index("ix_properties_neighborhood_id", "neighborhood_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     address = Column(String, nullable=False)
@@ -41,6 +46,8 @@ class Property(Base):
     zip_code = Column(String, nullable=False)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
+    neighborhood_id = Column(String, nullable=True)  # Polygon containing (longitude, latitude), see utils/neighborhoods.py
+    geocode_precision = Column(String, nullable=True)  # address or zip when geocoded, NULL when supplied
     property_type = Column(String, nullable=False)  # single_family, condo, townhouse, etc.
     year_built = Column(Integer, nullable=True)
     square_feet = Column(Integer, nullable=True)
@@ -61,6 +68,11 @@ class Property(Base):
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("ix_reports_property_id_status", "property_id", "status"),
+        Index("ix_reports_status_created_at", "status", "created_at"),
+        Index("ix_reports_submitter_id", "submitter_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
@@ -83,6 +95,10 @@ class Report(Base):
 
 class Renovation(Base):
     __tablename__ = "renovations"
+    __table_args__ = (
+        Index("ix_renovations_property_id", "property_id"),
+        Index("ix_renovations_contractor_id_status", "contractor_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
@@ -107,6 +123,13 @@ class Renovation(Base):
 
 class CommunityUpdate(Base):
     __tablename__ = "community_updates"
+    __table_args__ = (
+        Index("ix_community_updates_neighborhood_id_update_type", "neighborhood_id", "update_type"),
+        Index("ix_community_updates_is_verified_created_at", "is_verified", "created_at"),
+        Index("ix_community_updates_property_id", "property_id"),
+        Index("ix_community_updates_duplicate_of", "duplicate_of"),
+        Index("ix_community_updates_is_verified_end_date", "is_verified", "end_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=True)  # Null for general community updates
@@ -119,6 +142,7 @@ class CommunityUpdate(Base):
     end_date = Column(DateTime, nullable=True)
     location = Column(JSON, nullable=True)  # GeoJSON or coordinates
     is_verified = Column(Boolean, default=False)
+    duplicate_of = Column(Integer, ForeignKey("community_updates.id"), nullable=True)  # First report of the same event
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -129,6 +153,10 @@ class CommunityUpdate(Base):
 
 class ContractorAssignment(Base):
     __tablename__ = "contractor_assignments"
+    __table_args__ = (
+        Index("ix_contractor_assignments_contractor_id_status", "contractor_id", "status"),
+        Index("ix_contractor_assignments_property_id", "property_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     contractor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -145,6 +173,10 @@ class ContractorAssignment(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_resource_type_resource_id", "resource_type", "resource_id"),
+        Index("ix_audit_logs_user_id", "user_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -159,3 +191,63 @@ class AuditLog(Base):
     
     # Relationships
     user = relationship("User")
+
+class NotificationJob(Base):
+    __tablename__ = "notification_jobs"
+    __table_args__ = (
+        Index("ix_notification_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    neighborhood_id = Column(String, nullable=False)
+    notification_type = Column(String, nullable=False, default="general")
+    message = Column(Text, nullable=False)
+    audience = Column(JSON, nullable=True)  # how recipients are resolved, e.g. {"bbox": [...]}
+    channels = Column(JSON, nullable=False)  # channel names, e.g. ["log"]
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    total_recipients = Column(Integer, nullable=True)  # counted when a worker first picks the job up
+    delivered = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    cursor = Column(Integer, nullable=False, default=0)  # last recipient user id handled
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    creator = relationship("User")
+
+class Notification(Base):
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # Inbox pages are keyset scans newest-first: WHERE user_id = ? [AND is_read = false] AND id < ?
+        Index("ix_notifications_user_id_id", "user_id", "id"),
+        Index("ix_notifications_user_id_is_read_id", "user_id", "is_read", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    notification_type = Column(String, nullable=False)  # project_approved, new_assignment, etc.
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    data = Column(JSON, nullable=True)  # ids of the project / assignment it refers to
+    is_read = Column(Boolean, nullable=False, default=False)
+    read_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    user = relationship("User")
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+    
+    # One row per user, updated in the same transaction as its notifications
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    last_notification_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
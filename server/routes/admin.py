@@ -1,16 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
-from models import User, Report, CommunityUpdate
+from database import get_db, get_read_db
+from models import User, Report, CommunityUpdate, NotificationJob
 from utils.auth import get_current_user
 from utils.permissions import require_role
+from utils.fast_json import fast_json_response
+from utils.fieldsets import sparse_fields
+from utils.profiling import profile_store
+from routes.community import MOCK_COMMUNITY_UPDATES, MOCK_PENDING_UPDATES, index_update, neighborhood_bbox, publish_update, unindex_update
+from routes.contractor import MOCK_ASSIGNMENTS, MOCK_PROJECT_SUBMISSIONS, AssignmentResponse
+from utils.inbox import notify_user
+from utils.neighborhoods import neighborhood_index
+from utils.notifications import NOTIFY_AUDIENCE_PADDING_M, NOTIFY_CHANNELS, channels, job_progress, notification_dispatcher
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
 
 router = APIRouter()
 
 # Pydantic models
+class AssignmentCreate(BaseModel):
+    contractor_id: int
+    property_id: int
+    assignment_type: str
+    notes: Optional[str] = None
+
 class PendingReportResponse(BaseModel):
     id: int
     property_id: int
@@ -33,6 +49,8 @@ class PendingUpdateResponse(BaseModel):
     description: Optional[str]
     impact_level: str
     is_verified: bool
+    duplicate_of: Optional[int] = None
+    duplicate_ids: List[int] = []  # other pending reports of the same event, merged into this item
     created_by: int
     created_at: datetime
     
@@ -71,44 +89,61 @@ MOCK_PENDING_REPORTS = [
     }
 ]
 
-MOCK_PENDING_UPDATES = [
-    {
-        "id": 3,
-        "property_id": None,
-        "neighborhood_id": "sf_downtown",
-        "update_type": "school",
-        "title": "New Elementary School Opening",
-        "description": "New elementary school opening in the neighborhood",
-        "impact_level": "low",
-        "is_verified": False,
-        "created_by": 1,
-        "created_at": "2024-02-01T00:00:00"
-    }
-]
+def duplicate_group(update: dict):
+    return update.get("duplicate_of") or update["id"]
+
+def collapse_duplicates(pending: List[dict]) -> List[dict]:
+    """One item per duplicate group: its earliest pending update, listing the rest in duplicate_ids"""
+    items = {}
+    for update in pending:
+        group = duplicate_group(update)
+        if group in items:
+            items[group]["duplicate_ids"].append(update["id"])
+        else:
+            items[group] = {**update, "duplicate_ids": []}
+    return list(items.values())
+
+def pop_pending_group(update_id: int) -> Optional[List[dict]]:
+    """Remove a pending update and its pending duplicates from the queue, the named one first"""
+    update = next((u for u in MOCK_PENDING_UPDATES if u["id"] == update_id), None)
+    if update is None:
+        return None
+    group = duplicate_group(update)
+    members = [update] + [u for u in MOCK_PENDING_UPDATES if u is not update and duplicate_group(u) == group]
+    MOCK_PENDING_UPDATES[:] = [u for u in MOCK_PENDING_UPDATES if duplicate_group(u) != group]
+    return members
 
 @router.get("/pending-reports", response_model=List[PendingReportResponse])
 async def get_pending_reports(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(PendingReportResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Get all pending reports for admin review"""
+    if fields:
+        return fast_json_response(MOCK_PENDING_REPORTS[skip:skip+limit], PendingReportResponse, fields)
     return MOCK_PENDING_REPORTS[skip:skip+limit]
 
 @router.get("/pending-updates", response_model=List[PendingUpdateResponse])
 async def get_pending_updates(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    collapse: bool = Query(True, description="Show each group of near-duplicate reports as one item"),
+    fields: Optional[List[str]] = Depends(sparse_fields(PendingUpdateResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Get all pending community updates for admin review"""
-    return MOCK_PENDING_UPDATES[skip:skip+limit]
+    pending = collapse_duplicates(MOCK_PENDING_UPDATES) if collapse else MOCK_PENDING_UPDATES
+    if fields:
+        return fast_json_response(pending[skip:skip+limit], PendingUpdateResponse, fields)
+    return pending[skip:skip+limit]
 
 @router.get("/stats", response_model=AdminStatsResponse)
 async def get_admin_stats(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Get admin dashboard statistics"""
@@ -124,7 +159,7 @@ async def get_admin_stats(
 @router.patch("/approve-report/{report_id}")
 async def approve_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Approve a pending report"""
@@ -144,7 +179,7 @@ async def approve_report(
 async def reject_report(
     report_id: int,
     reason: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Reject a pending report"""
@@ -163,54 +198,201 @@ async def reject_report(
 @router.patch("/approve-update/{update_id}")
 async def approve_update(
     update_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
-    """Approve a pending community update"""
-    update_index = next((i for i, u in enumerate(MOCK_PENDING_UPDATES) if u["id"] == update_id), None)
-    if update_index is None:
+    """Approve a pending community update; the rest of its duplicate group is merged into one verified report"""
+    members = pop_pending_group(update_id)
+    if members is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Community update not found"
         )
     
-    # Remove from pending and mark as verified
-    MOCK_PENDING_UPDATES.pop(update_index)
+    # One event, one live report: the verified original if there is one,
+    # otherwise the approved update; every other report in the group becomes
+    # a duplicate of it (kept, but no longer counted)
+    update = next((u for u in MOCK_COMMUNITY_UPDATES if u["id"] == update_id), None)
+    original = next((u for u in MOCK_COMMUNITY_UPDATES if update and u["id"] == update.get("duplicate_of")), None)
+    survivor = original if original and original["is_verified"] else update
+    merged = []
+    if survivor is not None:
+        member_ids = {u["id"] for u in members}
+        group_ids = member_ids | ({original["id"]} if original else set())
+        for u in MOCK_COMMUNITY_UPDATES:
+            if u is survivor or not (u["id"] in group_ids or u.get("duplicate_of") in group_ids):
+                continue
+            if u["id"] in member_ids or u.get("duplicate_of") != survivor["id"]:
+                u["duplicate_of"] = survivor["id"]
+                index_update(u)
+                merged.append(u["id"])
+        if not survivor["is_verified"]:
+            survivor["is_verified"] = True
+            survivor["duplicate_of"] = None
+            index_update(survivor)
+            await publish_update("verified", survivor)
     
-    return {"message": f"Community update {update_id} approved successfully"}
+    return {
+        "message": f"Community update {update_id} approved successfully",
+        "verified_id": survivor["id"] if survivor else None,
+        "merged_ids": merged
+    }
 
 @router.patch("/reject-update/{update_id}")
 async def reject_update(
     update_id: int,
     reason: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
-    """Reject a pending community update"""
-    update_index = next((i for i, u in enumerate(MOCK_PENDING_UPDATES) if u["id"] == update_id), None)
-    if update_index is None:
+    """Reject a pending community update along with its pending near-duplicates"""
+    members = pop_pending_group(update_id)
+    if members is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Community update not found"
         )
     
-    # Remove from pending
-    MOCK_PENDING_UPDATES.pop(update_index)
+    # Rejected reports leave the live set and every index
+    rejected_ids = {u["id"] for u in members}
+    MOCK_COMMUNITY_UPDATES[:] = [u for u in MOCK_COMMUNITY_UPDATES if u["id"] not in rejected_ids]
+    for rejected_id in rejected_ids:
+        unindex_update(rejected_id)
     
-    return {"message": f"Community update {update_id} rejected successfully"}
+    return {
+        "message": f"Community update {update_id} rejected successfully",
+        "rejected_ids": [u["id"] for u in members]
+    }
 
-@router.post("/notify-neighborhood/{neighborhood_id}")
+@router.patch("/approve-project/{project_id}")
+async def approve_project(
+    project_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """Verify a contractor's project submission and notify the contractor"""
+    project = next((p for p in MOCK_PROJECT_SUBMISSIONS if p["id"] == project_id), None)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    # Verified only once the notification has committed, so a failed
+    # request can be retried and still notifies
+    await notify_user(
+        db, project["contractor_id"], "project_approved", "Project Approved",
+        f"Your project \"{project['title']}\" has been approved",
+        data={"project_id": project_id}
+    )
+    project["is_verified"] = True
+    
+    return {"message": f"Project {project_id} approved successfully"}
+
+@router.post("/assignments", response_model=AssignmentResponse)
+async def create_assignment(
+    assignment_data: AssignmentCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """Assign a contractor to a property and notify them"""
+    new_assignment = {
+        "id": max((a["id"] for a in MOCK_ASSIGNMENTS), default=0) + 1,
+        **assignment_data.dict(),
+        "status": "assigned",
+        "assigned_date": datetime.utcnow().isoformat(),
+        "completed_date": None
+    }
+    MOCK_ASSIGNMENTS.append(new_assignment)  # reserves the id the notification refers to
+    try:
+        await notify_user(
+            db, new_assignment["contractor_id"], "new_assignment", "New Assignment",
+            f"You have been assigned a new {new_assignment['assignment_type']} at property {new_assignment['property_id']}",
+            data={"assignment_id": new_assignment["id"], "property_id": new_assignment["property_id"]}
+        )
+    except Exception:
+        # No notification, no assignment: a retry must not leave a silent duplicate
+        MOCK_ASSIGNMENTS.remove(new_assignment)
+        raise
+    return new_assignment
+
+@router.post("/notify-neighborhood/{neighborhood_id}", status_code=status.HTTP_202_ACCEPTED)
 async def notify_neighborhood(
     neighborhood_id: str,
     message: str,
     notification_type: str = "general",
-    db: Session = Depends(get_db),
+    channel: Optional[List[str]] = Query(None, description="Delivery channels (default NOTIFY_CHANNELS)"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
-    """Send notification to a neighborhood"""
-    # Mock implementation
+    """Queue a notification to a neighborhood; delivery runs in the background"""
+    channel_names = channel or NOTIFY_CHANNELS
+    unknown = sorted(set(channel_names) - set(channels))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown channels: {', '.join(unknown)}"
+        )
+    if neighborhood_id in neighborhood_index:
+        audience = {"neighborhood_id": neighborhood_id}
+    else:
+        # No boundary polygon: fall back to the extent of the neighborhood's updates
+        bbox = neighborhood_bbox(neighborhood_id, NOTIFY_AUDIENCE_PADDING_M)
+        if bbox is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Neighborhood not found"
+            )
+        audience = {"bbox": list(bbox)}
+    job = await notification_dispatcher.enqueue(
+        db,
+        neighborhood_id=neighborhood_id,
+        message=message,
+        notification_type=notification_type,
+        channel_names=channel_names,
+        audience=audience,
+        created_by=current_user.id
+    )
     return {
-        "message": f"Notification sent to neighborhood {neighborhood_id}",
+        "message": f"Notification queued for neighborhood {neighborhood_id}",
+        "job_id": job.id,
+        "status": job.status,
         "notification_type": notification_type,
         "content": message
     }
+
+@router.get("/notifications/{job_id}")
+async def get_notification_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """Delivery progress of a queued neighborhood notification"""
+    job = await db.get(NotificationJob, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification job not found"
+        )
+    return job_progress(job)
+
+@router.get("/profiles")
+async def list_profiles(
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """List recent request profiles captured by any worker"""
+    return await asyncio.to_thread(profile_store.list)
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(
+    profile_id: str,
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """Folded stacks of a profile (input for flamegraph.pl or speedscope)"""
+    profile = await asyncio.to_thread(profile_store.get, profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found (only the most recent PROFILE_BUFFER_SIZE are kept)"
+        )
+    return profile.folded()
@@ -1,19 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from database import get_db
+from database import get_db, get_read_db
 from models import User, UserRole
 from utils.auth import get_current_user
 from pydantic import BaseModel
 from datetime import datetime
-import firebase_admin
-from firebase_admin import auth as firebase_auth
+from functools import lru_cache
 import os
 
 router = APIRouter()
 security = HTTPBearer()
 
+@lru_cache(maxsize=1)
+def firebase_auth():
+    """firebase_admin.auth, imported on first use (it adds ~100 ms to every worker boot)"""
+    from firebase_admin import auth
+    return auth
+
 # Pydantic models
 class UserResponse(BaseModel):
     id: int
@@ -101,12 +106,12 @@ MOCK_USERS = [
 @router.post("/login", response_model=LoginResponse)
 async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Login with Firebase ID token"""
     try:
         # In production, verify the Firebase ID token
-        # decoded_token = firebase_auth.verify_id_token(login_data.id_token)
+        # decoded_token = firebase_auth().verify_id_token(login_data.id_token)
         # firebase_uid = decoded_token['uid']
         
         # For development, use mock verification
@@ -138,7 +143,7 @@ async def login(
 @router.post("/register", response_model=UserResponse)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new user"""
     # Check if user already exists
@@ -205,7 +210,7 @@ async def get_all_users(
     skip: int = 0,
     limit: int = 100,
     role: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all users (admin only)"""
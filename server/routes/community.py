@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional
+from database import get_db, get_read_db
 from models import CommunityUpdate, User
 from utils.auth import get_current_user
 from utils.permissions import require_role
+from utils.fast_json import FAST_JSON_RESPONSES, fast_json_item, fast_json_response
+from utils.fieldsets import sparse_fields
+from utils.geo import BBox, bbox_around, geometry_bbox, validate_geometry
+from utils.spatial_index import GridIndex
+from utils.interval_index import MAX_TIME, MIN_TIME, IntervalIndex, as_naive_utc
+from utils.impact import ImpactIndex
+from utils.dedup import DuplicateIndex
+from utils.archive import Archiver, UpdateArchive, archive_cutoff, is_archivable
+from utils.lifecycle import on_shutdown
+from utils.pubsub import feed_broker, sse_stream
 from pydantic import BaseModel
 from datetime import datetime
+from collections import defaultdict
+import asyncio
+import itertools
+import os
 
 router = APIRouter()
 
+FEED_HEARTBEAT_SECONDS = float(os.getenv("FEED_HEARTBEAT_SECONDS", "15"))
+
 # Pydantic models
 class CommunityUpdateResponse(BaseModel):
     id: int
@@ -23,12 +40,29 @@ class CommunityUpdateResponse(BaseModel):
     end_date: Optional[datetime]
     location: Optional[dict]
     is_verified: bool
+    duplicate_of: Optional[int] = None
     created_by: int
     created_at: datetime
+    archived_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
 
+class NextEventResponse(BaseModel):
+    id: int
+    title: str
+    update_type: str
+    impact_level: str
+    start_date: datetime
+
+class NeighborhoodImpactResponse(BaseModel):
+    neighborhood_id: str
+    active_updates: int
+    active_by_type: Dict[str, int]
+    impact_score: float
+    next_event: Optional[NextEventResponse]
+    as_of: datetime
+
 class CommunityUpdateCreate(BaseModel):
     property_id: Optional[int] = None
     neighborhood_id: Optional[str] = None
@@ -38,7 +72,7 @@ class CommunityUpdateCreate(BaseModel):
     impact_level: str
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
-    location: Optional[dict] = None
+    location: Optional[dict] = None  # GeoJSON geometry
 
 # Mock data
 MOCK_COMMUNITY_UPDATES = [
@@ -98,6 +132,161 @@ MOCK_COMMUNITY_UPDATES = [
     }
 ]
 
+# Unverified submissions awaiting admin review (routes/admin.py)
+MOCK_PENDING_UPDATES = [
+    {
+        "id": 3,
+        "property_id": None,
+        "neighborhood_id": "sf_downtown",
+        "update_type": "school",
+        "title": "New Elementary School Opening",
+        "description": "New elementary school opening in the neighborhood",
+        "impact_level": "low",
+        "is_verified": False,
+        "created_by": 1,
+        "created_at": "2024-02-01T00:00:00"
+    }
+]
+
+# In-memory indexes kept in sync by the write endpoints below: geometries for
+# spatial lookups, [start_date, end_date] intervals (globally and per
+# neighborhood) for active_at / overlaps queries, per-neighborhood impact
+# aggregates, and text signatures of recent updates for duplicate detection
+community_index = GridIndex()
+active_index = IntervalIndex()
+neighborhood_active: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+_indexed_neighborhood: Dict[int, Optional[str]] = {}
+impact_index = ImpactIndex()
+duplicate_index = DuplicateIndex()
+
+def index_update(update: dict):
+    unindex_update(update["id"])
+    if update.get("location"):
+        community_index.insert(update["id"], update["location"], update)
+    active_index.insert(update["id"], update.get("start_date"), update.get("end_date"), update)
+    if update.get("neighborhood_id"):
+        neighborhood_active[update["neighborhood_id"]].insert(
+            update["id"], update.get("start_date"), update.get("end_date"), update
+        )
+    _indexed_neighborhood[update["id"]] = update.get("neighborhood_id")
+    if not update.get("duplicate_of"):
+        # A duplicate reports an event its original already counts
+        impact_index.upsert(update["id"], update)
+    duplicate_index.upsert(update["id"], update)
+
+def unindex_update(update_id: int):
+    community_index.remove(update_id)
+    active_index.remove(update_id)
+    impact_index.remove(update_id)
+    duplicate_index.remove(update_id)
+    neighborhood_id = _indexed_neighborhood.pop(update_id, None)
+    if neighborhood_id in neighborhood_active:
+        neighborhood_active[neighborhood_id].remove(update_id)
+
+def neighborhood_bbox(neighborhood_id: str, padding_m: float = 0) -> Optional[BBox]:
+    """Extent of a neighborhood's geolocated updates, padded by padding_m on every side"""
+    boxes = [geometry_bbox(u["location"]) for u in MOCK_COMMUNITY_UPDATES
+             if u.get("neighborhood_id") == neighborhood_id and u.get("location")]
+    if not boxes:
+        return None
+    low = bbox_around(min(b[0] for b in boxes), min(b[1] for b in boxes), padding_m)
+    high = bbox_around(max(b[2] for b in boxes), max(b[3] for b in boxes), padding_m)
+    return low[0], low[1], high[2], high[3]
+
+# Verified updates that ended more than ARCHIVE_AFTER_DAYS ago move out of the
+# hot set into compressed monthly files; include_archived=true reads them back
+update_archive = UpdateArchive()
+
+async def archive_expired_updates(now: Optional[datetime] = None) -> int:
+    """Move expired, verified updates from the hot set to the archive"""
+    cutoff = archive_cutoff(now)
+    expired = [u for u in MOCK_COMMUNITY_UPDATES if is_archivable(u, cutoff)]
+    if not expired:
+        return 0
+    await asyncio.to_thread(update_archive.append, expired)
+    archived_ids = {u["id"] for u in expired}
+    MOCK_COMMUNITY_UPDATES[:] = [u for u in MOCK_COMMUNITY_UPDATES if u["id"] not in archived_ids]
+    for update_id in archived_ids:
+        unindex_update(update_id)
+    return len(expired)
+
+update_archiver = Archiver(archive_expired_updates)
+on_shutdown(update_archiver.stop)
+
+async def archived_updates(neighborhood_id: Optional[str] = None, active_at: Optional[datetime] = None,
+                           overlaps: Optional[list] = None) -> List[dict]:
+    """Archived updates not also still live, optionally only those active at an instant / during from,to"""
+    active_at = as_naive_utc(active_at, None)
+    low, high = (as_naive_utc(overlaps[0], MIN_TIME), as_naive_utc(overlaps[1], MAX_TIME)) if overlaps else (MIN_TIME, MAX_TIME)
+    # Months that ended before either bound can't match
+    ended_after = max(active_at or MIN_TIME, low)
+    live_ids = {u["id"] for u in MOCK_COMMUNITY_UPDATES}
+    updates = await asyncio.to_thread(lambda: list(update_archive.updates(neighborhood_id, ended_after)))
+    matching = []
+    for update in updates:
+        if update["id"] in live_ids:
+            continue
+        start = as_naive_utc(update.get("start_date"), MIN_TIME)
+        end = as_naive_utc(update.get("end_date"), MAX_TIME)
+        if active_at is not None and not start <= active_at <= end:
+            continue
+        if not (start <= high and end >= low):
+            continue
+        matching.append(update)
+    return matching
+
+def iso_datetime(value: str) -> datetime:
+    """ISO date or datetime; a bare date means its midnight"""
+    return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+
+def parse_active_at(active_at: str) -> datetime:
+    try:
+        return iso_datetime(active_at)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="active_at must be an ISO date or datetime, e.g. 2024-03-01 or 2024-03-01T12:00:00"
+        )
+
+def parse_overlaps(overlaps: str):
+    """`from,to` with ISO dates or datetimes; either side may be empty for an open range"""
+    parts = overlaps.split(",")
+    try:
+        if len(parts) != 2:
+            raise ValueError
+        low, high = [iso_datetime(part) if part.strip() else None for part in parts]
+        if low is not None and high is not None and as_naive_utc(high, MIN_TIME) < as_naive_utc(low, MIN_TIME):
+            raise ValueError
+        return [low, high]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="overlaps must be 'from,to' ISO dates or datetimes with from <= to, e.g. 2024-03-01,2024-03-31"
+        )
+
+async def publish_update(event_type: str, update: dict):
+    """Push a verified update to its neighborhood's live feed"""
+    if update.get("neighborhood_id") and update.get("is_verified"):
+        data = CommunityUpdateResponse.model_validate(update).model_dump(mode="json")
+        await feed_broker.publish(update["neighborhood_id"], event_type, data)
+
+def check_location(location: Optional[dict]):
+    if location is None:
+        return
+    try:
+        validate_geometry(location)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid location: {e}"
+        )
+
+for mock_update in MOCK_COMMUNITY_UPDATES:
+    index_update(mock_update)
+
+# Never reuse an id, even once its update has been archived or deleted
+update_ids = itertools.count(max(u["id"] for u in MOCK_COMMUNITY_UPDATES) + 1)
+
 @router.get("/", response_model=List[CommunityUpdateResponse])
 async def get_community_updates(
     skip: int = 0,
@@ -105,11 +294,43 @@ async def get_community_updates(
     neighborhood_id: Optional[str] = None,
     update_type: Optional[str] = None,
     impact_level: Optional[str] = None,
-    db: Session = Depends(get_db),
+    active_at: Optional[str] = Query(None, description="Only updates active at this instant (ISO date or datetime)"),
+    overlaps: Optional[str] = Query(None, description="Only updates active at some point in from,to (ISO dates or datetimes)"),
+    include_archived: bool = Query(False, description="Also return expired updates moved to the archive, after the live ones"),
+    fields: Optional[List[str]] = Depends(sparse_fields(CommunityUpdateResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get community updates with optional filtering"""
-    updates = MOCK_COMMUNITY_UPDATES[skip:skip+limit]
+    if active_at is not None:
+        active_at = parse_active_at(active_at)
+    if active_at is not None or overlaps is not None:
+        # Interval index lookup, then the remaining filters, then paging
+        index = neighborhood_active.get(neighborhood_id) if neighborhood_id else active_index
+        matches = None
+        if index is not None and active_at is not None:
+            matches = set(index.at(active_at))
+        if index is not None and overlaps is not None:
+            found = set(index.overlapping(*parse_overlaps(overlaps)))
+            matches = found if matches is None else matches & found
+        updates = [index.payload(key) for key in sorted(matches or ())]
+        if include_archived:
+            updates += await archived_updates(
+                neighborhood_id, active_at, parse_overlaps(overlaps) if overlaps is not None else None
+            )
+        if update_type:
+            updates = [u for u in updates if u["update_type"] == update_type]
+        if impact_level:
+            updates = [u for u in updates if u["impact_level"] == impact_level]
+        updates = updates[skip:skip+limit]
+        if fields or FAST_JSON_RESPONSES:
+            return fast_json_response(updates, CommunityUpdateResponse, fields)
+        return updates
+
+    updates = MOCK_COMMUNITY_UPDATES
+    if include_archived:
+        updates = updates + await archived_updates(neighborhood_id)
+    updates = updates[skip:skip+limit]
     
     # Apply filters
     if neighborhood_id:
@@ -119,45 +340,93 @@ async def get_community_updates(
     if impact_level:
         updates = [u for u in updates if u["impact_level"] == impact_level]
     
+    if fields or FAST_JSON_RESPONSES:
+        return fast_json_response(updates, CommunityUpdateResponse, fields)
     return updates
 
+@router.get("/neighborhoods/{neighborhood_id}/feed")
+async def neighborhood_feed(
+    neighborhood_id: str,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event id"),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_user: User = Depends(get_current_user)
+):
+    """Server-sent events for updates created or verified in a neighborhood"""
+    # Browsers resend Last-Event-ID on reconnect; the query param covers clients that can't set headers
+    resume_after = last_event_id_header if last_event_id_header is not None else last_event_id
+    subscription = feed_broker.subscribe(neighborhood_id, resume_after)
+    return StreamingResponse(
+        sse_stream(subscription, FEED_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/neighborhoods/{neighborhood_id}/impact", response_model=NeighborhoodImpactResponse)
+async def get_neighborhood_impact(
+    neighborhood_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Active disruption summary for a neighborhood: counts by type, weighted score, next event"""
+    summary = impact_index.summary(neighborhood_id)
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Neighborhood not found"
+        )
+    return summary
+
 @router.get("/{update_id}", response_model=CommunityUpdateResponse)
 async def get_community_update(
     update_id: int,
-    db: Session = Depends(get_db),
+    include_archived: bool = False,
+    fields: Optional[List[str]] = Depends(sparse_fields(CommunityUpdateResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific community update by ID"""
     update = next((u for u in MOCK_COMMUNITY_UPDATES if u["id"] == update_id), None)
+    if not update and include_archived:
+        update = await asyncio.to_thread(update_archive.get, update_id)
     if not update:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Community update not found"
         )
+    if fields:
+        return fast_json_item(update, CommunityUpdateResponse, fields)
     return update
 
 @router.post("/", response_model=CommunityUpdateResponse)
 async def create_community_update(
     update_data: CommunityUpdateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Create a new community update"""
+    """Create a new community update; unverified ones go to the admin queue, grouped with near-duplicates"""
+    check_location(update_data.location)
     new_update = {
-        "id": len(MOCK_COMMUNITY_UPDATES) + 1,
+        "id": next(update_ids),
         "created_by": current_user.id,
         **update_data.dict(),
         "is_verified": current_user.role == "admin",
+        "duplicate_of": None,
         "created_at": datetime.utcnow().isoformat()
     }
+    if not new_update["is_verified"]:
+        match = duplicate_index.find(new_update)
+        if match:
+            new_update["duplicate_of"] = match[0]
+        MOCK_PENDING_UPDATES.append(new_update)
     MOCK_COMMUNITY_UPDATES.append(new_update)
+    index_update(new_update)
+    await publish_update("created", new_update)
     return new_update
 
 @router.put("/{update_id}", response_model=CommunityUpdateResponse)
 async def update_community_update(
     update_id: int,
     update_data: CommunityUpdateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a community update"""
@@ -178,14 +447,16 @@ async def update_community_update(
     
     # Update the community update
     update_dict = update_data.dict(exclude_unset=True)
+    check_location(update_dict.get("location"))
     MOCK_COMMUNITY_UPDATES[update_index].update(update_dict)
+    index_update(MOCK_COMMUNITY_UPDATES[update_index])
     
     return MOCK_COMMUNITY_UPDATES[update_index]
 
 @router.delete("/{update_id}")
 async def delete_community_update(
     update_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Delete a community update (admin only)"""
@@ -197,4 +468,6 @@ async def delete_community_update(
         )
     
     MOCK_COMMUNITY_UPDATES.pop(update_index)
+    MOCK_PENDING_UPDATES[:] = [u for u in MOCK_PENDING_UPDATES if u["id"] != update_id]
+    unindex_update(update_id)
     return {"message": "Community update deleted successfully"}
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
 from models import User, ContractorAssignment, Renovation
 from utils.auth import get_current_user
 from utils.permissions import require_role
+from utils.fast_json import fast_json_response
+from utils.fieldsets import sparse_fields
+from utils.inbox import (
+    INBOX_LONG_POLL_SECONDS, INBOX_MAX_PAGE_SIZE, INBOX_PAGE_SIZE, inbox_page, mark_read, unread_count,
+    wait_for_notifications
+)
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -56,6 +62,22 @@ class AssignmentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class NotificationResponse(BaseModel):
+    id: int
+    type: str
+    title: str
+    message: str
+    data: Optional[dict]
+    created_at: datetime
+    read: bool
+    
+    class Config:
+        from_attributes = True
+
+class MarkReadRequest(BaseModel):
+    ids: Optional[List[int]] = None  # omit both fields to mark everything read
+    up_to_id: Optional[int] = None
+
 # Mock data
 MOCK_PROJECT_SUBMISSIONS = [
     {
@@ -130,7 +152,8 @@ async def get_contractor_assignments(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(AssignmentResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role(["contractor"]))
 ):
     """Get assignments for the current contractor"""
@@ -143,6 +166,8 @@ async def get_contractor_assignments(
     if status:
         assignments = [a for a in assignments if a["status"] == status]
     
+    if fields:
+        return fast_json_response(assignments, AssignmentResponse, fields)
     return assignments
 
 @router.get("/projects", response_model=List[ProjectSubmissionResponse])
@@ -150,7 +175,8 @@ async def get_contractor_projects(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(ProjectSubmissionResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role(["contractor"]))
 ):
     """Get project submissions for the current contractor"""
@@ -163,12 +189,14 @@ async def get_contractor_projects(
     if status:
         projects = [p for p in projects if p["status"] == status]
     
+    if fields:
+        return fast_json_response(projects, ProjectSubmissionResponse, fields)
     return projects
 
 @router.post("/project-submission", response_model=ProjectSubmissionResponse)
 async def submit_project(
     project_data: ProjectSubmissionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["contractor"]))
 ):
     """Submit a new project"""
@@ -187,7 +215,7 @@ async def submit_project(
 async def update_project(
     project_id: int,
     project_data: ProjectSubmissionCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["contractor"]))
 ):
     """Update a project submission"""
@@ -216,7 +244,7 @@ async def update_project(
 async def complete_project(
     project_id: int,
     completion_notes: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["contractor"]))
 ):
     """Mark a project as completed"""
@@ -242,30 +270,44 @@ async def complete_project(
     
     return {"message": f"Project {project_id} marked as completed"}
 
-@router.get("/notifications")
+@router.get("/notifications", response_model=List[NotificationResponse])
 async def get_contractor_notifications(
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(INBOX_PAGE_SIZE, ge=1, le=INBOX_MAX_PAGE_SIZE),
+    before_id: Optional[int] = Query(None, description="Id of the last notification on the previous page"),
+    unread_only: bool = False,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(require_role(["contractor"]))
 ):
-    """Get notifications for the contractor"""
-    # Mock notifications
-    notifications = [
-        {
-            "id": 1,
-            "type": "project_approved",
-            "title": "Project Approved",
-            "message": "Your kitchen renovation project has been approved",
-            "created_at": "2024-02-01T00:00:00",
-            "read": False
-        },
-        {
-            "id": 2,
-            "type": "new_assignment",
-            "title": "New Assignment",
-            "message": "You have been assigned to a new bathroom renovation project",
-            "created_at": "2024-01-25T00:00:00",
-            "read": True
-        }
-    ]
-    
+    """Get notifications for the contractor, newest first"""
+    notifications = await inbox_page(db, current_user.id, limit=limit, before_id=before_id, unread_only=unread_only)
+    response.headers["X-Unread-Count"] = str(await unread_count(db, current_user.id))
     return notifications
+
+@router.get("/notifications/unread-count")
+async def get_unread_notification_count(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(require_role(["contractor"]))
+):
+    """Unread badge count"""
+    return {"unread_count": await unread_count(db, current_user.id)}
+
+@router.get("/notifications/poll", response_model=List[NotificationResponse])
+async def poll_contractor_notifications(
+    after_id: int = Query(0, ge=0, description="Highest notification id the client has seen"),
+    timeout: float = Query(INBOX_LONG_POLL_SECONDS, ge=0, le=INBOX_LONG_POLL_SECONDS),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["contractor"]))
+):
+    """Long-poll for notifications newer than after_id; empty list when timeout passes first"""
+    return await wait_for_notifications(db, current_user.id, after_id, timeout)
+
+@router.post("/notifications/mark-read")
+async def mark_notifications_read(
+    mark_data: MarkReadRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["contractor"]))
+):
+    """Mark the given notifications, those up to up_to_id, or all of them as read"""
+    changed = await mark_read(db, current_user.id, ids=mark_data.ids, up_to_id=mark_data.up_to_id)
+    return {"marked_read": changed, "unread_count": await unread_count(db, current_user.id)}
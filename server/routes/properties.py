@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
 from models import Property, User, Report, Renovation, CommunityUpdate
 from utils.auth import get_current_user
 from utils.permissions import require_role
+from utils.fast_json import FAST_JSON_RESPONSES, fast_json_item, fast_json_response
+from utils.fieldsets import sparse_fields
+from routes.community import MOCK_COMMUNITY_UPDATES, CommunityUpdateResponse, community_index
+from utils.neighborhoods import neighborhood_index
+from utils.geocoding import geocoder
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -25,6 +30,7 @@ class PropertyResponse(BaseModel):
     bedrooms: Optional[int]
     bathrooms: Optional[float]
     lot_size: Optional[float]
+    neighborhood_id: Optional[str] = None
     is_verified: bool
     verification_date: Optional[datetime]
     
@@ -59,6 +65,9 @@ class PropertyUpdate(BaseModel):
     bathrooms: Optional[float] = None
     lot_size: Optional[float] = None
 
+class NearbyUpdateResponse(CommunityUpdateResponse):
+    distance_m: float
+
 # Mock data for development
 MOCK_PROPERTIES = [
     {
@@ -114,15 +123,39 @@ MOCK_PROPERTIES = [
     }
 ]
 
+def assign_neighborhood(property_data: dict):
+    property_data["neighborhood_id"] = neighborhood_index.assign(property_data.get("longitude"), property_data.get("latitude"))
+
+async def fill_coordinates(property_data: dict):
+    """Local-only geocode (gazetteer, cache) when coordinates are missing; jobs.geocode_properties does the rest
+
+    Only address matches are stored: a zip centroid would hide the property
+    from the job, which only picks up missing or zip-precision coordinates.
+    """
+    if property_data.get("latitude") is not None and property_data.get("longitude") is not None:
+        return
+    result = await geocoder.geocode(
+        property_data.get("address"), property_data.get("city"), property_data.get("state"),
+        property_data.get("zip_code"), remote=False
+    )
+    if result and result.precision == "address":
+        property_data["latitude"], property_data["longitude"] = result.latitude, result.longitude
+        property_data["geocode_precision"] = result.precision
+
+for mock_property in MOCK_PROPERTIES:
+    assign_neighborhood(mock_property)
+
 @router.get("/", response_model=List[PropertyResponse])
 async def get_properties(
     skip: int = 0,
     limit: int = 100,
     city: Optional[str] = None,
     property_type: Optional[str] = None,
+    neighborhood_id: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(PropertyResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all properties with optional filtering"""
@@ -134,13 +167,18 @@ async def get_properties(
         properties = [p for p in properties if p["city"].lower() == city.lower()]
     if property_type:
         properties = [p for p in properties if p["property_type"] == property_type]
+    if neighborhood_id:
+        properties = [p for p in properties if p["neighborhood_id"] == neighborhood_id]
     
+    if fields or FAST_JSON_RESPONSES:
+        return fast_json_response(properties, PropertyResponse, fields)
     return properties
 
 @router.get("/{property_id}", response_model=PropertyResponse)
 async def get_property(
     property_id: int,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(PropertyResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific property by ID"""
@@ -151,12 +189,59 @@ async def get_property(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Property not found"
         )
+    if fields:
+        return fast_json_item(property_data, PropertyResponse, fields)
     return property_data
 
+@router.get("/{property_id}/nearby-updates", response_model=List[NearbyUpdateResponse])
+async def get_nearby_updates(
+    property_id: int,
+    radius: float = Query(500, gt=0, le=20000, description="Meters from the property"),
+    limit: int = Query(50, gt=0, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Community updates whose geometry lies within radius meters of a property, nearest first"""
+    property_data = next((p for p in MOCK_PROPERTIES if p["id"] == property_id), None)
+    if not property_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    if property_data["latitude"] is None or property_data["longitude"] is None:
+        return []
+
+    updates = [
+        {**update, "distance_m": round(distance, 1)}
+        for _, update, distance in community_index.nearby(
+            property_data["longitude"], property_data["latitude"], radius, limit
+        )
+    ]
+    if FAST_JSON_RESPONSES:
+        return fast_json_response(updates, NearbyUpdateResponse)
+    return updates
+
+@router.get("/{property_id}/neighborhood-updates", response_model=List[CommunityUpdateResponse])
+async def get_neighborhood_updates(
+    property_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Community updates posted for the neighborhood the property lies in"""
+    property_data = next((p for p in MOCK_PROPERTIES if p["id"] == property_id), None)
+    if not property_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    if not property_data.get("neighborhood_id"):
+        return []
+    return [u for u in MOCK_COMMUNITY_UPDATES if u["neighborhood_id"] == property_data["neighborhood_id"]]
+
 @router.post("/", response_model=PropertyResponse)
 async def create_property(
     property_data: PropertyCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin", "homeowner"]))
 ):
     """Create a new property (admin or homeowner only)"""
@@ -165,8 +250,11 @@ async def create_property(
         "id": len(MOCK_PROPERTIES) + 1,
         **property_data.dict(),
         "is_verified": False,
-        "verification_date": None
+        "verification_date": None,
+        "geocode_precision": None
     }
+    await fill_coordinates(new_property)
+    assign_neighborhood(new_property)
     MOCK_PROPERTIES.append(new_property)
     return new_property
 
@@ -174,7 +262,7 @@ async def create_property(
 async def update_property(
     property_id: int,
     property_data: PropertyUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin", "homeowner"]))
 ):
     """Update a property (admin or homeowner only)"""
@@ -188,14 +276,22 @@ async def update_property(
     
     # Update the property
     update_data = property_data.dict(exclude_unset=True)
+    if {"latitude", "longitude"} & update_data.keys():
+        update_data["geocode_precision"] = None  # supplied by the client
+    elif {"address", "city", "state", "zip_code"} & update_data.keys():
+        # Moved without new coordinates: the old ones no longer apply
+        update_data.update(latitude=None, longitude=None, geocode_precision=None)
     MOCK_PROPERTIES[property_index].update(update_data)
+    if "latitude" in update_data or "longitude" in update_data:
+        await fill_coordinates(MOCK_PROPERTIES[property_index])
+        assign_neighborhood(MOCK_PROPERTIES[property_index])
     
     return MOCK_PROPERTIES[property_index]
 
 @router.delete("/{property_id}")
 async def delete_property(
     property_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Delete a property (admin only)"""
@@ -213,7 +309,7 @@ async def delete_property(
 @router.post("/{property_id}/claim")
 async def claim_property(
     property_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["homeowner"]))
 ):
     """Claim ownership of a property (homeowner only)"""
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from database import get_db, get_read_db
 from models import Report, User, Property
 from utils.auth import get_current_user
 from utils.permissions import require_role
+from utils.fast_json import FAST_JSON_RESPONSES, fast_json_item, fast_json_response
+from utils.fieldsets import sparse_fields
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -19,7 +21,7 @@ class ReportResponse(BaseModel):
     title: str
     description: Optional[str]
     report_data: Optional[dict]
-    attachments: Optional[dict]
+    attachments: Optional[Union[list, dict]]
     status: str
     reviewed_by: Optional[int]
     reviewed_at: Optional[datetime]
@@ -34,13 +36,13 @@ class ReportCreate(BaseModel):
     title: str
     description: Optional[str] = None
     report_data: Optional[dict] = None
-    attachments: Optional[dict] = None
+    attachments: Optional[Union[list, dict]] = None
 
 class ReportUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     report_data: Optional[dict] = None
-    attachments: Optional[dict] = None
+    attachments: Optional[Union[list, dict]] = None
     status: Optional[str] = None
 
 # Mock data
@@ -91,7 +93,8 @@ async def get_reports(
     property_id: Optional[int] = None,
     status: Optional[str] = None,
     report_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(ReportResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get reports with optional filtering"""
@@ -105,12 +108,15 @@ async def get_reports(
     if report_type:
         reports = [r for r in reports if r["report_type"] == report_type]
     
+    if fields or FAST_JSON_RESPONSES:
+        return fast_json_response(reports, ReportResponse, fields)
     return reports
 
 @router.get("/{report_id}", response_model=ReportResponse)
 async def get_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    fields: Optional[List[str]] = Depends(sparse_fields(ReportResponse)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific report by ID"""
@@ -120,12 +126,14 @@ async def get_report(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found"
         )
+    if fields:
+        return fast_json_item(report, ReportResponse, fields)
     return report
 
 @router.post("/", response_model=ReportResponse)
 async def create_report(
     report_data: ReportCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Create a new report"""
@@ -145,7 +153,7 @@ async def create_report(
 async def update_report(
     report_id: int,
     report_data: ReportUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Update a report"""
@@ -173,7 +181,7 @@ async def update_report(
 @router.patch("/{report_id}/approve")
 async def approve_report(
     report_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Approve a report (admin only)"""
@@ -196,7 +204,7 @@ async def approve_report(
 async def reject_report(
     report_id: int,
     reason: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(["admin"]))
 ):
     """Reject a report (admin only)"""
@@ -1,12 +1,13 @@
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine
-from models import Base, User, Property, Report, Renovation, CommunityUpdate, ContractorAssignment, AuditLog
+from database import SessionLocal
+from models import User, Property, Report, Renovation, CommunityUpdate, ContractorAssignment, AuditLog
+from utils.migrations import upgrade_to_head
 from datetime import datetime
 import json
 
 def create_sample_data():
     """Create sample data for development and testing"""
-    Base.metadata.create_all(bind=engine)
+    upgrade_to_head()
     
     db = SessionLocal()
     
@@ -0,0 +1,244 @@
+"""Production entry point: a pre-forking master running uvicorn workers.
+
+The master imports the app once (so workers share its memory pages through
+fork copy-on-write), binds the listening socket, forks WEB_CONCURRENCY
+workers and respawns any that exit. Each worker runs uvicorn on the shared
+socket and exits after roughly MAX_REQUESTS requests so slow leaks are
+contained. SIGTERM/SIGINT drains: workers stop accepting, finish in-flight
+requests (up to GRACEFUL_TIMEOUT), run shutdown hooks that flush
+background queues, then exit; the master waits for them. SIGHUP replaces
+workers one at a time.
+
+    cd server
+    python serve.py                       # workers = CPU count, port 8000
+    WEB_CONCURRENCY=4 PORT=8080 python serve.py
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+import uvicorn
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+for path in (SERVER_DIR, os.path.join(SERVER_DIR, "models")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+logger = logging.getLogger("homefax.serve")
+
+def mark_worker_dead(pid: int):
+    # Imported late: PROMETHEUS_MULTIPROC_DIR must be set before prometheus_client loads
+    from utils.metrics import mark_worker_dead as mark_metrics_dead
+    mark_metrics_dead(pid)
+
+class WorkerServer(uvicorn.Server):
+    def handle_exit(self, sig, frame):
+        from utils.lifecycle import begin_drain
+        begin_drain()
+        super().handle_exit(sig, frame)
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock: socket.socket, index: int, args) -> int:
+    """Body of a forked worker process; returns its exit code"""
+    # Signals go back to defaults; uvicorn installs its own SIGTERM/SIGINT handlers
+    for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD):
+        signal.signal(sig, signal.SIG_DFL)
+    random.seed()
+
+    # Pooled connections must never be shared across fork; drop the master's (if any).
+    # The async engines are left alone: the master never connects them, and
+    # disposing rebuilds their pools with a threading first-connect lock that
+    # deadlocks the event loop when two tasks connect at once.
+    from database import engine
+    engine.dispose(close=False)
+
+    max_requests = None
+    if args.max_requests:
+        max_requests = args.max_requests + random.randint(0, args.max_requests_jitter)
+    from utils.lifecycle import worker_state
+    worker_state.reset(index=index, max_requests=max_requests)
+
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=args.access_log,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        limit_max_requests=max_requests,
+    )
+    server = WorkerServer(config)
+    server.run(sockets=[sock])
+    return 0 if server.started else 3
+
+class Master:
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> worker index
+        self.retired = set()  # pids replaced by a rolling restart, still draining
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                code = run_worker(self.app, self.sock, index, self.args)
+            except BaseException:
+                logger.exception("Worker %d crashed", index)
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self.workers[pid] = index
+        logger.info("Started worker %d (pid %d)", index, pid)
+
+    def signal_workers(self, sig):
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def handle_stop(self, sig, frame):
+        if not self.stopping:
+            logger.info("Received %s, draining %d workers", signal.Signals(sig).name, len(self.workers))
+            self.stopping = True
+            self.stop_deadline = time.monotonic() + self.args.graceful_timeout + self.args.shutdown_hook_margin
+            self.signal_workers(signal.SIGTERM)
+
+    def handle_hup(self, sig, frame):
+        self.reload_requested = True
+
+    def reap(self):
+        """Collect exited workers; respawn them unless shutting down"""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            mark_worker_dead(pid)
+            index = self.workers.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                logger.info("Worker %d (pid %d) exited with %d", index, pid, code)
+                continue
+            if code == 3:
+                # Startup failed (e.g. schema out of date); respawning would just loop
+                logger.error("Worker %d failed to start, shutting down", index)
+                self.handle_stop(signal.SIGTERM, None)
+                continue
+            logger.info("Worker %d (pid %d) exited with %d, respawning", index, pid, code)
+            self.spawn(index)
+
+    def rolling_restart(self):
+        """Replace workers one at a time, waiting for each replacement to start"""
+        self.reload_requested = False
+        for pid, index in list(self.workers.items()):
+            if self.stopping:
+                return
+            self.spawn(index)
+            time.sleep(self.args.restart_delay)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            # The old worker's exit must not trigger a second respawn
+            self.workers.pop(pid, None)
+            self.retired.add(pid)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.handle_stop)
+        signal.signal(signal.SIGINT, self.handle_stop)
+        signal.signal(signal.SIGHUP, self.handle_hup)
+        for index in range(self.args.workers):
+            self.spawn(index)
+
+        while not self.stopping or self.workers:
+            if self.reload_requested and not self.stopping:
+                self.rolling_restart()
+            self.reap()
+            self._reap_retired()
+            if self.stopping and self.workers and time.monotonic() > self.stop_deadline:
+                logger.warning("Killing %d workers that did not drain in time", len(self.workers))
+                self.signal_workers(signal.SIGKILL)
+                self.stop_deadline = float("inf")
+            time.sleep(0.1)
+
+        self.sock.close()
+        logger.info("All workers stopped")
+        return 0
+
+    def _reap_retired(self):
+        for pid in list(self.retired):
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                mark_worker_dead(pid)
+                self.retired.discard(pid)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the HomeFax API with pre-forked uvicorn workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "10000")),
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", "1000")),
+                        help="random extra requests so workers don't all recycle at once")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds to finish in-flight requests after SIGTERM")
+    parser.add_argument("--shutdown-hook-margin", type=float, default=float(os.getenv("SHUTDOWN_HOOK_TIMEOUT", "10")),
+                        help="extra seconds for shutdown hooks before workers are killed")
+    parser.add_argument("--keep-alive", type=int, default=int(os.getenv("KEEP_ALIVE", "5")))
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--restart-delay", type=float, default=1.0, help="seconds between workers on SIGHUP")
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+
+    # Metrics from all workers are aggregated through files in this directory;
+    # it must be set (and emptied) before prometheus_client is first imported
+    metrics_dir = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"homefax-metrics-{args.port}")
+    )
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    # Preload: every worker forks from a process that already imported the app
+    from main import app
+    sock = bind_socket(args.host, args.port, args.backlog)
+    logger.info("Listening on %s:%d with %d workers", args.host, args.port, args.workers)
+    sys.exit(Master(app, sock, args).run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,420 @@
+"""Generate large, referentially consistent datasets for load testing.
+
+Unlike seed_data.py this writes straight through SQLAlchemy Core in batches
+(COPY on PostgreSQL), with explicit primary keys so every batch can be
+regenerated on its own from (seed, table, batch number). That makes runs
+deterministic and resumable: progress is recorded after each committed
+batch, and a resumed batch first deletes any rows in its id range.
+
+    cd server
+    python synthetic_data.py --properties 5000000 --reports 20000000 \\
+        --renovations 2000000 --database-url postgresql://localhost/homefax_load
+
+Point it at a dedicated database; ids start at 1 and will collide with
+seed_data.py rows.
+"""
+from sqlalchemy import create_engine, event, text
+from datetime import datetime, timedelta
+from models import User, Property, Report, Renovation, CommunityUpdate, ContractorAssignment
+from utils.migrations import upgrade_to_head
+import argparse
+import bisect
+import csv
+import io
+import json
+import math
+import os
+import random
+import time
+
+EPOCH = datetime(2019, 1, 1)
+SPAN_SECONDS = 6 * 365 * 24 * 3600
+
+# (city, state, latitude, longitude, zip prefix)
+METROS = [
+    ("San Francisco", "CA", 37.7749, -122.4194, "941"),
+    ("Los Angeles", "CA", 34.0522, -118.2437, "900"),
+    ("Seattle", "WA", 47.6062, -122.3321, "981"),
+    ("Austin", "TX", 30.2672, -97.7431, "787"),
+    ("Denver", "CO", 39.7392, -104.9903, "802"),
+    ("Chicago", "IL", 41.8781, -87.6298, "606"),
+    ("Atlanta", "GA", 33.7490, -84.3880, "303"),
+    ("New York", "NY", 40.7128, -74.0060, "100"),
+    ("Boston", "MA", 42.3601, -71.0589, "021"),
+    ("Miami", "FL", 25.7617, -80.1918, "331"),
+]
+
+STREETS = ["Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Washington", "Lake", "Hill", "Park",
+           "Sunset", "Mission", "Valencia", "Market", "Church", "Castro", "Broadway", "Highland"]
+STREET_SUFFIXES = ["St", "Ave", "Blvd", "Rd", "Ln", "Way", "Ct", "Dr"]
+PROPERTY_TYPES = (["single_family", "condo", "townhouse", "multi_family"], [55, 25, 15, 5])
+REPORT_TYPES = (["inspection", "repair", "permit", "appraisal"], [40, 35, 15, 10])
+REPORT_STATUSES = (["approved", "pending", "rejected"], [70, 22, 8])
+RENOVATION_TYPES = ["kitchen", "bathroom", "roof", "hvac", "electrical", "plumbing", "addition", "landscaping"]
+RENOVATION_STATUSES = (["completed", "in_progress", "planned"], [70, 20, 10])
+UPDATE_TYPES = (["construction", "traffic", "school", "event", "utility"], [35, 30, 10, 15, 10])
+IMPACT_LEVELS = (["low", "medium", "high"], [50, 35, 15])
+ASSIGNMENT_TYPES = ["renovation", "inspection", "repair"]
+ASSIGNMENT_STATUSES = (["completed", "in_progress", "assigned"], [60, 25, 15])
+
+TABLE_ORDER = ["users", "properties", "reports", "renovations", "contractor_assignments", "community_updates"]
+MODELS = {
+    "users": User,
+    "properties": Property,
+    "reports": Report,
+    "renovations": Renovation,
+    "contractor_assignments": ContractorAssignment,
+    "community_updates": CommunityUpdate,
+}
+
+class Neighborhood:
+    __slots__ = ("key", "city", "state", "zip_code", "latitude", "longitude", "spread")
+
+    def __init__(self, key, city, state, zip_code, latitude, longitude, spread):
+        self.key = key
+        self.city = city
+        self.state = state
+        self.zip_code = zip_code
+        self.latitude = latitude
+        self.longitude = longitude
+        self.spread = spread
+
+class SyntheticDataset:
+    """Deterministic row factories; any batch can be rebuilt from (seed, table, batch)"""
+
+    def __init__(self, seed: int, counts: dict, neighborhoods: int, zipf_exponent: float = 1.1):
+        self.seed = seed
+        self.counts = counts
+        self.neighborhoods = self._build_neighborhoods(neighborhoods)
+        # Skewed neighborhood sizes: a few very dense neighborhoods, a long tail of small ones
+        weights = [1.0 / math.pow(rank + 1, zipf_exponent) for rank in range(len(self.neighborhoods))]
+        total = sum(weights)
+        self._cumulative = []
+        running = 0.0
+        for weight in weights:
+            running += weight / total
+            self._cumulative.append(running)
+
+    def _rng(self, table: str, batch: int) -> random.Random:
+        return random.Random(f"{self.seed}:{table}:{batch}")
+
+    def _build_neighborhoods(self, count: int):
+        rng = random.Random(f"{self.seed}:neighborhoods")
+        neighborhoods = []
+        for index in range(count):
+            city, state, latitude, longitude, zip_prefix = METROS[index % len(METROS)]
+            neighborhoods.append(Neighborhood(
+                key=f"{city.lower().replace(' ', '_')}_{index // len(METROS)}",
+                city=city,
+                state=state,
+                zip_code=f"{zip_prefix}{rng.randint(0, 99):02d}",
+                latitude=latitude + rng.gauss(0, 0.08),
+                longitude=longitude + rng.gauss(0, 0.08),
+                spread=rng.uniform(0.003, 0.015),
+            ))
+        return neighborhoods
+
+    def _neighborhood(self, rng: random.Random) -> Neighborhood:
+        index = bisect.bisect_left(self._cumulative, rng.random())
+        return self.neighborhoods[min(index, len(self.neighborhoods) - 1)]
+
+    def _neighborhood_for_property(self, property_id: int) -> Neighborhood:
+        # Same answer the properties batch produced, without storing 5M assignments
+        return self._neighborhood(random.Random(f"{self.seed}:property_neighborhood:{property_id}"))
+
+    @staticmethod
+    def _choice(rng: random.Random, options):
+        values, weights = options
+        return rng.choices(values, weights)[0]
+
+    @staticmethod
+    def _timestamp(rng: random.Random) -> datetime:
+        return EPOCH + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+    @staticmethod
+    def role_for(user_id: int) -> str:
+        if user_id % 1000 == 0:
+            return "admin"
+        if user_id % 10 == 1:
+            return "contractor"
+        if user_id % 4 == 2:
+            return "buyer"
+        return "homeowner"
+
+    def _user_id(self, rng: random.Random) -> int:
+        return rng.randint(1, self.counts["users"])
+
+    def _contractor_id(self, rng: random.Random) -> int:
+        # Contractors are the ids congruent to 1 mod 10
+        return 10 * rng.randint(0, (self.counts["users"] - 1) // 10) + 1
+
+    def _admin_id(self, rng: random.Random):
+        # Admins are the multiples of 1000
+        if self.counts["users"] < 1000:
+            return None
+        return 1000 * rng.randint(1, self.counts["users"] // 1000)
+
+    def _property_id(self, rng: random.Random) -> int:
+        return rng.randint(1, self.counts["properties"])
+
+    def users(self, ids, rng):
+        for user_id in ids:
+            created = self._timestamp(rng)
+            yield {
+                "id": user_id,
+                "email": f"user{user_id}@example.com",
+                "firebase_uid": f"synthetic_uid_{user_id}",
+                "role": self.role_for(user_id),
+                "first_name": rng.choice(["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]),
+                "last_name": rng.choice(["Nguyen", "Garcia", "Smith", "Patel", "Kim", "Johnson", "Lopez", "Chen"]),
+                "phone": f"+1{rng.randint(2000000000, 9999999999)}",
+                "created_at": created,
+                "updated_at": created,
+                "is_active": rng.random() > 0.02,
+            }
+
+    def properties(self, ids, rng):
+        for property_id in ids:
+            neighborhood = self._neighborhood_for_property(property_id)
+            # ~3% of rows arrive without coordinates, as in real onboarding feeds
+            has_coordinates = rng.random() > 0.03
+            property_type = self._choice(rng, PROPERTY_TYPES)
+            created = self._timestamp(rng)
+            verified = rng.random() < 0.4
+            owner_id = self._user_id(rng) if rng.random() < 0.7 else None
+            yield {
+                "id": property_id,
+                "address": f"{rng.randint(1, 9999)} {rng.choice(STREETS)} {rng.choice(STREET_SUFFIXES)}",
+                "city": neighborhood.city,
+                "state": neighborhood.state,
+                "zip_code": neighborhood.zip_code,
+                "latitude": rng.gauss(neighborhood.latitude, neighborhood.spread) if has_coordinates else None,
+                "longitude": rng.gauss(neighborhood.longitude, neighborhood.spread) if has_coordinates else None,
+                "property_type": property_type,
+                "year_built": rng.randint(1900, 2024),
+                "square_feet": int(rng.lognormvariate(7.4, 0.4)),
+                "bedrooms": rng.randint(1, 6) if property_type != "condo" else rng.randint(0, 3),
+                "bathrooms": rng.choice([1.0, 1.5, 2.0, 2.5, 3.0, 3.5]),
+                "lot_size": round(rng.uniform(0.05, 1.0), 2) if property_type != "condo" else None,
+                "owner_id": owner_id,
+                "is_verified": verified,
+                "verification_date": created + timedelta(days=rng.randint(1, 90)) if verified else None,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def reports(self, ids, rng):
+        for report_id in ids:
+            created = self._timestamp(rng)
+            status = self._choice(rng, REPORT_STATUSES)
+            reviewed = status != "pending"
+            yield {
+                "id": report_id,
+                "property_id": self._property_id(rng),
+                "submitter_id": self._user_id(rng),
+                "report_type": self._choice(rng, REPORT_TYPES),
+                "title": rng.choice(["Annual Home Inspection", "Roof Repair", "Permit Filing", "Water Damage", "Appraisal"]),
+                "description": "Synthetic report generated for load testing",
+                "report_data": {"score": rng.randint(1, 100), "notes": rng.choice(["Good", "Fair", "Needs work"])},
+                "attachments": [f"report_{report_id}.pdf"],
+                "status": status,
+                "reviewed_by": self._admin_id(rng) if reviewed else None,
+                "reviewed_at": created + timedelta(days=rng.randint(1, 30)) if reviewed else None,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def renovations(self, ids, rng):
+        for renovation_id in ids:
+            start = self._timestamp(rng)
+            status = self._choice(rng, RENOVATION_STATUSES)
+            yield {
+                "id": renovation_id,
+                "property_id": self._property_id(rng),
+                "contractor_id": self._contractor_id(rng),
+                "title": f"{rng.choice(RENOVATION_TYPES).title()} Renovation",
+                "description": "Synthetic renovation generated for load testing",
+                "renovation_type": rng.choice(RENOVATION_TYPES),
+                "start_date": start,
+                "end_date": start + timedelta(days=rng.randint(7, 180)) if status == "completed" else None,
+                "cost": round(rng.lognormvariate(9.5, 0.8), 2),
+                "materials": {"primary": rng.choice(["wood", "tile", "steel", "drywall", "concrete"])},
+                "blueprints": [f"blueprint_{renovation_id}.pdf"],
+                "photos": [f"photos_{renovation_id}.zip"],
+                "status": status,
+                "is_verified": rng.random() < 0.5,
+                "created_at": start,
+                "updated_at": start,
+            }
+
+    def contractor_assignments(self, ids, rng):
+        for assignment_id in ids:
+            assigned = self._timestamp(rng)
+            status = self._choice(rng, ASSIGNMENT_STATUSES)
+            yield {
+                "id": assignment_id,
+                "contractor_id": self._contractor_id(rng),
+                "property_id": self._property_id(rng),
+                "assignment_type": rng.choice(ASSIGNMENT_TYPES),
+                "status": status,
+                "assigned_date": assigned,
+                "completed_date": assigned + timedelta(days=rng.randint(3, 120)) if status == "completed" else None,
+                "notes": None,
+            }
+
+    def community_updates(self, ids, rng):
+        for update_id in ids:
+            neighborhood = self._neighborhood(rng)
+            start = self._timestamp(rng)
+            update_type = self._choice(rng, UPDATE_TYPES)
+            latitude = rng.gauss(neighborhood.latitude, neighborhood.spread)
+            longitude = rng.gauss(neighborhood.longitude, neighborhood.spread)
+            if update_type == "traffic":
+                location = {"type": "LineString", "coordinates": [
+                    [longitude, latitude],
+                    [longitude + rng.uniform(-0.005, 0.005), latitude + rng.uniform(-0.005, 0.005)],
+                ]}
+            else:
+                location = {"type": "Point", "coordinates": [longitude, latitude]}
+            yield {
+                "id": update_id,
+                "property_id": None,
+                "neighborhood_id": neighborhood.key,
+                "update_type": update_type,
+                "title": f"{update_type.title()} near {rng.choice(STREETS)} {rng.choice(STREET_SUFFIXES)}",
+                "description": "Synthetic community update generated for load testing",
+                "impact_level": self._choice(rng, IMPACT_LEVELS),
+                "start_date": start,
+                "end_date": start + timedelta(days=rng.randint(1, 365)) if rng.random() < 0.85 else None,
+                "location": location,
+                "is_verified": rng.random() < 0.8,
+                "created_by": self._user_id(rng),
+                "created_at": start - timedelta(days=rng.randint(0, 30)),
+                "updated_at": start,
+            }
+
+    def batch(self, table: str, batch: int, batch_size: int):
+        first = batch * batch_size + 1
+        last = min(first + batch_size - 1, self.counts[table])
+        rng = self._rng(table, batch)
+        return first, last, list(getattr(self, table)(range(first, last + 1), rng))
+
+def _fast_sqlite_load(dbapi_connection, connection_record):
+    # Bulk load only: a crash can lose the last batches, which --resume regenerates
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.close()
+
+def _copy_rows(connection, table, rows):
+    """Stream a batch through COPY ... FROM STDIN (PostgreSQL only)"""
+    columns = list(rows[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            "" if value is None else
+            json.dumps(value) if isinstance(value, (dict, list)) else
+            value.isoformat() if isinstance(value, datetime) else
+            value
+            for value in (row[column] for column in columns)
+        ])
+    buffer.seek(0)
+    cursor = connection.connection.cursor()
+    cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def _load_progress(path: str, seed: int, counts: dict, batch_size: int) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        progress = json.load(f)
+    if progress.get("seed") != seed or progress.get("counts") != counts or progress.get("batch_size") != batch_size:
+        raise SystemExit(f"{path} was written for a different seed/scale; remove it or pass the same arguments")
+    return progress.get("done", {})
+
+def _save_progress(path: str, seed: int, counts: dict, batch_size: int, done: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"seed": seed, "counts": counts, "batch_size": batch_size, "done": done}, f)
+    os.replace(tmp_path, path)
+
+def generate(database_url: str, counts: dict, seed: int, neighborhoods: int, batch_size: int,
+             progress_path: str, resume: bool, use_copy: bool):
+    dataset = SyntheticDataset(seed, counts, neighborhoods)
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _fast_sqlite_load)
+    use_copy = use_copy and engine.dialect.name == "postgresql"
+    done = _load_progress(progress_path, seed, counts, batch_size) if resume else {}
+
+    for table_name in TABLE_ORDER:
+        table = MODELS[table_name].__table__
+        total_batches = math.ceil(counts[table_name] / batch_size) if counts[table_name] else 0
+        start_batch = done.get(table_name, 0)
+        if start_batch >= total_batches:
+            continue
+        print(f"{table_name}: batches {start_batch + 1}-{total_batches} of {total_batches}")
+        started = time.perf_counter()
+        written = 0
+        for batch in range(start_batch, total_batches):
+            first, last, rows = dataset.batch(table_name, batch, batch_size)
+            with engine.begin() as connection:
+                # Idempotent if a previous run died after commit but before saving progress
+                connection.execute(table.delete().where(table.c.id.between(first, last)))
+                if use_copy:
+                    _copy_rows(connection, table, rows)
+                else:
+                    connection.execute(table.insert(), rows)
+            done[table_name] = batch + 1
+            _save_progress(progress_path, seed, counts, batch_size, done)
+            written += len(rows)
+            elapsed = time.perf_counter() - started
+            print(f"  {table_name} {last}/{counts[table_name]} ({written / elapsed:,.0f} rows/s)", flush=True)
+
+    if engine.dialect.name == "postgresql":
+        # Explicit ids bypassed the sequences; move them past the generated rows
+        with engine.begin() as connection:
+            for table_name in TABLE_ORDER:
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table_name}), 1))"
+                ))
+    engine.dispose()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic HomeFax data for load testing")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./homefax_load.db"))
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--properties", type=int, default=100000)
+    parser.add_argument("--reports", type=int, default=400000)
+    parser.add_argument("--renovations", type=int, default=40000)
+    parser.add_argument("--assignments", type=int, default=40000)
+    parser.add_argument("--community-updates", type=int, default=20000)
+    parser.add_argument("--neighborhoods", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--progress-file", default="synthetic_progress.json")
+    parser.add_argument("--resume", action="store_true", help="continue from --progress-file")
+    parser.add_argument("--no-copy", action="store_true", help="use INSERT batches even on PostgreSQL")
+    parser.add_argument("--skip-migrate", action="store_true", help="don't run alembic upgrade head first")
+    args = parser.parse_args()
+
+    if args.users < 1 or (args.properties < 1 and (args.reports or args.renovations or args.assignments)):
+        parser.error("reports, renovations and assignments need at least one user and one property")
+
+    counts = {
+        "users": args.users,
+        "properties": args.properties,
+        "reports": args.reports,
+        "renovations": args.renovations,
+        "contractor_assignments": args.assignments,
+        "community_updates": args.community_updates,
+    }
+    if not args.skip_migrate:
+        upgrade_to_head(args.database_url)
+    generate(args.database_url, counts, args.seed, args.neighborhoods, args.batch_size,
+             args.progress_file, args.resume, not args.no_copy)
+    print("Synthetic data created successfully!")
+
+if __name__ == "__main__":
+    main()
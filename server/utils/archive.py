@@ -0,0 +1,175 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+import asyncio
+import fcntl
+import glob
+import gzip
+import json
+import logging
+import os
+import threading
+
+from utils.interval_index import as_naive_utc
+
+logger = logging.getLogger("homefax.archive")
+
+ARCHIVE_DIR = os.getenv(
+    "ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive")
+)
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))  # grace period after end_date
+# In-process archiver, off by default: every worker holds the same in-memory
+# updates, so enable it in one process only (jobs.archive_updates covers the database)
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "0"))
+ARCHIVE_CACHE_PARTITIONS = int(os.getenv("ARCHIVE_CACHE_PARTITIONS", "12"))
+
+def archive_cutoff(now: Optional[datetime] = None, after_days: float = ARCHIVE_AFTER_DAYS) -> datetime:
+    return (now or datetime.utcnow()) - timedelta(days=after_days)
+
+def is_archivable(update: dict, cutoff: datetime) -> bool:
+    """Verified and ended before cutoff; open-ended and unverified updates stay hot"""
+    return bool(update.get("is_verified")) and update.get("end_date") is not None \
+        and as_naive_utc(update["end_date"], cutoff) < cutoff
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class UpdateArchive:
+    """Archived community updates as gzip JSON lines, one file per end_date month
+
+    Each append adds a gzip member to the month's file under an exclusive
+    lock, so several workers (or the batch job) can archive concurrently.
+    Reads go through a small LRU of parsed months, keyed by file size and
+    mtime so appends are picked up; get() finds the month through an
+    id -> month index, refreshed for months whose file changed, so it parses
+    at most one month. A row archived twice (a rerun after a crash between
+    writing and deleting) is returned once, latest copy wins.
+    """
+
+    def __init__(self, directory: str = os.path.join(ARCHIVE_DIR, "community_updates"),
+                 cache_partitions: int = ARCHIVE_CACHE_PARTITIONS):
+        self.directory = directory
+        self.cache_partitions = cache_partitions
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._month_of: Dict[int, str] = {}
+        self._indexed: Dict[str, tuple] = {}  # month -> file version its ids were indexed at
+        self._lock = threading.Lock()  # reads run in worker threads
+
+    def _path(self, month: str) -> str:
+        return os.path.join(self.directory, f"{month}.jsonl.gz")
+
+    def months(self) -> List[str]:
+        """Archived months, oldest first, as YYYY-MM"""
+        return sorted(os.path.basename(path)[:7] for path in glob.glob(os.path.join(self.directory, "*.jsonl.gz")))
+
+    def append(self, updates: Iterable[dict], archived_at: Optional[datetime] = None) -> int:
+        archived_at = (archived_at or datetime.utcnow()).isoformat()
+        by_month: Dict[str, List[dict]] = {}
+        for update in updates:
+            month = as_naive_utc(update["end_date"], datetime.min).strftime("%Y-%m")
+            by_month.setdefault(month, []).append({**update, "archived_at": archived_at})
+        os.makedirs(self.directory, exist_ok=True)
+        for month, rows in by_month.items():
+            payload = "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode()
+            with open(self._path(month), "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.write(gzip.compress(payload))
+                    f.flush()
+                    os.fsync(f.fileno())
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return sum(len(rows) for rows in by_month.values())
+
+    def _version(self, month: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(self._path(month))
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load(self, month: str) -> Dict[int, dict]:
+        path = self._path(month)
+        version = self._version(month)
+        if version is None:
+            return {}
+        with self._lock:
+            cached = self._cache.get(month)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(month)
+                return cached[1]
+            rows: Dict[int, dict] = {}
+            with gzip.open(path, "rt") as f:
+                for line in f:
+                    if line.strip():
+                        row = json.loads(line)
+                        rows[row["id"]] = row
+            self._cache[month] = (version, rows)
+            while len(self._cache) > self.cache_partitions:
+                self._cache.popitem(last=False)
+            return rows
+
+    def updates(self, neighborhood_id: Optional[str] = None, ended_after: Optional[datetime] = None) -> Iterator[dict]:
+        """Archived updates oldest month first; ended_after skips months that ended too early to matter"""
+        first = ended_after.strftime("%Y-%m") if ended_after else None
+        for month in self.months():
+            if first and month < first:
+                continue
+            for row in self._load(month).values():
+                if neighborhood_id and row.get("neighborhood_id") != neighborhood_id:
+                    continue
+                yield row
+
+    def _refresh_index(self):
+        """Index the ids of months written since they were last indexed (all of them, the first time)"""
+        for month in self.months():
+            version = self._version(month)
+            if version is None or self._indexed.get(month) == version:
+                continue
+            ids = list(self._load(month))
+            with self._lock:
+                for update_id in ids:
+                    # Archived in more than one month: the newest copy wins, as in updates()
+                    if self._month_of.get(update_id, "") <= month:
+                        self._month_of[update_id] = month
+                self._indexed[month] = version
+
+    def get(self, update_id: int) -> Optional[dict]:
+        self._refresh_index()
+        with self._lock:
+            month = self._month_of.get(update_id)
+        return self._load(month).get(update_id) if month else None
+
+class Archiver:
+    """Runs an archive pass every interval seconds in the background"""
+
+    def __init__(self, archive_pass: Callable[[], Awaitable[int]], interval: float = ARCHIVE_INTERVAL_SECONDS):
+        self.archive_pass = archive_pass
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                archived = await self.archive_pass()
+                if archived:
+                    logger.info("Archived %d expired community updates", archived)
+            except Exception:
+                logger.exception("Archive pass failed")
+            await asyncio.sleep(self.interval)
@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models import User
 from typing import Optional
@@ -39,7 +39,7 @@ def verify_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get the current authenticated user"""
     token = credentials.credentials
@@ -79,7 +79,7 @@ async def get_current_user(
         )
     
     # In production, fetch user from database
-    # user = db.query(User).filter(User.id == user_id).first()
+    # user = await db.get(User, user_id)
     # if user is None:
     #     raise HTTPException(
     #         status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,171 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from contextvars import ContextVar
+from typing import List, Optional
+import asyncio
+import hashlib
+import hmac
+import math
+import time
+
+# Seconds a replica is behind the primary (0 on the primary or on SQLite)
+POSTGRES_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_is_in_recovery() "
+    "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "ELSE 0 END"
+)
+
+# The client carries its last write time, so stickiness holds whichever worker serves the read
+LAST_WRITE_COOKIE = "homefax_last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
+_request_write: ContextVar[Optional[dict]] = ContextVar("homefax_request_write", default=None)
+
+class ReplicaState:
+    """Last known health and replication lag of one replica engine"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = 0.0
+        self.last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def as_dict(self) -> dict:
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": round(self.lag, 3),
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 3) if self.checked_at else None,
+            "last_error": self.last_error,
+        }
+
+class ReplicaRouter:
+    """Round-robin choice of a healthy, caught-up replica with read-your-writes stickiness"""
+
+    def __init__(
+        self,
+        replicas: List[AsyncEngine],
+        max_lag: float = 5.0,
+        check_interval: float = 10.0,
+        check_timeout: float = 1.0,
+        sticky_seconds: float = 10.0,
+        secret: str = ""
+    ):
+        self.replicas = [ReplicaState(engine) for engine in replicas]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.check_timeout = check_timeout
+        self.sticky_seconds = sticky_seconds
+        self._secret = secret.encode()
+        self._next = 0
+
+    @property
+    def sticky_window(self) -> float:
+        return max(self.sticky_seconds, self.max_lag)
+
+    def _sign(self, stamp: str) -> str:
+        return hmac.new(self._secret, stamp.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def write_token(self, at: float) -> str:
+        """Signed last-write time for the client to send back on later reads"""
+        stamp = f"{at:.3f}"
+        return f"{stamp}.{self._sign(stamp)}"
+
+    def mark_write(self):
+        """Route this client's reads to the primary until its writes have replicated"""
+        pending = _request_write.get()
+        if pending is not None and self.replicas:
+            pending["at"] = time.time()
+
+    def is_sticky(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        stamp, _, signature = token.rpartition(".")
+        if not hmac.compare_digest(signature, self._sign(stamp)):
+            return False
+        try:
+            at = float(stamp)
+        except ValueError:
+            return False
+        # abs(): a worker whose clock runs ahead must not pin the client forever
+        return abs(time.time() - at) < self.sticky_window
+
+    @staticmethod
+    async def _probe(engine: AsyncEngine) -> float:
+        async with engine.connect() as connection:
+            if engine.dialect.name == "postgresql":
+                return await connection.scalar(POSTGRES_LAG_QUERY)
+            await connection.scalar(text("SELECT 1"))
+            return 0.0
+
+    async def _check(self, replica: ReplicaState):
+        async with replica._lock:
+            if time.monotonic() - replica.checked_at < self.check_interval:
+                return
+            try:
+                # Bounds the connect as well as the query: an unreachable replica
+                # must not hold up the request that happened to trigger the check
+                lag = await asyncio.wait_for(self._probe(replica.engine), self.check_timeout)
+                replica.lag = float(lag or 0.0)
+                replica.healthy = True
+                replica.last_error = None
+            except Exception as e:
+                replica.healthy = False
+                replica.last_error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            replica.checked_at = time.monotonic()
+
+    async def choose(self, last_write: Optional[str] = None) -> Optional[AsyncEngine]:
+        """Replica engine for a read, or None when the primary should serve it"""
+        if not self.replicas or self.is_sticky(last_write):
+            return None
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if time.monotonic() - replica.checked_at >= self.check_interval:
+                await self._check(replica)
+            if replica.healthy and replica.lag <= self.max_lag:
+                return replica.engine
+        return None
+
+    def status(self) -> List[dict]:
+        return [replica.as_dict() for replica in self.replicas]
+
+class ReadYourWritesMiddleware:
+    """Hands a client that committed a write its signed last-write time
+
+    Sent as a cookie and as the X-Last-Write header; reads carrying either
+    one go to the primary for the router's sticky window. Only commits made
+    before the response starts are seen.
+    """
+
+    def __init__(self, app, router: ReplicaRouter):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.router.replicas:
+            await self.app(scope, receive, send)
+            return
+
+        pending = {"at": None}
+        token = _request_write.set(pending)
+
+        async def send_with_last_write(message):
+            if message["type"] == "http.response.start" and pending["at"] is not None:
+                value = self.router.write_token(pending["at"])
+                cookie = (f"{LAST_WRITE_COOKIE}={value}; Max-Age={math.ceil(self.router.sticky_window)}; "
+                          "Path=/; HttpOnly; SameSite=Lax")
+                if scope.get("scheme") == "https":
+                    cookie += "; Secure"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode()))
+                headers.append((LAST_WRITE_HEADER.encode(), value.encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_last_write)
+        finally:
+            _request_write.reset(token)
@@ -0,0 +1,200 @@
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, List, Optional, Sequence, Set, Tuple
+import heapq
+import itertools
+import math
+import os
+import random
+import re
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # optional; signatures are then computed in pure Python (same values)
+    np = None
+
+from utils.geo import METERS_PER_DEGREE, geometry_bbox, haversine_m
+from utils.interval_index import MIN_TIME, as_naive_utc
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))  # estimated Jaccard similarity of the text
+DEDUP_RADIUS_M = float(os.getenv("DEDUP_RADIUS_M", "500"))
+DEDUP_WINDOW_HOURS = float(os.getenv("DEDUP_WINDOW_HOURS", "72"))
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 4 rows per band: pairs at ~0.5 similarity collide in at least one band about half the time, 0.8 almost always
+SHINGLE_SIZE = 4  # characters
+
+_PRIME = 4294967311  # smallest prime above 2**32; a * h + b stays below 2**64
+_rng = random.Random(0x5EED)
+_A = [_rng.randrange(1, 1 << 31) for _ in range(NUM_PERMUTATIONS)]
+_B = [_rng.randrange(0, 1 << 32) for _ in range(NUM_PERMUTATIONS)]
+if np is not None:
+    _A_NP = np.array(_A, dtype=np.uint64)[:, None]
+    _B_NP = np.array(_B, dtype=np.uint64)[:, None]
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+def update_text(update: dict) -> str:
+    return " ".join(_NON_WORD.sub(" ", f"{update.get('title') or ''} {update.get('description') or ''}".lower()).split())
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """crc32 of every `size`-character window"""
+    if len(text) <= size:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {zlib.crc32(text[i:i + size].encode()) for i in range(len(text) - size + 1)}
+
+def minhash(hashes: Set[int]) -> Tuple[int, ...]:
+    """NUM_PERMUTATIONS minimums of (a * h + b) mod p over the shingle hashes"""
+    if not hashes:
+        return (_PRIME,) * NUM_PERMUTATIONS
+    if np is not None:
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        return tuple(((_A_NP * values + _B_NP) % _PRIME).min(axis=1).tolist())
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in zip(_A, _B))
+
+def similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERMUTATIONS
+
+def _centroid(location: Optional[dict]) -> Optional[Tuple[float, float]]:
+    if not location:
+        return None
+    min_lon, min_lat, max_lon, max_lat = geometry_bbox(location)
+    return (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+
+class _Entry:
+    __slots__ = ("key", "signature", "point", "neighborhood_id", "created_at", "root", "buckets")
+
+    def __init__(self, key, signature, point, neighborhood_id, created_at, root):
+        self.key = key
+        self.signature = signature
+        self.point = point
+        self.neighborhood_id = neighborhood_id
+        self.created_at = created_at
+        self.root = root
+        self.buckets: List[tuple] = []
+
+class DuplicateIndex:
+    """Near-duplicate community updates: MinHash LSH over title + description, bucketed by place
+
+    Each band of the signature is bucketed together with the update's grid
+    cell (DEDUP_RADIUS_M on a side) and its neighborhood, so a lookup
+    touches a handful of small buckets however many updates exist
+    elsewhere. Candidates must also lie within DEDUP_RADIUS_M and have been
+    posted within DEDUP_WINDOW_HOURS of each other. Updates older than the
+    window (relative to the newest one seen) are evicted, which bounds the
+    index to recent traffic.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, radius_m: float = DEDUP_RADIUS_M,
+                 window_hours: float = DEDUP_WINDOW_HOURS):
+        self.threshold = threshold
+        self.radius_m = radius_m
+        self.window = timedelta(hours=window_hours)
+        self._cell_deg = radius_m / METERS_PER_DEGREE
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._buckets: Dict[tuple, Set[Hashable]] = {}
+        self._by_age: List[Tuple[datetime, int, _Entry]] = []
+        self._newest = MIN_TIME
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _cell(self, point: Tuple[float, float]) -> Tuple[int, int]:
+        return math.floor(point[0] / self._cell_deg), math.floor(point[1] / self._cell_deg)
+
+    def _places(self, point, neighborhood_id, neighbors: bool) -> List[tuple]:
+        places = []
+        if point is not None:
+            x, y = self._cell(point)
+            if neighbors:
+                # Cells are square in degrees, so narrower than radius_m east-west away from the equator
+                span = math.ceil(1 / max(math.cos(math.radians(point[1])), 0.01))
+                places.extend(("cell", x + dx, y + dy) for dx in range(-span, span + 1) for dy in (-1, 0, 1))
+            else:
+                places.append(("cell", x, y))
+        if neighborhood_id:
+            places.append(("neighborhood", neighborhood_id))
+        return places or [("anywhere",)]
+
+    @staticmethod
+    def _bands(signature) -> List[tuple]:
+        rows = NUM_PERMUTATIONS // BANDS
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(BANDS)]
+
+    def _describe(self, key, update: dict, root=None) -> _Entry:
+        return _Entry(
+            key,
+            minhash(shingles(update_text(update))),
+            _centroid(update.get("location")),
+            update.get("neighborhood_id"),
+            as_naive_utc(update.get("created_at"), datetime.utcnow()),
+            root,
+        )
+
+    def _close(self, a: _Entry, b: _Entry) -> bool:
+        if abs(a.created_at - b.created_at) > self.window:
+            return False
+        if a.point is not None and b.point is not None:
+            return haversine_m(*a.point, *b.point) <= self.radius_m
+        return a.neighborhood_id is not None and a.neighborhood_id == b.neighborhood_id
+
+    def _matches(self, probe: _Entry) -> List[Tuple[float, _Entry]]:
+        seen = set()
+        found = []
+        bands = self._bands(probe.signature)
+        for place in self._places(probe.point, probe.neighborhood_id, neighbors=True):
+            for band in bands:
+                for key in self._buckets.get((place, band), ()):
+                    if key in seen or key == probe.key:
+                        continue
+                    seen.add(key)
+                    entry = self._entries[key]
+                    if self._close(probe, entry):
+                        score = similarity(probe.signature, entry.signature)
+                        if score >= self.threshold:
+                            found.append((score, entry))
+        found.sort(key=lambda match: -match[0])
+        return found
+
+    def find(self, update: dict, key: Hashable = None) -> Optional[Tuple[Hashable, float]]:
+        """(root id, similarity) of the closest earlier duplicate, or None"""
+        matches = self._matches(self._describe(key, update))
+        if not matches:
+            return None
+        score, entry = matches[0]
+        return (entry.root if entry.root is not None else entry.key), score
+
+    def upsert(self, key: Hashable, update: dict):
+        self.remove(key)
+        entry = self._describe(key, update, update.get("duplicate_of"))
+        self._newest = max(self._newest, entry.created_at)
+        if entry.created_at < self._newest - self.window:
+            return
+        bands = self._bands(entry.signature)
+        for place in self._places(entry.point, entry.neighborhood_id, neighbors=False):
+            for band in bands:
+                bucket = (place, band)
+                self._buckets.setdefault(bucket, set()).add(key)
+                entry.buckets.append(bucket)
+        self._entries[key] = entry
+        heapq.heappush(self._by_age, (entry.created_at, next(self._seq), entry))
+        self._evict()
+
+    def remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for bucket in entry.buckets:
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def _evict(self):
+        cutoff = self._newest - self.window
+        while self._by_age and self._by_age[0][0] < cutoff:
+            _, _, entry = heapq.heappop(self._by_age)
+            if self._entries.get(entry.key) is entry:
+                self.remove(entry.key)
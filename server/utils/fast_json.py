@@ -0,0 +1,60 @@
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from typing import Any, Iterable, List, Optional, Sequence, Type
+from datetime import date, datetime
+from decimal import Decimal
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+
+# Opt-in: unless enabled, endpoints return plain lists and FastAPI validates them as before
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (datetimes, dicts and Core row mappings natively)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def _row_getter(row):
+    if isinstance(row, dict):
+        return row.get
+    mapping = getattr(row, "_mapping", None)  # SQLAlchemy Core Row
+    if mapping is not None:
+        return mapping.get
+    return lambda key: getattr(row, key, None)  # ORM instance or slotted row
+
+def project_rows(rows: Iterable[Any], response_model: Type[BaseModel], fields: Optional[Sequence[str]] = None) -> List[dict]:
+    """Keep only the response model's fields (or a subset), without re-validating trusted rows"""
+    keys = list(fields) if fields else list(response_model.model_fields)
+    projected = []
+    for row in rows:
+        get = _row_getter(row)
+        projected.append({key: get(key) for key in keys})
+    return projected
+
+def fast_json_response(rows: Iterable[Any], response_model: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+    """Serialize already-typed rows directly; FastAPI skips response_model validation for Responses"""
+    return FastJSONResponse(project_rows(rows, response_model, fields))
+
+def fast_json_item(row: Any, response_model: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+    """Single-object variant of fast_json_response for detail endpoints"""
+    return FastJSONResponse(project_rows([row], response_model, fields)[0])
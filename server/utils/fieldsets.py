@@ -0,0 +1,32 @@
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from typing import List, Optional, Sequence, Type
+
+def sparse_fields(response_model: Type[BaseModel], always: Sequence[str] = ("id",)):
+    """`?fields=a,b` dependency validated against the response model
+
+    Resolves to None when no fields were requested, otherwise to the requested
+    names (plus `always`) in model order, ready for `fast_json_response(...,
+    fields)` and `read_path.select_for(..., fields)`.
+    """
+    known = list(response_model.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            None,
+            description=f"Comma-separated subset of: {', '.join(known)}"
+        )
+    ) -> Optional[List[str]]:
+        if not fields:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(known))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        requested.update(always)
+        return [name for name in known if name in requested]
+
+    return dependency
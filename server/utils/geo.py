@@ -0,0 +1,164 @@
+from typing import Iterable, List, Sequence, Tuple
+import math
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = math.pi / 180 * EARTH_RADIUS_M
+
+BBox = Tuple[float, float, float, float]  # min_lon, min_lat, max_lon, max_lat
+
+GEOMETRY_TYPES = ("Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon")
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance in meters"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def _validate_position(position) -> Tuple[float, float]:
+    if not isinstance(position, (list, tuple)) or len(position) < 2:
+        raise ValueError(f"Invalid GeoJSON position: {position!r}")
+    lon, lat = float(position[0]), float(position[1])
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        raise ValueError(f"Position out of range: {position!r}")
+    return lon, lat
+
+def _validate_line(line, kind: str, minimum: int = 2) -> List[Tuple[float, float]]:
+    if not isinstance(line, (list, tuple)) or len(line) < minimum:
+        raise ValueError(f"{kind} needs at least {minimum} positions per {'ring' if minimum > 2 else 'line'}")
+    return [_validate_position(position) for position in line]
+
+def _validate_polygon(rings, kind: str):
+    if not isinstance(rings, (list, tuple)) or not rings:
+        raise ValueError(f"{kind} has no rings")
+    for ring in rings:
+        positions = _validate_line(ring, kind, minimum=4)
+        if positions[0] != positions[-1]:
+            raise ValueError(f"{kind} rings must be closed (first position repeated last)")
+
+def validate_geometry(geometry) -> dict:
+    """Check a GeoJSON geometry's shape; raises ValueError
+
+    Every part must be usable: no empty parts, lines of at least two
+    positions, closed rings of at least four.
+    """
+    if not isinstance(geometry, dict) or geometry.get("type") not in GEOMETRY_TYPES:
+        raise ValueError(f"Geometry type must be one of {', '.join(GEOMETRY_TYPES)}")
+    coordinates = geometry.get("coordinates")
+    kind = geometry["type"]
+    try:
+        if kind == "Point":
+            _validate_position(coordinates)
+        elif kind == "LineString":
+            _validate_line(coordinates, kind)
+        elif kind == "Polygon":
+            _validate_polygon(coordinates, kind)
+        else:
+            if not isinstance(coordinates, (list, tuple)) or not coordinates:
+                raise ValueError(f"{kind} has no coordinates")
+            for part in coordinates:
+                if kind == "MultiPoint":
+                    _validate_position(part)
+                elif kind == "MultiLineString":
+                    _validate_line(part, kind)
+                else:
+                    _validate_polygon(part, kind)
+    except TypeError:
+        raise ValueError(f"Malformed {kind} coordinates")
+    return geometry
+
+def iter_positions(geometry) -> Iterable[Sequence[float]]:
+    kind, coordinates = geometry["type"], geometry["coordinates"]
+    if kind == "Point":
+        yield coordinates
+    elif kind in ("MultiPoint", "LineString"):
+        yield from coordinates
+    elif kind in ("MultiLineString", "Polygon"):
+        for part in coordinates:
+            yield from part
+    elif kind == "MultiPolygon":
+        for polygon in coordinates:
+            for ring in polygon:
+                yield from ring
+
+def geometry_bbox(geometry) -> BBox:
+    lons, lats = [], []
+    for position in iter_positions(geometry):
+        lons.append(position[0])
+        lats.append(position[1])
+    return min(lons), min(lats), max(lons), max(lats)
+
+def bbox_around(lon: float, lat: float, radius_m: float) -> BBox:
+    """Bounding box that contains every point within radius_m of (lon, lat)"""
+    dlat = radius_m / METERS_PER_DEGREE
+    dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    return lon - dlon, lat - dlat, lon + dlon, lat + dlat
+
+def bboxes_intersect(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+class LocalProjection:
+    """Equirectangular meters around an origin; accurate to well under 1% within tens of km"""
+
+    __slots__ = ("lon0", "lat0", "kx")
+
+    def __init__(self, lon0: float, lat0: float):
+        self.lon0 = lon0
+        self.lat0 = lat0
+        self.kx = METERS_PER_DEGREE * math.cos(math.radians(lat0))
+
+    def project(self, position) -> Tuple[float, float]:
+        return (position[0] - self.lon0) * self.kx, (position[1] - self.lat0) * METERS_PER_DEGREE
+
+def _segment_distance(px: float, py: float, ax: float, ay: float, bx: float, by: float) -> float:
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+def point_segment_distance_m(lon: float, lat: float, a: Sequence[float], b: Sequence[float]) -> float:
+    """Meters from (lon, lat) to the closest point of segment a-b"""
+    projection = LocalProjection(lon, lat)
+    ax, ay = projection.project(a)
+    bx, by = projection.project(b)
+    return _segment_distance(0.0, 0.0, ax, ay, bx, by)
+
+def _path_distance(points: List[Tuple[float, float]]) -> float:
+    # Degenerate parts stored before validation was strict: empty is infinitely far
+    if len(points) <= 1:
+        return math.hypot(*points[0]) if points else math.inf
+    return min(_segment_distance(0.0, 0.0, *points[i], *points[i + 1]) for i in range(len(points) - 1))
+
+def _inside_ring(points: List[Tuple[float, float]]) -> bool:
+    # Ray casting from the origin (the query point) along +x
+    inside = False
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        if (y1 > 0) != (y2 > 0) and 0 < x1 + (0 - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+def _polygon_distance(rings, projection: LocalProjection) -> float:
+    projected = [[projection.project(p) for p in ring] for ring in rings]
+    if projected and len(projected[0]) >= 3 and _inside_ring(projected[0]) \
+            and not any(_inside_ring(hole) for hole in projected[1:] if len(hole) >= 3):
+        return 0.0
+    return min((_path_distance(ring) for ring in projected), default=math.inf)
+
+def geometry_distance_m(geometry, lon: float, lat: float) -> float:
+    """Meters from (lon, lat) to a GeoJSON geometry (0 inside polygons, inf if it has no usable part)"""
+    projection = LocalProjection(lon, lat)
+    kind, coordinates = geometry["type"], geometry["coordinates"]
+    if kind == "Point":
+        return haversine_m(lon, lat, coordinates[0], coordinates[1])
+    if kind == "MultiPoint":
+        return min((haversine_m(lon, lat, p[0], p[1]) for p in coordinates), default=math.inf)
+    if kind == "LineString":
+        return _path_distance([projection.project(p) for p in coordinates])
+    if kind == "MultiLineString":
+        return min((_path_distance([projection.project(p) for p in line]) for line in coordinates), default=math.inf)
+    if kind == "Polygon":
+        return _polygon_distance(coordinates, projection)
+    if kind == "MultiPolygon":
+        return min((_polygon_distance(polygon, projection) for polygon in coordinates), default=math.inf)
+    raise ValueError(f"Unsupported geometry type: {kind}")
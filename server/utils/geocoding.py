@@ -0,0 +1,317 @@
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import csv
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from utils.metrics import record_cache
+
+logger = logging.getLogger("homefax.geocoding")
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", os.path.join(SERVER_DIR, "data", "gazetteer.csv"))
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join(SERVER_DIR, "geocode_cache.db"))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", str(7 * 24 * 3600)))  # retry misses after a week
+GEOCODE_MEMORY_CACHE_SIZE = int(os.getenv("GEOCODE_MEMORY_CACHE_SIZE", "10000"))
+GEOCODE_RATE_PER_SECOND = float(os.getenv("GEOCODE_RATE_PER_SECOND", "10"))  # remote provider requests
+GEOCODE_TIMEOUT = float(os.getenv("GEOCODE_TIMEOUT", "10"))
+# mapbox, stub or none; defaults to mapbox when a real token is configured
+MAPBOX_ACCESS_TOKEN = os.getenv("MAPBOX_ACCESS_TOKEN", "")
+GEOCODER_PROVIDER = os.getenv(
+    "GEOCODER_PROVIDER",
+    "mapbox" if MAPBOX_ACCESS_TOKEN and not MAPBOX_ACCESS_TOKEN.startswith("your-") else "none"
+)
+
+class GeocodeResult(NamedTuple):
+    latitude: float
+    longitude: float
+    source: str  # gazetteer, mapbox, stub, ...
+    precision: str  # address or zip
+
+SUFFIXES = {
+    "street": "st", "avenue": "ave", "av": "ave", "boulevard": "blvd", "road": "rd", "drive": "dr",
+    "lane": "ln", "court": "ct", "place": "pl", "terrace": "ter", "highway": "hwy", "parkway": "pkwy",
+    "square": "sq", "circle": "cir", "way": "way",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "apartment": "apt", "suite": "ste", "unit": "unit",
+}
+_PUNCTUATION = re.compile(r"[^\w\s#]")
+_SPACES = re.compile(r"\s+")
+
+def normalize_part(value: Optional[str]) -> str:
+    words = _SPACES.sub(" ", _PUNCTUATION.sub(" ", (value or "").lower())).split()
+    return " ".join(SUFFIXES.get(word, word) for word in words)
+
+def address_key(address: Optional[str], city: Optional[str], state: Optional[str], zip_code: Optional[str]) -> str:
+    """Cache / gazetteer key: '123 main st|san francisco|ca|94102'"""
+    zip5 = (zip_code or "").strip()[:5]
+    return "|".join((normalize_part(address), normalize_part(city), normalize_part(state), zip5))
+
+class Gazetteer:
+    """Local address and zip centroid table (CSV: address,city,state,zip_code,latitude,longitude)
+
+    Rows with an empty address are zip centroids, used when no better
+    match exists.
+    """
+
+    def __init__(self):
+        self.addresses: Dict[str, Tuple[float, float]] = {}
+        self.zips: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.addresses) + len(self.zips)
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Gazetteer":
+        gazetteer = cls()
+        if not os.path.exists(path):
+            logger.warning("Gazetteer %s not found; geocoding without it", path)
+            return gazetteer
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                point = (float(row["latitude"]), float(row["longitude"]))
+                if row.get("address", "").strip():
+                    gazetteer.addresses[address_key(row["address"], row["city"], row["state"], row["zip_code"])] = point
+                else:
+                    gazetteer.zips[row["zip_code"].strip()[:5]] = point
+        return gazetteer
+
+    def lookup_address(self, key: str) -> Optional[GeocodeResult]:
+        point = self.addresses.get(key)
+        return GeocodeResult(*point, "gazetteer", "address") if point else None
+
+    def lookup_zip(self, zip_code: Optional[str]) -> Optional[GeocodeResult]:
+        point = self.zips.get((zip_code or "").strip()[:5])
+        return GeocodeResult(*point, "gazetteer", "zip") if point else None
+
+_MISS = object()
+
+class GeocodeCache:
+    """On-disk cache of remote answers (misses too, for GEOCODE_NEGATIVE_TTL), with an LRU in front
+
+    get() and put() block on SQLite; async callers run them in a worker thread.
+    """
+
+    def __init__(self, path: str, memory_size: int = GEOCODE_MEMORY_CACHE_SIZE,
+                 negative_ttl: float = GEOCODE_NEGATIVE_TTL):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, Optional[GeocodeResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Opened on first use, after serve.py has forked
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache (key TEXT PRIMARY KEY, latitude REAL, longitude REAL, "
+                "source TEXT, precision TEXT, created_at REAL NOT NULL)"
+            )
+        return self._connection
+
+    def _remember(self, key: str, result: Optional[GeocodeResult]):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """The cached result (None for a cached miss), or _MISS when not cached"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            row = self._db().execute(
+                "SELECT latitude, longitude, source, precision, created_at FROM geocode_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return _MISS
+            if row[0] is None:
+                if time.time() - row[4] > self.negative_ttl:
+                    return _MISS
+                result = None
+            else:
+                result = GeocodeResult(row[0], row[1], row[2], row[3])
+            self._remember(key, result)
+            return result
+
+    def put(self, key: str, result: Optional[GeocodeResult]):
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO geocode_cache (key, latitude, longitude, source, precision, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, *(result or (None, None, None, None)), time.time())
+            )
+            self._remember(key, result)
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class GeocodingProvider:
+    """Remote geocoder; subclasses implement geocode() for one address"""
+
+    name = "none"
+
+    async def geocode(self, address: str, city: str, state: str, zip_code: str) -> Optional[GeocodeResult]:
+        return None
+
+    async def aclose(self):
+        pass
+
+class RateLimiter:
+    """At most `rate` acquisitions per second, spaced evenly"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class MapboxProvider(GeocodingProvider):
+    name = "mapbox"
+    URL = "https://api.mapbox.com/geocoding/v5/mapbox.places/{query}.json"
+
+    def __init__(self, access_token: str, rate: float = GEOCODE_RATE_PER_SECOND, timeout: float = GEOCODE_TIMEOUT):
+        import httpx
+        self.access_token = access_token
+        self.client = httpx.AsyncClient(timeout=timeout)
+        self.limiter = RateLimiter(rate)
+
+    async def geocode(self, address, city, state, zip_code) -> Optional[GeocodeResult]:
+        from urllib.parse import quote
+        query = quote(", ".join(part for part in (address, city, state, zip_code) if part), safe="")
+        await self.limiter.acquire()
+        response = await self.client.get(
+            self.URL.format(query=query),
+            params={"access_token": self.access_token, "limit": 1, "country": "us", "types": "address,postcode"}
+        )
+        response.raise_for_status()
+        features = response.json().get("features") or []
+        if not features:
+            return None
+        longitude, latitude = features[0]["center"]
+        precision = "zip" if "postcode" in features[0].get("place_type", []) else "address"
+        return GeocodeResult(latitude, longitude, self.name, precision)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+class StubProvider(GeocodingProvider):
+    """Offline stand-in for tests and load runs: a fixed answer table, else a stable fake point
+
+    Fake points are derived from a hash of the address, scattered around
+    `center`, so the same address always lands in the same place.
+    """
+
+    name = "stub"
+
+    def __init__(self, answers: Optional[Dict[str, Tuple[float, float]]] = None,
+                 center: Tuple[float, float] = (37.7749, -122.4194), spread: float = 0.05,
+                 latency: float = 0.0):
+        self.answers = answers or {}
+        self.center = center
+        self.spread = spread
+        self.latency = latency
+        self.calls = 0
+
+    async def geocode(self, address, city, state, zip_code) -> Optional[GeocodeResult]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        key = address_key(address, city, state, zip_code)
+        if key in self.answers:
+            return GeocodeResult(*self.answers[key], self.name, "address")
+        if not normalize_part(address):
+            return None
+        digest = hashlib.sha1(key.encode()).digest()
+        dlat = (int.from_bytes(digest[:4], "big") / 2 ** 32 - 0.5) * 2 * self.spread
+        dlon = (int.from_bytes(digest[4:8], "big") / 2 ** 32 - 0.5) * 2 * self.spread
+        return GeocodeResult(self.center[0] + dlat, self.center[1] + dlon, self.name, "address")
+
+def create_provider(name: str = GEOCODER_PROVIDER) -> GeocodingProvider:
+    if name == "mapbox":
+        return MapboxProvider(MAPBOX_ACCESS_TOKEN)
+    if name == "stub":
+        return StubProvider()
+    if name == "none":
+        return GeocodingProvider()
+    raise ValueError(f"Unknown GEOCODER_PROVIDER {name!r}")
+
+class Geocoder:
+    """Gazetteer address match, then cache, then the remote provider, then the zip centroid"""
+
+    def __init__(self, gazetteer: Gazetteer, cache: GeocodeCache, provider: GeocodingProvider):
+        self.gazetteer = gazetteer
+        self.cache = cache
+        self.provider = provider
+
+    async def geocode(self, address: Optional[str], city: Optional[str], state: Optional[str],
+                      zip_code: Optional[str], remote: bool = True) -> Optional[GeocodeResult]:
+        """remote=False stays local (gazetteer and cache), for use inside request handlers"""
+        key = address_key(address, city, state, zip_code)
+        result = self.gazetteer.lookup_address(key)
+        if result:
+            return result
+        cached = await asyncio.to_thread(self.cache.get, key)
+        record_cache("geocode", cached is not _MISS)
+        if cached is _MISS and remote and self.provider.name != "none":
+            try:
+                cached = await self.provider.geocode(address or "", city or "", state or "", zip_code or "")
+            except Exception as e:
+                # Transient (rate limit, network): don't cache, fall through to the zip centroid
+                logger.warning("Geocoding %r via %s failed: %s", key, self.provider.name, e)
+            else:
+                await asyncio.to_thread(self.cache.put, key, cached)
+        if cached is not _MISS and cached is not None:
+            return cached
+        return self.gazetteer.lookup_zip(zip_code)
+
+    async def geocode_many(self, addresses: Sequence[Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]],
+                           concurrency: int = 8, remote: bool = True) -> List[Optional[GeocodeResult]]:
+        """geocode() for (address, city, state, zip_code) tuples; duplicates are looked up once"""
+        slots = asyncio.Semaphore(concurrency)
+        unique: Dict[str, Tuple] = {}
+        for parts in addresses:
+            unique.setdefault(address_key(*parts), parts)
+
+        async def one(parts):
+            async with slots:
+                return await self.geocode(*parts, remote=remote)
+
+        results = dict(zip(unique, await asyncio.gather(*(one(parts) for parts in unique.values()))))
+        return [results[address_key(*parts)] for parts in addresses]
+
+    async def aclose(self):
+        await self.provider.aclose()
+        await asyncio.to_thread(self.cache.close)
+
+def create_geocoder(provider: Optional[GeocodingProvider] = None, cache_path: str = GEOCODE_CACHE_PATH,
+                    gazetteer_path: str = GAZETTEER_PATH) -> Geocoder:
+    return Geocoder(Gazetteer.from_csv(gazetteer_path), GeocodeCache(cache_path), provider or create_provider())
+
+# Shared instance for request handlers; the provider is only used by batch jobs
+geocoder = create_geocoder(provider=GeocodingProvider())
@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+import heapq
+import itertools
+
+from utils.interval_index import MAX_TIME, MIN_TIME, as_naive_utc
+
+IMPACT_WEIGHTS = {"low": 1.0, "medium": 3.0, "high": 5.0}
+UNVERIFIED_WEIGHT = 0.5  # unverified reports count, but for less
+# Longer disruptions weigh more, up to 2x at a year or open-ended
+MAX_DURATION_WEIGHT = 2.0
+DURATION_SCALE_DAYS = 365.0
+
+def update_weight(update: dict, start: datetime, end: datetime) -> float:
+    """Contribution of one active update to its neighborhood's impact score"""
+    weight = IMPACT_WEIGHTS.get(update.get("impact_level"), 1.0)
+    if not update.get("is_verified"):
+        weight *= UNVERIFIED_WEIGHT
+    if end == MAX_TIME:
+        duration = MAX_DURATION_WEIGHT
+    elif start == MIN_TIME:
+        duration = 1.0
+    else:
+        days = (end - start).total_seconds() / 86400
+        duration = min(MAX_DURATION_WEIGHT, 1.0 + days / DURATION_SCALE_DAYS)
+    return weight * duration
+
+class _Entry:
+    __slots__ = ("key", "neighborhood_id", "update_type", "start", "end", "weight", "payload")
+
+    def __init__(self, key, neighborhood_id, update_type, start, end, weight, payload):
+        self.key = key
+        self.neighborhood_id = neighborhood_id
+        self.update_type = update_type
+        self.start = start
+        self.end = end
+        self.weight = weight
+        self.payload = payload
+
+class _Neighborhood:
+    __slots__ = ("upcoming", "ending", "active", "by_type", "score")
+
+    def __init__(self):
+        self.upcoming: List[Tuple[datetime, int, _Entry]] = []  # min-heap on start
+        self.ending: List[Tuple[datetime, int, _Entry]] = []  # min-heap on end, active entries only
+        self.active: Dict[Hashable, _Entry] = {}
+        self.by_type: Counter = Counter()
+        self.score = 0.0
+
+class ImpactIndex:
+    """Per-neighborhood disruption aggregates, maintained incrementally
+
+    Writes adjust the running totals directly; the passage of time is
+    applied lazily on read by popping the start and end heaps up to now,
+    so a read costs O(log n) per update that started or ended since the
+    last read. Replaced or removed updates leave stale heap entries that
+    are skipped when they surface.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._neighborhoods: Dict[str, _Neighborhood] = {}
+        self._seq = itertools.count()
+
+    def __contains__(self, neighborhood_id: str) -> bool:
+        return neighborhood_id in self._neighborhoods
+
+    def upsert(self, key: Hashable, update: dict, now: Optional[datetime] = None):
+        self.remove(key)
+        neighborhood_id = update.get("neighborhood_id")
+        if not neighborhood_id:
+            return
+        start = as_naive_utc(update.get("start_date"), MIN_TIME)
+        end = as_naive_utc(update.get("end_date"), MAX_TIME)
+        if end < start:
+            start, end = end, start
+        entry = _Entry(key, neighborhood_id, update.get("update_type"), start, end,
+                       update_weight(update, start, end), update)
+        self._entries[key] = entry
+        hood = self._neighborhoods.get(neighborhood_id)
+        if hood is None:
+            hood = self._neighborhoods[neighborhood_id] = _Neighborhood()
+        now = now or datetime.utcnow()
+        self._advance(hood, now)
+        if start > now:
+            heapq.heappush(hood.upcoming, (start, next(self._seq), entry))
+        elif end >= now:
+            self._activate(hood, entry)
+
+    def remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        hood = self._neighborhoods[entry.neighborhood_id]
+        if hood.active.get(key) is entry:
+            self._deactivate(hood, entry)
+
+    def _activate(self, hood: _Neighborhood, entry: _Entry):
+        hood.active[entry.key] = entry
+        hood.by_type[entry.update_type] += 1
+        hood.score += entry.weight
+        if entry.end != MAX_TIME:
+            heapq.heappush(hood.ending, (entry.end, next(self._seq), entry))
+
+    def _deactivate(self, hood: _Neighborhood, entry: _Entry):
+        del hood.active[entry.key]
+        hood.by_type[entry.update_type] -= 1
+        if not hood.by_type[entry.update_type]:
+            del hood.by_type[entry.update_type]
+        hood.score -= entry.weight
+        if not hood.active:
+            hood.score = 0.0  # shed accumulated float error whenever it empties
+
+    def _current(self, entry: _Entry) -> bool:
+        return self._entries.get(entry.key) is entry
+
+    def _advance(self, hood: _Neighborhood, now: datetime):
+        while hood.upcoming and hood.upcoming[0][0] <= now:
+            _, _, entry = heapq.heappop(hood.upcoming)
+            if self._current(entry) and entry.end >= now:
+                self._activate(hood, entry)
+        while hood.ending and hood.ending[0][0] < now:
+            _, _, entry = heapq.heappop(hood.ending)
+            if hood.active.get(entry.key) is entry:
+                self._deactivate(hood, entry)
+
+    def _next_event(self, hood: _Neighborhood) -> Optional[_Entry]:
+        while hood.upcoming and not self._current(hood.upcoming[0][2]):
+            heapq.heappop(hood.upcoming)
+        return hood.upcoming[0][2] if hood.upcoming else None
+
+    def summary(self, neighborhood_id: str, now: Optional[datetime] = None) -> Optional[dict]:
+        hood = self._neighborhoods.get(neighborhood_id)
+        if hood is None:
+            return None
+        now = now or datetime.utcnow()
+        self._advance(hood, now)
+        upcoming = self._next_event(hood)
+        return {
+            "neighborhood_id": neighborhood_id,
+            "active_updates": len(hood.active),
+            "active_by_type": dict(hood.by_type),
+            "impact_score": round(max(hood.score, 0.0), 2),
+            "next_event": None if upcoming is None else {
+                "id": upcoming.key,
+                "title": upcoming.payload.get("title"),
+                "update_type": upcoming.update_type,
+                "impact_level": upcoming.payload.get("impact_level"),
+                "start_date": upcoming.start,
+            },
+            "as_of": now,
+        }
@@ -0,0 +1,170 @@
+from datetime import datetime
+from sqlalchemy import case, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Sequence, Set
+import asyncio
+import os
+
+from models import Notification, NotificationCounter
+from utils.read_path import fetch_rows
+
+INBOX_PAGE_SIZE = int(os.getenv("INBOX_PAGE_SIZE", "20"))
+INBOX_MAX_PAGE_SIZE = 100
+INBOX_LONG_POLL_SECONDS = float(os.getenv("INBOX_LONG_POLL_SECONDS", "25"))
+# Notifications written by another worker don't wake this one; re-check this often
+INBOX_RECHECK_SECONDS = float(os.getenv("INBOX_RECHECK_SECONDS", "5"))
+
+# Columns as the API names them
+INBOX_COLUMNS = (
+    Notification.id,
+    Notification.notification_type.label("type"),
+    Notification.title,
+    Notification.message,
+    Notification.data,
+    Notification.created_at,
+    Notification.is_read.label("read"),
+)
+
+class InboxWaiters:
+    """Long-poll requests parked per user until a notification for them is committed here"""
+
+    def __init__(self):
+        self._waiters: Dict[int, Set[asyncio.Future]] = {}
+
+    def register(self, user_id: int) -> asyncio.Future:
+        """Register before checking the database, so a commit in between still wakes us"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, set()).add(waiter)
+        return waiter
+
+    def discard(self, user_id: int, waiter: asyncio.Future):
+        waiters = self._waiters.get(user_id)
+        if waiters is not None:
+            waiters.discard(waiter)
+            if not waiters:
+                del self._waiters[user_id]
+
+    def wake(self, user_id: int):
+        for waiter in self._waiters.pop(user_id, ()):
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+inbox_waiters = InboxWaiters()
+
+async def _adjust_counter(db: AsyncSession, user_id: int, unread_delta: int,
+                          last_notification_id: Optional[int] = None):
+    """Upsert the user's counter row in the caller's transaction"""
+    connection = await db.connection()
+    insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    now = datetime.utcnow()
+    changes = {
+        "unread_count": NotificationCounter.unread_count + unread_delta,
+        "updated_at": now,
+    }
+    if last_notification_id is not None:
+        # Concurrent writers may commit out of id order; never move it backwards
+        changes["last_notification_id"] = case(
+            (NotificationCounter.last_notification_id < last_notification_id, last_notification_id),
+            else_=NotificationCounter.last_notification_id,
+        )
+    stmt = insert(NotificationCounter).values(
+        user_id=user_id,
+        unread_count=max(unread_delta, 0),
+        last_notification_id=last_notification_id or 0,
+        updated_at=now,
+    ).on_conflict_do_update(index_elements=["user_id"], set_=changes)
+    await db.execute(stmt)
+
+async def notify_user(db: AsyncSession, user_id: int, notification_type: str, title: str,
+                      message: str, data: Optional[dict] = None) -> Notification:
+    """Write a notification and bump the user's counter, commit, then wake their long-polls"""
+    notification = Notification(
+        user_id=user_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        data=data,
+        is_read=False,
+        created_at=datetime.utcnow(),
+    )
+    db.add(notification)
+    await db.flush()
+    await _adjust_counter(db, user_id, 1, notification.id)
+    await db.commit()
+    inbox_waiters.wake(user_id)
+    return notification
+
+async def unread_count(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+    )
+    return result.scalar() or 0
+
+async def last_notification_id(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(NotificationCounter.last_notification_id).where(NotificationCounter.user_id == user_id)
+    )
+    return result.scalar() or 0
+
+async def inbox_page(db: AsyncSession, user_id: int, limit: int = INBOX_PAGE_SIZE,
+                     before_id: Optional[int] = None, after_id: Optional[int] = None,
+                     unread_only: bool = False) -> List:
+    """Newest first, paging back with before_id; with after_id, oldest first (what arrived since)"""
+    stmt = select(*INBOX_COLUMNS).where(Notification.user_id == user_id)
+    if unread_only:
+        stmt = stmt.where(Notification.is_read == False)  # noqa: E712
+    if before_id is not None:
+        stmt = stmt.where(Notification.id < before_id)
+    if after_id is not None:
+        stmt = stmt.where(Notification.id > after_id)
+    order = Notification.id.asc() if after_id is not None else Notification.id.desc()
+    stmt = stmt.order_by(order).limit(min(limit, INBOX_MAX_PAGE_SIZE))
+    return await fetch_rows(db, stmt, name="InboxRow")
+
+async def mark_read(db: AsyncSession, user_id: int, ids: Optional[Sequence[int]] = None,
+                    up_to_id: Optional[int] = None) -> int:
+    """Mark the given ids (or everything up to up_to_id) read; returns how many changed"""
+    stmt = update(Notification).where(Notification.user_id == user_id, Notification.is_read == False)  # noqa: E712
+    if ids is not None:
+        stmt = stmt.where(Notification.id.in_(ids))
+    if up_to_id is not None:
+        stmt = stmt.where(Notification.id <= up_to_id)
+    result = await db.execute(
+        stmt.values(is_read=True, read_at=datetime.utcnow()).execution_options(synchronize_session=False)
+    )
+    # Only rows this statement flipped count, so concurrent mark-reads can't double-decrement
+    changed = result.rowcount
+    if changed:
+        await _adjust_counter(db, user_id, -changed)
+    await db.commit()
+    return changed
+
+async def wait_for_notifications(db: AsyncSession, user_id: int, after_id: int, timeout: float,
+                                 limit: int = INBOX_PAGE_SIZE) -> List:
+    """Long-poll: notifications newer than after_id, waiting up to timeout for one to arrive"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        waiter = inbox_waiters.register(user_id)
+        try:
+            # Counter row first: one primary key lookup decides whether the inbox query is needed
+            if await last_notification_id(db, user_id) > after_id:
+                rows = await inbox_page(db, user_id, limit=limit, after_id=after_id)
+                if rows:
+                    return rows
+            # Give the pooled connection back while parked
+            await db.close()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return []
+            try:
+                await asyncio.wait_for(waiter, min(remaining, INBOX_RECHECK_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            inbox_waiters.discard(user_id, waiter)
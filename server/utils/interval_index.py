@@ -0,0 +1,202 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+import bisect
+import itertools
+import math
+
+# Open-ended intervals (no start_date / no end_date) extend to these
+MIN_TIME = datetime.min
+MAX_TIME = datetime.max
+
+def as_naive_utc(value: Union[str, datetime, None], default: datetime) -> datetime:
+    """Mock rows hold ISO strings, new rows datetimes; compare everything as naive UTC"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+# Record of one interval in a node's lists; seq breaks ties, so keys are never compared
+_Record = Tuple[datetime, int, datetime, Hashable]  # (start, seq, end, key) in by_start, (end, seq, start, key) in by_end
+
+# A subtree is rebuilt when a write leaves a leaf deeper than this allows (scapegoat tree)
+_BALANCE = 0.7
+
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right", "size")
+
+    def __init__(self, center: datetime):
+        self.center = center
+        self.by_start: List[_Record] = []  # intervals containing center, ascending start
+        self.by_end: List[_Record] = []  # the same, ascending end
+        self.left: Optional["_Node"] = None  # intervals entirely before center
+        self.right: Optional["_Node"] = None  # intervals entirely after center
+        self.size = 1  # nodes in this subtree
+
+    def add(self, start: datetime, seq: int, end: datetime, key: Hashable):
+        bisect.insort(self.by_start, (start, seq, end, key))
+        bisect.insort(self.by_end, (end, seq, start, key))
+
+    def discard(self, start: datetime, seq: int, end: datetime):
+        del self.by_start[bisect.bisect_left(self.by_start, (start, seq))]
+        del self.by_end[bisect.bisect_left(self.by_end, (end, seq))]
+
+    def records(self) -> List[_Record]:
+        """Every (start, seq, end, key) in this subtree"""
+        found, stack = [], [self]
+        while stack:
+            node = stack.pop()
+            found.extend(node.by_start)
+            stack.extend(child for child in (node.left, node.right) if child is not None)
+        return found
+
+def _build(records: List[_Record]) -> Optional[_Node]:
+    """Balanced subtree over records: each node centered on the median endpoint"""
+    if not records:
+        return None
+    endpoints = sorted(point for start, _, end, _ in records for point in (start, end))
+    node = _Node(endpoints[len(endpoints) // 2])
+    here, left, right = [], [], []
+    for record in records:
+        if record[2] < node.center:
+            left.append(record)
+        elif record[0] > node.center:
+            right.append(record)
+        else:
+            here.append(record)
+    node.by_start = sorted(here)
+    node.by_end = sorted((end, seq, start, key) for start, seq, end, key in here)
+    node.left = _build(left)
+    node.right = _build(right)
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return node
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+def _center(start: datetime, end: datetime) -> datetime:
+    if start == MIN_TIME:
+        return end
+    if end == MAX_TIME:
+        return start
+    return start + (end - start) / 2
+
+class IntervalIndex:
+    """Centered interval tree over closed [start, end] intervals, maintained in place
+
+    Each node keeps the intervals containing its center in two sorted lists;
+    a write bisects into the one node that owns the interval, or hangs a
+    new leaf off the tree, and rebuilds the smallest unbalanced subtree
+    when that leaf lands too deep. Queries never rebuild: O(log n +
+    matches), with matches sliced straight out of the sorted lists.
+    """
+
+    def __init__(self):
+        self._intervals: Dict[Hashable, Tuple[datetime, int, datetime, Any]] = {}
+        self._root: Optional[_Node] = None
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def insert(self, key: Hashable, start, end, payload: Any = None):
+        start = as_naive_utc(start, MIN_TIME)
+        end = as_naive_utc(end, MAX_TIME)
+        if end < start:
+            start, end = end, start
+        self.remove(key)
+        seq = next(self._seq)
+        self._intervals[key] = (start, seq, end, payload)
+
+        path: List[_Node] = []
+        node = self._root
+        while node is not None and not start <= node.center <= end:
+            path.append(node)
+            node = node.left if end < node.center else node.right
+        if node is not None:
+            node.add(start, seq, end, key)
+            return
+        leaf = _Node(_center(start, end))
+        leaf.add(start, seq, end, key)
+        if not path:
+            self._root = leaf
+            return
+        parent = path[-1]
+        if end < parent.center:
+            parent.left = leaf
+        else:
+            parent.right = leaf
+        for ancestor in path:
+            ancestor.size += 1
+        if len(path) + 1 > 2 * math.log2(self._root.size + 1) + 2:
+            self._rebalance(path)
+
+    def _rebalance(self, path: List[_Node]):
+        """Rebuild the lowest ancestor on path whose subtree is lopsided"""
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            if max(_size(node.left), _size(node.right)) > _BALANCE * node.size:
+                break
+        else:
+            return
+        rebuilt = _build(node.records())
+        if depth == 0:
+            self._root = rebuilt
+            return
+        parent = path[depth - 1]
+        if parent.left is node:
+            parent.left = rebuilt
+        else:
+            parent.right = rebuilt
+        for ancestor in path[:depth]:
+            ancestor.size += rebuilt.size - node.size
+
+    def remove(self, key: Hashable):
+        entry = self._intervals.pop(key, None)
+        if entry is None:
+            return
+        start, seq, end, _ = entry
+        node = self._root
+        while not start <= node.center <= end:
+            node = node.left if end < node.center else node.right
+        node.discard(start, seq, end)
+        # Emptied nodes stay as signposts; shed them once they outnumber the intervals
+        if self._root.size > 2 * len(self._intervals) + 16:
+            self._root = _build(self._root.records())
+
+    def overlapping(self, start, end) -> List[Hashable]:
+        """Keys of intervals sharing at least one instant with [start, end]"""
+        start = as_naive_utc(start, MIN_TIME)
+        end = as_naive_utc(end, MAX_TIME)
+        if end < start:
+            start, end = end, start
+        keys = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            if end < node.center:
+                # Every interval here reaches the center, so it overlaps iff it starts by `end`
+                records = node.by_start[:bisect.bisect_right(node.by_start, (end, math.inf))]
+                if node.left:
+                    stack.append(node.left)
+            elif start > node.center:
+                records = node.by_end[bisect.bisect_left(node.by_end, (start,)):]
+                if node.right:
+                    stack.append(node.right)
+            else:
+                records = node.by_start
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+            keys.extend(record[3] for record in records)
+        return keys
+
+    def at(self, instant) -> List[Hashable]:
+        """Keys of intervals containing instant"""
+        return self.overlapping(instant, instant)
+
+    def payload(self, key: Hashable) -> Any:
+        return self._intervals[key][3]
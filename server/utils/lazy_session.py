@@ -0,0 +1,100 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Awaitable, Callable, Optional
+import inspect
+
+class SessionStats:
+    """How many requests that asked for a session actually used one
+
+    Counted once per HTTP request, however many session dependencies it
+    resolves (an authenticated read gets both get_db and get_read_db).
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.requests_using_db = 0
+        self.sessions_opened = 0
+        self.connections_used = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "requests_using_db": self.requests_using_db,
+            "unused": self.requests - self.requests_using_db,
+            "sessions_opened": self.sessions_opened,
+            "connections_used": self.connections_used,
+        }
+
+session_stats = SessionStats()
+
+_ASYNC_METHODS = frozenset(
+    name for name, value in inspect.getmembers(AsyncSession)
+    if not name.startswith("_") and inspect.iscoroutinefunction(value)
+)
+# Ending a session that was never opened has nothing to do
+_NOOP_WHEN_UNOPENED = frozenset({"close", "commit", "rollback", "flush", "invalidate", "reset"})
+
+class LazySession:
+    """AsyncSession stand-in that only creates the session on first use
+
+    Awaited methods (execute, get, scalars, ...) first resolve the bind via
+    `choose_bind` (e.g. a replica); touching anything synchronous first
+    (add, info, ...) opens the session on the factory's default bind.
+    Sessions sharing one `request_marks` dict count as one request.
+    """
+
+    def __init__(self, factory: Callable[..., AsyncSession], info: Optional[dict] = None,
+                 choose_bind: Optional[Callable[[], Awaitable]] = None,
+                 request_marks: Optional[dict] = None):
+        self._factory = factory
+        self._info = info or {}
+        self._choose_bind = choose_bind
+        self._session: Optional[AsyncSession] = None
+        self._marks = request_marks if request_marks is not None else {}
+        if not self._marks.get("counted"):
+            self._marks["counted"] = True
+            session_stats.requests += 1
+
+    @property
+    def is_open(self) -> bool:
+        return self._session is not None
+
+    def _open(self, bind=None) -> AsyncSession:
+        if self._session is None:
+            self._session = self._factory(bind=bind) if bind is not None else self._factory()
+            self._session.info.update(self._info)
+            self._session.info["homefax_lazy"] = True
+            session_stats.sessions_opened += 1
+            if not self._marks.get("used"):
+                self._marks["used"] = True
+                session_stats.requests_using_db += 1
+        return self._session
+
+    async def _open_async(self) -> AsyncSession:
+        if self._session is None:
+            bind = await self._choose_bind() if self._choose_bind else None
+            self._open(bind)
+        return self._session
+
+    def __getattr__(self, name):
+        if name not in _ASYNC_METHODS:
+            return getattr(self._open(), name)
+
+        async def call(*args, **kwargs):
+            if self._session is None and name in _NOOP_WHEN_UNOPENED:
+                return None
+            session = await self._open_async()
+            return await getattr(session, name)(*args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+
+@event.listens_for(Session, "after_begin")
+def _count_connection(session, transaction, connection):
+    if session.info.pop("homefax_lazy", False):
+        session_stats.connections_used += 1
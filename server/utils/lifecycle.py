@@ -0,0 +1,95 @@
+from typing import Awaitable, Callable, List, Optional, Union
+import asyncio
+import inspect
+import logging
+import os
+import time
+
+logger = logging.getLogger("homefax.lifecycle")
+
+SHUTDOWN_HOOK_TIMEOUT = float(os.getenv("SHUTDOWN_HOOK_TIMEOUT", "10"))
+
+ShutdownHook = Callable[[], Union[None, Awaitable[None]]]
+
+_shutdown_hooks: List[ShutdownHook] = []
+_drain_hooks: List[Callable[[], None]] = []
+
+def on_shutdown(hook: ShutdownHook) -> ShutdownHook:
+    """Register a flush/close hook for background queues; usable as a decorator"""
+    _shutdown_hooks.append(hook)
+    return hook
+
+async def run_shutdown_hooks(timeout: float = SHUTDOWN_HOOK_TIMEOUT):
+    """Run hooks newest first (like a context stack), each bounded by timeout"""
+    for hook in reversed(_shutdown_hooks):
+        name = getattr(hook, "__qualname__", repr(hook))
+        try:
+            result = hook()
+            if inspect.isawaitable(result):
+                await asyncio.wait_for(result, timeout)
+        except asyncio.TimeoutError:
+            logger.error("Shutdown hook %s did not finish within %.1fs", name, timeout)
+        except Exception:
+            logger.exception("Shutdown hook %s failed", name)
+
+def on_drain(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a sync hook run the moment the worker starts draining, before
+    in-flight requests are awaited (e.g. to end long-lived streams)"""
+    _drain_hooks.append(hook)
+    return hook
+
+def begin_drain():
+    if worker_state.draining:
+        return
+    worker_state.draining = True
+    for hook in _drain_hooks:
+        try:
+            hook()
+        except Exception:
+            logger.exception("Drain hook %s failed", getattr(hook, "__qualname__", repr(hook)))
+
+class WorkerState:
+    """Per-process serving counters for /health/worker"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, index: Optional[int] = None, max_requests: Optional[int] = None):
+        # Called again in each forked worker so it doesn't inherit the master's numbers
+        self.pid = os.getpid()
+        self.index = index
+        self.max_requests = max_requests
+        self.started_at = time.time()
+        self.requests = 0
+        self.in_flight = 0
+        self.draining = False
+
+    def snapshot(self) -> dict:
+        return {
+            "pid": self.pid,
+            "worker": self.index,
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "max_requests": self.max_requests,
+            "draining": self.draining,
+        }
+
+worker_state = WorkerState()
+
+class WorkerStatsMiddleware:
+    """Counts requests handled and in flight in this worker"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        worker_state.requests += 1
+        worker_state.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            worker_state.in_flight -= 1
@@ -0,0 +1,135 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from fastapi import Response
+from starlette.routing import Match
+import asyncio
+import os
+import time
+
+from utils.pool_metrics import get_pool_stats
+
+# With PROMETHEUS_MULTIPROC_DIR set (serve.py does this before forking), every
+# worker writes its samples to mmap'd files there and /metrics aggregates them,
+# whichever worker answers the scrape.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_POOL_INTERVAL = float(os.getenv("METRICS_POOL_INTERVAL", "5"))
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+UNMATCHED_ROUTE = "<unmatched>"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUESTS = Counter(
+    "homefax_http_requests_total", "HTTP requests served",
+    ["method", "route", "status"]
+)
+LATENCY = Histogram(
+    "homefax_http_request_duration_seconds", "HTTP request latency",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "homefax_http_requests_in_flight", "HTTP requests being served",
+    ["method", "route"], multiprocess_mode="livesum"
+)
+POOL_CONNECTIONS = Gauge(
+    "homefax_db_pool_connections", "Database pool connections by state",
+    ["pool", "state"], multiprocess_mode="livesum"
+)
+POOL_CHECKOUT_TIMEOUTS = Gauge(
+    "homefax_db_pool_checkout_timeouts", "Pool checkouts that timed out since worker start",
+    ["pool"], multiprocess_mode="livesum"
+)
+CACHE_REQUESTS = Counter(
+    "homefax_cache_requests_total", "Cache lookups by result (hit ratio = hit / all)",
+    ["cache", "result"]
+)
+PENDING_DELIVERIES = Gauge(
+    "homefax_background_pending_deliveries",
+    "Deliveries still to make for background jobs running in this worker (not jobs waiting to be claimed)",
+    ["queue"], multiprocess_mode="livesum"
+)
+NOTIFICATIONS = Counter(
+    "homefax_notifications_total", "Notification deliveries by channel and result",
+    ["channel", "result"]
+)
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+def set_pending_deliveries(queue: str, pending: int):
+    PENDING_DELIVERIES.labels(queue).set(pending)
+
+def record_notifications(channel: str, delivered: int, failed: int):
+    NOTIFICATIONS.labels(channel, "delivered").inc(delivered)
+    NOTIFICATIONS.labels(channel, "failed").inc(failed)
+
+def update_pool_gauges():
+    for pool, stats in get_pool_stats().items():
+        POOL_CONNECTIONS.labels(pool, "idle").set(stats["checked_in"])
+        POOL_CONNECTIONS.labels(pool, "in_use").set(stats["in_use"])
+        POOL_CONNECTIONS.labels(pool, "overflow").set(max(stats["overflow"], 0))
+        POOL_CHECKOUT_TIMEOUTS.labels(pool).set(stats["timeouts"])
+
+async def refresh_pool_gauges(interval: float = METRICS_POOL_INTERVAL):
+    """Background task: pool gauges are sampled, not updated on every checkout"""
+    while True:
+        update_pool_gauges()
+        await asyncio.sleep(interval)
+
+def metrics_response() -> Response:
+    update_pool_gauges()
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+def mark_worker_dead(pid: int):
+    """Drop a dead worker's live gauges (counters and histograms keep accumulating)"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+class MetricsMiddleware:
+    """Request count, latency and in-flight per route template (not raw path)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        # Resolved up front (Starlette 0.27 doesn't expose the matched route) so
+        # in-flight can be labelled too; it's one regex match per route
+        partial = None
+        for route in scope["app"].routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                partial = route.path
+        return partial or UNMATCHED_ROUTE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route_template(scope)
+        status_code = 500
+        in_flight = IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            in_flight.dec()
@@ -0,0 +1,69 @@
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from typing import Optional, Set
+import os
+import re
+
+# Alembic itself is imported inside the functions that need it: it costs
+# ~150 ms of import time and the startup check below doesn't use it.
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(SERVER_DIR, "alembic.ini")
+VERSIONS_DIR = os.path.join(SERVER_DIR, "alembic", "versions")
+
+_REVISION_RE = re.compile(r"^revision(?:\s*:\s*[^=]+)?\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision(?:\s*:\s*[^=]+)?\s*=\s*(.+)$", re.MULTILINE)
+
+class SchemaOutOfDateError(RuntimeError):
+    """The live database is not at the latest Alembic revision"""
+
+def alembic_config():
+    """Alembic config that works regardless of the current working directory"""
+    from alembic.config import Config
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(SERVER_DIR, "alembic"))
+    return config
+
+def script_head_revisions(versions_dir: str = VERSIONS_DIR) -> Set[str]:
+    """Heads read straight from the revision files, without importing Alembic or the scripts"""
+    revisions, parents = set(), set()
+    for filename in os.listdir(versions_dir):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, filename)) as f:
+            source = f.read()
+        revision = _REVISION_RE.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION_RE.search(source)
+        if down_revision:
+            parents.update(re.findall(r"['\"]([^'\"]+)['\"]", down_revision.group(1)))
+    return revisions - parents
+
+def database_revisions(engine) -> Set[str]:
+    """Contents of alembic_version (empty when the table doesn't exist yet)"""
+    try:
+        with engine.connect() as connection:
+            return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+    except (OperationalError, ProgrammingError):
+        return set()
+
+def ensure_schema_current(engine):
+    """Fail fast at startup instead of serving requests against an old schema"""
+    current = database_revisions(engine)
+    head = script_head_revisions()
+    if current != head:
+        raise SchemaOutOfDateError(
+            f"Database schema is at revision {', '.join(sorted(current)) or '<none>'} "
+            f"but migrations head is {', '.join(sorted(head))}. "
+            "Run `python -m alembic upgrade head` from the server directory."
+        )
+
+def upgrade_to_head(database_url: Optional[str] = None):
+    """Apply all pending migrations to database_url (default DATABASE_URL)"""
+    from alembic import command
+    config = alembic_config()
+    if database_url:
+        config.attributes["database_url"] = database_url
+    command.upgrade(config, "head")
@@ -0,0 +1,165 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+import glob
+import json
+import logging
+import os
+
+try:
+    import numpy as np
+except ImportError:  # optional; bulk assignment falls back to one point at a time
+    np = None
+
+from utils.geo import BBox, geometry_bbox, validate_geometry
+from utils.spatial_index import GridIndex
+
+logger = logging.getLogger("homefax.neighborhoods")
+
+NEIGHBORHOODS_DIR = os.getenv(
+    "NEIGHBORHOODS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "neighborhoods")
+)
+
+class NeighborhoodPolygon:
+    """One neighborhood boundary; all rings of all parts share one even-odd edge list"""
+
+    __slots__ = ("neighborhood_id", "name", "geometry", "bbox", "rings", "edges")
+
+    def __init__(self, neighborhood_id: str, name: Optional[str], geometry: dict):
+        self.neighborhood_id = neighborhood_id
+        self.name = name
+        self.geometry = geometry
+        self.bbox = geometry_bbox(geometry)
+        polygons = [geometry["coordinates"]] if geometry["type"] == "Polygon" else geometry["coordinates"]
+        self.rings = [[(float(p[0]), float(p[1])) for p in ring] for polygon in polygons for ring in polygon]
+        # (x1, y1, x2, y2) per edge, for the vectorized test
+        self.edges = None
+        if np is not None:
+            self.edges = np.array(
+                [(*a, *b) for ring in self.rings for a, b in zip(ring, ring[1:] + ring[:1]) if a != b],
+                dtype=float
+            )
+
+    def contains(self, lon: float, lat: float) -> bool:
+        inside = False
+        for ring in self.rings:
+            for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+                if (y1 > lat) != (y2 > lat) and lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+                    inside = not inside
+        return inside
+
+    def contains_many(self, lons, lats):
+        """Boolean mask of points inside, ray casting every edge against all points at once"""
+        inside = np.zeros(len(lons), dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for x1, y1, x2, y2 in self.edges:
+                crosses = (y1 > lats) != (y2 > lats)
+                inside ^= crosses & (lons < x1 + (lats - y1) * (x2 - x1) / (y2 - y1))
+        return inside
+
+class NeighborhoodIndex:
+    """Neighborhood boundaries from GeoJSON, with point lookup through a GridIndex on their bboxes
+
+    Where boundaries overlap, the polygon loaded first wins (files load in
+    name order, features in file order).
+    """
+
+    def __init__(self, polygons: Iterable[NeighborhoodPolygon] = ()):
+        self._polygons: List[NeighborhoodPolygon] = []
+        self._by_id: Dict[str, NeighborhoodPolygon] = {}
+        self._order: Dict[str, int] = {}
+        self._grid = GridIndex()
+        for polygon in polygons:
+            self.add(polygon)
+
+    def __len__(self) -> int:
+        return len(self._polygons)
+
+    def __contains__(self, neighborhood_id: str) -> bool:
+        return neighborhood_id in self._by_id
+
+    def add(self, polygon: NeighborhoodPolygon):
+        if polygon.neighborhood_id in self._by_id:
+            raise ValueError(f"Duplicate neighborhood_id {polygon.neighborhood_id!r}")
+        self._order[polygon.neighborhood_id] = len(self._polygons)
+        self._polygons.append(polygon)
+        self._by_id[polygon.neighborhood_id] = polygon
+        self._grid.insert(polygon.neighborhood_id, polygon.geometry, polygon)
+
+    def get(self, neighborhood_id: str) -> Optional[NeighborhoodPolygon]:
+        return self._by_id.get(neighborhood_id)
+
+    def bbox(self, neighborhood_id: str) -> Optional[BBox]:
+        polygon = self._by_id.get(neighborhood_id)
+        return polygon.bbox if polygon else None
+
+    def assign(self, lon: Optional[float], lat: Optional[float]) -> Optional[str]:
+        """neighborhood_id containing the point, or None"""
+        if lon is None or lat is None:
+            return None
+        candidates = sorted(self._grid.query_bbox((lon, lat, lon, lat)), key=self._order.__getitem__)
+        for neighborhood_id in candidates:
+            if self._by_id[neighborhood_id].contains(lon, lat):
+                return neighborhood_id
+        return None
+
+    def assign_many(self, lons: Sequence[Optional[float]], lats: Sequence[Optional[float]]) -> List[Optional[str]]:
+        """assign() for many points; vectorized with numpy when it is installed"""
+        if np is None:
+            return [self.assign(lon, lat) for lon, lat in zip(lons, lats)]
+        xs = np.array([np.nan if v is None else v for v in lons], dtype=float)
+        ys = np.array([np.nan if v is None else v for v in lats], dtype=float)
+        found = np.full(len(xs), -1, dtype=np.int64)
+        valid = np.flatnonzero(~(np.isnan(xs) | np.isnan(ys)))
+        # Sorted by longitude, each polygon's candidates are one contiguous slice
+        order = valid[np.argsort(xs[valid], kind="stable")]
+        sorted_xs = xs[order]
+        for index, polygon in enumerate(self._polygons):
+            min_x, min_y, max_x, max_y = polygon.bbox
+            lo = np.searchsorted(sorted_xs, min_x, side="left")
+            hi = np.searchsorted(sorted_xs, max_x, side="right")
+            candidates = order[lo:hi]
+            candidates = candidates[(ys[candidates] >= min_y) & (ys[candidates] <= max_y) & (found[candidates] < 0)]
+            if len(candidates):
+                inside = polygon.contains_many(xs[candidates], ys[candidates])
+                found[candidates[inside]] = index
+        ids = [polygon.neighborhood_id for polygon in self._polygons]
+        return [ids[i] if i >= 0 else None for i in found.tolist()]
+
+    def summaries(self) -> List[dict]:
+        return [{"neighborhood_id": p.neighborhood_id, "name": p.name, "bbox": list(p.bbox)} for p in self._polygons]
+
+def _features(document: dict) -> Iterable[dict]:
+    if document.get("type") == "FeatureCollection":
+        return document.get("features") or []
+    if document.get("type") == "Feature":
+        return [document]
+    raise ValueError("expected a Feature or FeatureCollection")
+
+def read_geojson(path: str) -> List[NeighborhoodPolygon]:
+    with open(path) as f:
+        document = json.load(f)
+    polygons = []
+    for number, feature in enumerate(_features(document)):
+        properties = feature.get("properties") or {}
+        neighborhood_id = properties.get("neighborhood_id") or feature.get("id")
+        geometry = feature.get("geometry") or {}
+        if not neighborhood_id:
+            raise ValueError(f"{path}: feature {number} has no neighborhood_id")
+        if geometry.get("type") not in ("Polygon", "MultiPolygon"):
+            raise ValueError(f"{path}: {neighborhood_id} must be a Polygon or MultiPolygon")
+        try:
+            validate_geometry(geometry)
+        except ValueError as e:
+            raise ValueError(f"{path}: {neighborhood_id}: {e}")
+        polygons.append(NeighborhoodPolygon(str(neighborhood_id), properties.get("name"), geometry))
+    return polygons
+
+def load_neighborhoods(directory: str = NEIGHBORHOODS_DIR) -> NeighborhoodIndex:
+    """Every *.geojson / *.json file in directory, in name order"""
+    paths = sorted(glob.glob(os.path.join(directory, "*.geojson")) + glob.glob(os.path.join(directory, "*.json")))
+    index = NeighborhoodIndex(polygon for path in paths for polygon in read_geojson(path))
+    if not paths:
+        logger.warning("No neighborhood boundaries found in %s", directory)
+    return index
+
+neighborhood_index = load_neighborhoods()
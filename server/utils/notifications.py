@@ -0,0 +1,368 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, exists, false, func, or_, select, update
+from typing import Dict, List, NamedTuple, Optional
+import asyncio
+import logging
+import os
+import random
+import socket
+
+from database import AsyncSessionLocal
+from models import NotificationJob, Property, User
+from utils.lifecycle import on_shutdown
+from utils.metrics import record_notifications, set_pending_deliveries
+
+logger = logging.getLogger("homefax.notifications")
+
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))  # jobs run concurrently per process; 0 disables
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "500"))  # recipients resolved per query
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "200"))  # deliveries in flight per process
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))  # per delivery, and per job
+NOTIFY_RETRY_BASE_SECONDS = float(os.getenv("NOTIFY_RETRY_BASE_SECONDS", "0.5"))
+NOTIFY_RETRY_MAX_SECONDS = float(os.getenv("NOTIFY_RETRY_MAX_SECONDS", "60"))
+NOTIFY_POLL_SECONDS = float(os.getenv("NOTIFY_POLL_SECONDS", "2"))
+NOTIFY_LEASE_SECONDS = float(os.getenv("NOTIFY_LEASE_SECONDS", "60"))
+NOTIFY_CHANNELS = [name.strip() for name in os.getenv("NOTIFY_CHANNELS", "log").split(",") if name.strip()]
+NOTIFY_AUDIENCE_PADDING_M = float(os.getenv("NOTIFY_AUDIENCE_PADDING_M", "500"))
+
+QUEUE_NAME = "notifications"
+
+class Recipient(NamedTuple):
+    user_id: int
+    email: str
+    phone: Optional[str]
+    first_name: str
+
+class DeliveryError(Exception):
+    """Raised by channels; retryable=False skips the remaining attempts (bad address etc.)"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class NotificationChannel:
+    """Delivery backend; subclass, set name, implement send() and register_channel() it"""
+
+    name = "base"
+
+    async def send(self, recipient: Recipient, job: dict):
+        raise NotImplementedError
+
+class LogChannel(NotificationChannel):
+    """Stand-in channel that only logs; NOTIFY_LOG_FAILURE_RATE injects transient failures"""
+
+    name = "log"
+
+    def __init__(self, failure_rate: float = 0.0):
+        self.failure_rate = failure_rate
+        self.sent = 0
+
+    async def send(self, recipient: Recipient, job: dict):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise DeliveryError("injected failure")
+        self.sent += 1
+        logger.debug("Notify user %s (%s) [%s]: %s", recipient.user_id, recipient.email,
+                     job["notification_type"], job["message"])
+
+channels: Dict[str, NotificationChannel] = {}
+
+def register_channel(channel: NotificationChannel) -> NotificationChannel:
+    channels[channel.name] = channel
+    return channel
+
+register_channel(LogChannel(float(os.getenv("NOTIFY_LOG_FAILURE_RATE", "0"))))
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, so retries from one batch don't arrive together"""
+    delay = min(NOTIFY_RETRY_MAX_SECONDS, NOTIFY_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+def recipients_query(audience: Optional[dict]):
+    """Active owners of a property in the job's neighborhood (or, without boundaries, its bbox)"""
+    stmt = select(User.id, User.email, User.phone, User.first_name).where(User.is_active.is_not(False))
+    audience = audience or {}
+    if audience.get("neighborhood_id"):
+        return stmt.where(exists().where(
+            Property.owner_id == User.id,
+            Property.neighborhood_id == audience["neighborhood_id"],
+        ))
+    bbox = audience.get("bbox")
+    if not bbox:
+        return stmt.where(false())
+    return stmt.where(exists().where(
+        Property.owner_id == User.id,
+        Property.longitude.between(bbox[0], bbox[2]),
+        Property.latitude.between(bbox[1], bbox[3]),
+    ))
+
+async def resolve_recipients(db, audience: Optional[dict], after_id: int, limit: int) -> List[Recipient]:
+    """Next page of recipients by user id (keyset, so a resumed job continues where it stopped)"""
+    stmt = recipients_query(audience).where(User.id > after_id).order_by(User.id).limit(limit)
+    result = await db.execute(stmt)
+    return [Recipient(*row) for row in result.all()]
+
+async def count_recipients(db, audience: Optional[dict]) -> int:
+    result = await db.execute(select(func.count()).select_from(recipients_query(audience).subquery()))
+    return result.scalar()
+
+def job_progress(job) -> dict:
+    """Status payload for the admin progress endpoint"""
+    expected = (job.total_recipients or 0) * len(job.channels or ())
+    done = job.delivered + job.failed
+    return {
+        "id": job.id,
+        "neighborhood_id": job.neighborhood_id,
+        "notification_type": job.notification_type,
+        "channels": job.channels,
+        "status": job.status,
+        "total_recipients": job.total_recipients,
+        "delivered": job.delivered,
+        "failed": job.failed,
+        "progress": 1.0 if job.status == "completed" else round(done / expected, 4) if expected else 0.0,
+        "attempts": job.attempts,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+class LeaseLost(Exception):
+    """Another worker took the job over after our lease expired"""
+
+class NotificationDispatcher:
+    """Worker pool draining notification_jobs
+
+    Jobs are claimed with a conditional UPDATE and a lease, so several
+    processes can share the table; a job whose worker died is picked up
+    again once its lease expires. Progress (the recipient cursor and
+    counters) is committed after every batch, so a restarted job resends
+    at most one batch: delivery is at-least-once.
+    """
+
+    def __init__(self, workers: int = NOTIFY_WORKERS, batch_size: int = NOTIFY_BATCH_SIZE,
+                 concurrency: int = NOTIFY_CONCURRENCY):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.session_factory = AsyncSessionLocal
+        self.worker_id: Optional[str] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._stopping = False
+        self._remaining: Dict[int, int] = {}  # job id -> deliveries left, for the queue depth gauge
+
+    async def start(self):
+        if not self.workers or self._tasks:
+            return
+        # Set here rather than in __init__: serve.py forks workers after import
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Finish the current batch of each job, hand the jobs back to the queue and exit"""
+        self._stopping = True
+        if self._wakeup:
+            self._wakeup.set()
+        tasks, self._tasks = self._tasks, []
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wake(self):
+        """Poke idle workers in this process after an enqueue (others find it on their next poll)"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def enqueue(self, db, neighborhood_id: str, message: str, notification_type: str,
+                      channel_names: List[str], audience: dict, created_by: int) -> NotificationJob:
+        job = NotificationJob(
+            neighborhood_id=neighborhood_id,
+            notification_type=notification_type,
+            message=message,
+            audience=audience,
+            channels=channel_names,
+            status="queued",
+            delivered=0,
+            failed=0,
+            cursor=0,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+            created_by=created_by,
+        )
+        db.add(job)
+        await db.commit()
+        self.wake()
+        return job
+
+    async def _worker(self):
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                job_id = await self._claim()
+            except Exception:
+                logger.exception("Could not claim a notification job")
+                job_id = None
+            if job_id is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), NOTIFY_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job_id)
+
+    def _claimable(self, now: datetime):
+        return or_(
+            and_(NotificationJob.status == "queued", NotificationJob.next_attempt_at <= now),
+            and_(NotificationJob.status == "running", NotificationJob.locked_until < now),
+        )
+
+    async def _claim(self) -> Optional[int]:
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(NotificationJob.id).where(self._claimable(now))
+                .order_by(NotificationJob.id).limit(self.workers + 1)
+            )
+            for job_id in result.scalars().all():
+                # Re-checking the condition in the UPDATE makes the claim atomic across processes
+                claimed = await db.execute(
+                    update(NotificationJob)
+                    .where(NotificationJob.id == job_id, self._claimable(now))
+                    .values(
+                        status="running",
+                        locked_by=self.worker_id,
+                        locked_until=now + timedelta(seconds=NOTIFY_LEASE_SECONDS),
+                        started_at=func.coalesce(NotificationJob.started_at, now),
+                    )
+                )
+                await db.commit()
+                if claimed.rowcount == 1:
+                    return job_id
+        return None
+
+    async def _save(self, db, job_id: int, **values):
+        """Write job columns, but only while we still hold its lease"""
+        result = await db.execute(
+            update(NotificationJob)
+            .where(NotificationJob.id == job_id, NotificationJob.locked_by == self.worker_id)
+            .values(**values)
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            raise LeaseLost(job_id)
+
+    async def _run(self, job_id: int):
+        try:
+            await self._process(job_id)
+        except LeaseLost:
+            logger.warning("Lost the lease on notification job %s; another worker continues it", job_id)
+        except Exception as e:
+            logger.exception("Notification job %s failed", job_id)
+            await self._retry_later(job_id, e)
+        finally:
+            self._remaining.pop(job_id, None)
+            set_pending_deliveries(QUEUE_NAME, sum(self._remaining.values()))
+
+    async def _retry_later(self, job_id: int, error: Exception):
+        try:
+            async with self.session_factory() as db:
+                job = await db.get(NotificationJob, job_id)
+                attempts = job.attempts + 1
+                given_up = attempts >= NOTIFY_MAX_ATTEMPTS
+                await self._save(
+                    db, job_id,
+                    attempts=attempts,
+                    last_error=f"{type(error).__name__}: {error}",
+                    status="failed" if given_up else "queued",
+                    next_attempt_at=datetime.utcnow() + timedelta(seconds=retry_delay(attempts)),
+                    finished_at=datetime.utcnow() if given_up else None,
+                    locked_by=None,
+                    locked_until=None,
+                )
+        except LeaseLost:
+            pass
+        except Exception:
+            # Leave it; the lease expires and the job is claimed again
+            logger.exception("Could not reschedule notification job %s", job_id)
+
+    async def _process(self, job_id: int):
+        async with self.session_factory() as db:
+            job = await db.get(NotificationJob, job_id)
+            targets = [channels[name] for name in job.channels if name in channels]
+            if len(targets) != len(job.channels):
+                unknown = sorted(set(job.channels) - set(channels))
+                await self._save(db, job_id, status="failed", last_error=f"Unknown channels: {unknown}",
+                                 finished_at=datetime.utcnow(), locked_by=None, locked_until=None)
+                return
+            total_recipients = job.total_recipients
+            if total_recipients is None:
+                total_recipients = await count_recipients(db, job.audience)
+                await self._save(db, job_id, total_recipients=total_recipients)
+            payload = {
+                "id": job.id,
+                "neighborhood_id": job.neighborhood_id,
+                "notification_type": job.notification_type,
+                "message": job.message,
+            }
+            cursor, delivered, failed = job.cursor, job.delivered, job.failed
+            expected = total_recipients * len(targets)
+
+            while not self._stopping:
+                self._remaining[job_id] = max(expected - delivered - failed, 0)
+                set_pending_deliveries(QUEUE_NAME, sum(self._remaining.values()))
+                recipients = await resolve_recipients(db, job.audience, cursor, self.batch_size)
+                if not recipients:
+                    break
+                sent = await self._deliver_batch(targets, recipients, payload)
+                cursor = recipients[-1].user_id
+                delivered += sent
+                failed += len(recipients) * len(targets) - sent
+                await self._save(
+                    db, job_id,
+                    cursor=cursor,
+                    delivered=delivered,
+                    failed=failed,
+                    locked_until=datetime.utcnow() + timedelta(seconds=NOTIFY_LEASE_SECONDS),
+                )
+
+            if self._stopping:
+                # Shutting down: hand the job back so any worker resumes from the cursor
+                await self._save(db, job_id, status="queued", locked_by=None, locked_until=None)
+                return
+            await self._save(db, job_id, status="completed", finished_at=datetime.utcnow(),
+                             locked_by=None, locked_until=None)
+
+    async def _deliver_batch(self, targets: List[NotificationChannel], recipients: List[Recipient],
+                             payload: dict) -> int:
+        """Deliver one batch on every channel; returns the number of successful deliveries"""
+        total = 0
+        for channel in targets:
+            results = await asyncio.gather(*(self._deliver(channel, recipient, payload) for recipient in recipients))
+            sent = sum(results)
+            record_notifications(channel.name, sent, len(results) - sent)
+            total += sent
+        return total
+
+    async def _deliver(self, channel: NotificationChannel, recipient: Recipient, payload: dict) -> bool:
+        for attempt in range(1, NOTIFY_MAX_ATTEMPTS + 1):
+            try:
+                async with self._slots:
+                    await channel.send(recipient, payload)
+                return True
+            except DeliveryError as e:
+                if not e.retryable or attempt == NOTIFY_MAX_ATTEMPTS:
+                    logger.warning("Giving up on %s delivery to user %s: %s", channel.name, recipient.user_id, e)
+                    return False
+            except Exception:
+                if attempt == NOTIFY_MAX_ATTEMPTS:
+                    logger.exception("Giving up on %s delivery to user %s", channel.name, recipient.user_id)
+                    return False
+            # Back off outside the semaphore so waiting retries don't hold delivery slots
+            await asyncio.sleep(retry_delay(attempt))
+        return False
+
+notification_dispatcher = NotificationDispatcher()
+
+on_shutdown(notification_dispatcher.stop)
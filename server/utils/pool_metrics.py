@@ -0,0 +1,84 @@
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Dict
+import threading
+import time
+
+class PoolStats:
+    """Checkout latency, overflow and timeout counters for one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.pool = None
+
+    def record_checkout(self, waited: float, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            if waited > self.wait_max:
+                self.wait_max = waited
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        """Counters plus the live size / in-use / overflow of the pool"""
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max * 1000, 3),
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+            }
+        pool = self.pool
+        if pool is not None:
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "in_use": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+class _TimedCheckoutMixin:
+    """Times QueuePool._do_get, the only place a checkout can wait"""
+
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Pools are recreated on dispose(); always report the live one
+        self.stats.pool = self
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start, self._overflow > overflow_before and self._overflow > 0)
+        return connection
+
+_POOL_STATS: Dict[str, PoolStats] = {}
+
+def instrumented_pool_class(name: str, async_driver: bool = False):
+    """Build a QueuePool subclass that reports into the stats registered under name"""
+    stats = _POOL_STATS.setdefault(name, PoolStats(name))
+    base = AsyncAdaptedQueuePool if async_driver else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"stats": stats})
+
+def get_pool_stats() -> Dict[str, dict]:
+    """Snapshot of every instrumented pool, keyed by name"""
+    return {name: stats.snapshot() for name, stats in _POOL_STATS.items()}
@@ -0,0 +1,246 @@
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from collections import Counter
+from typing import Dict, List, Optional
+import asyncio
+import glob
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from database import get_db
+from utils.auth import get_current_user, security
+from utils.permissions import require_role
+
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # profile 1 in N requests; 0 = off
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "homefax-profiles"))
+
+_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+class Profile:
+    """Stack samples of one request, foldable into flame graph input"""
+
+    def __init__(self, profile_id: str, method: str, path: str, trigger: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.duration_ms = 0.0
+        self.status_code: Optional[int] = None
+        self.stacks: Counter = Counter()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded format, one `root;...;leaf count` line per stack"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Profile":
+        profile = cls(data["id"], data["method"], data["path"], data["trigger"])
+        profile.started_at = data["started_at"]
+        profile.duration_ms = data["duration_ms"]
+        profile.status_code = data["status_code"]
+        profile.stacks = Counter(data["stacks"])
+        return profile
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms, 3),
+            "samples": self.samples,
+        }
+
+class ProfileStore:
+    """Most recent profiles of all workers, one JSON file each in a shared directory
+
+    Whichever worker captured a profile, any worker can list and serve it.
+    Each write prunes the oldest files beyond `size`. Blocking file I/O:
+    call from a worker thread.
+    """
+
+    _ID = re.compile(r"[0-9a-f]+-[0-9]+-[0-9]+")
+
+    def __init__(self, directory: str = PROFILE_DIR, size: int = PROFILE_BUFFER_SIZE):
+        self.directory = directory
+        self.size = size
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> str:
+        # Start time in the id keeps it unique when a restarted worker reuses a pid
+        return f"{int(time.time()):x}-{os.getpid()}-{next(self._ids)}"
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.json")
+
+    def _paths(self) -> List[str]:
+        """Profile files, newest first"""
+        paths = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                paths.append((os.stat(path).st_mtime_ns, path))
+            except FileNotFoundError:  # pruned by another worker
+                pass
+        return [path for _, path in sorted(paths, reverse=True)]
+
+    def add(self, profile: Profile):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(profile.id)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({**profile.summary(), "stacks": profile.stacks}, f)
+        os.replace(tmp, path)
+        for stale in self._paths()[self.size:]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+    def _read(self, path: str) -> Optional[Profile]:
+        try:
+            with open(path) as f:
+                return Profile.from_dict(json.load(f))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        if not self._ID.fullmatch(profile_id):
+            return None
+        return self._read(self._path(profile_id))
+
+    def list(self) -> List[dict]:
+        profiles = (self._read(path) for path in self._paths()[:self.size])
+        return [profile.summary() for profile in profiles if profile is not None]
+
+profile_store = ProfileStore()
+
+_labels: Dict[object, str] = {}
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        filename = code.co_filename
+        if filename.startswith(_SERVER_DIR):
+            filename = filename[len(_SERVER_DIR):]
+        else:
+            filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+        label = _labels[code] = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label
+
+class StackSampler(threading.Thread):
+    """Samples the event loop thread while the profiled request's task is running
+
+    Other requests interleaved on the same loop are skipped; work the request
+    hands to the thread pool (sync dependencies) is not attributed to it.
+    """
+
+    def __init__(self, profile: Profile, loop: asyncio.AbstractEventLoop, task: asyncio.Task, interval: float):
+        super().__init__(name=f"profiler-{profile.id}", daemon=True)
+        self.profile = profile
+        self.loop = loop
+        self.task = task
+        self.interval = interval
+        self.target_thread = threading.get_ident()
+        self._stopped = threading.Event()
+
+    def run(self):
+        stacks = self.profile.stacks
+        while not self._stopped.wait(self.interval):
+            if asyncio.current_task(self.loop) is not self.task:
+                continue
+            frame = sys._current_frames().get(self.target_thread)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                stacks[";".join(reversed(labels))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+async def _admin_check(scope) -> Optional[JSONResponse]:
+    """Same checks as Depends(require_role(["admin"])); an error response when they fail"""
+    request = Request(scope)
+    db_dependency = get_db(request)
+    db = await db_dependency.__anext__()
+    try:
+        credentials = await security(request)
+        user = await get_current_user(credentials, db)
+        require_role(["admin"])(user)
+    except HTTPException as e:
+        return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+    finally:
+        await db_dependency.aclose()
+    return None
+
+class ProfilingMiddleware:
+    """`X-Profile: 1` from an admin, or 1 in PROFILE_SAMPLE_RATE requests, runs under the sampler
+
+    Profiles land in `profile_store`; header-triggered ones return their id in
+    `X-Profile-Id`, which GET /api/admin/profiles/{id} serves from any worker. Without the header and with sampling off this is one
+    header scan per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trigger = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile" and value.lower() in (b"1", b"true", b"yes"):
+                error = await _admin_check(scope)
+                if error is not None:
+                    await error(scope, receive, send)
+                    return
+                trigger = "header"
+                break
+        if trigger is None and PROFILE_SAMPLE_RATE:
+            self._requests += 1
+            if self._requests % PROFILE_SAMPLE_RATE == 0:
+                trigger = "sampled"
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(profile_store.next_id(), scope["method"], scope["path"], trigger)
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                if trigger == "header":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile.id.encode()))
+                    message["headers"] = headers
+            await send(message)
+
+        sampler = StackSampler(profile, asyncio.get_running_loop(), asyncio.current_task(), PROFILE_INTERVAL_MS / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            await asyncio.to_thread(profile_store.add, profile)
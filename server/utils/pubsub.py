@@ -0,0 +1,208 @@
+from collections import defaultdict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+import asyncio
+import itertools
+import json
+import logging
+import os
+
+from utils.lifecycle import on_drain, on_shutdown
+
+logger = logging.getLogger("homefax.pubsub")
+
+FEED_BROKER_URL = os.getenv("FEED_BROKER_URL", "")  # redis://... for cross-worker fan-out
+FEED_REPLAY_SIZE = int(os.getenv("FEED_REPLAY_SIZE", "500"))  # events kept per channel for resume
+FEED_SUBSCRIBER_QUEUE = int(os.getenv("FEED_SUBSCRIBER_QUEUE", "100"))
+
+class Event:
+    __slots__ = ("id", "channel", "type", "data")
+
+    def __init__(self, event_id: int, channel: str, event_type: str, data: Any):
+        self.id = event_id
+        self.channel = channel
+        self.type = event_type
+        self.data = data
+
+    def to_json(self) -> str:
+        return json.dumps({"id": self.id, "channel": self.channel, "type": self.type, "data": self.data}, default=str)
+
+    @classmethod
+    def from_json(cls, raw) -> "Event":
+        message = json.loads(raw)
+        return cls(message["id"], message["channel"], message["type"], message["data"])
+
+# Put on a subscriber's queue to end its stream (worker draining, or it fell too far behind)
+_CLOSE = object()
+
+class Subscription:
+    """Live events for one connection; iterate it, and call close() when done"""
+
+    def __init__(self, broker: "LocalBroker", channel: str, backlog):
+        self.broker = broker
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=FEED_SUBSCRIBER_QUEUE)
+        for event in backlog:
+            self.queue.put_nowait(event)
+        self.closed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A stalled client must not hold memory for everyone else; it will
+            # reconnect with Last-Event-ID and replay from the buffer
+            self.end()
+
+    def end(self):
+        self.closed = True
+        while True:
+            try:
+                self.queue.put_nowait(_CLOSE)
+                return
+            except asyncio.QueueFull:
+                self.queue.get_nowait()
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """Next event, None on timeout (send a heartbeat); StopAsyncIteration once ended"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is _CLOSE:
+            raise StopAsyncIteration
+        return event
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+class LocalBroker:
+    """In-process fan-out with a per-channel replay buffer
+
+    A subscriber is just a bounded queue, so thousands of idle connections
+    cost a few hundred bytes each and no tasks. Only reaches subscribers in
+    this process; RedisBroker broadcasts across workers.
+    """
+
+    def __init__(self, replay_size: int = FEED_REPLAY_SIZE):
+        self.replay_size = replay_size
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._replay: Dict[str, Deque[Event]] = defaultdict(lambda: deque(maxlen=self.replay_size))
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self.close_subscribers()
+
+    async def next_id(self) -> int:
+        return next(self._ids)
+
+    async def publish(self, channel: str, event_type: str, data: Any) -> Event:
+        event = Event(await self.next_id(), channel, event_type, data)
+        self._dispatch(event)
+        return event
+
+    def _dispatch(self, event: Event):
+        self._replay[event.channel].append(event)
+        for subscription in list(self._subscribers.get(event.channel, ())):
+            subscription.deliver(event)
+
+    def subscribe(self, channel: str, last_event_id: Optional[int] = None) -> Subscription:
+        """Events after last_event_id still in the replay buffer, then live ones"""
+        backlog = []
+        if last_event_id is not None:
+            backlog = [event for event in self._replay.get(channel, ()) if event.id > last_event_id]
+            backlog = backlog[-FEED_SUBSCRIBER_QUEUE:]
+        subscription = Subscription(self, channel, backlog)
+        self._subscribers[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+
+    def close_subscribers(self):
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.end()
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+class RedisBroker(LocalBroker):
+    """LocalBroker whose publishes go through Redis pub/sub, so every worker fans out every event
+
+    Event ids come from one Redis counter, so Last-Event-ID works against
+    whichever worker a client reconnects to (within that worker's replay buffer).
+    """
+
+    PREFIX = "homefax:feed:"
+
+    def __init__(self, url: str, replay_size: int = FEED_REPLAY_SIZE):
+        super().__init__(replay_size)
+        import redis.asyncio as redis  # optional dependency, only needed with FEED_BROKER_URL
+        self.redis = redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        self.close_subscribers()
+        if self._listener:
+            self._listener.cancel()
+        await self.redis.aclose()
+
+    async def next_id(self) -> int:
+        return int(await self.redis.incr(self.PREFIX + "last_id"))
+
+    async def publish(self, channel: str, event_type: str, data: Any) -> Event:
+        event = Event(await self.next_id(), channel, event_type, data)
+        await self.redis.publish(self.PREFIX + channel, event.to_json())
+        return event
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.psubscribe(self.PREFIX + "*")
+                async for message in pubsub.listen():
+                    if message["type"] == "pmessage":
+                        self._dispatch(Event.from_json(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Feed broker connection lost, reconnecting")
+                await asyncio.sleep(1)
+
+def create_broker() -> LocalBroker:
+    if FEED_BROKER_URL:
+        return RedisBroker(FEED_BROKER_URL)
+    return LocalBroker()
+
+feed_broker = create_broker()
+
+# End open streams as soon as the worker starts draining (clients resume
+# elsewhere with Last-Event-ID), and disconnect from the broker at shutdown
+on_drain(feed_broker.close_subscribers)
+on_shutdown(feed_broker.stop)
+
+def format_sse(event: Event) -> str:
+    return f"id: {event.id}\nevent: {event.type}\ndata: {json.dumps(event.data, default=str)}\n\n"
+
+async def sse_stream(subscription: Subscription, heartbeat: float) -> AsyncIterator[str]:
+    """text/event-stream body: events as they arrive, a comment line every heartbeat seconds"""
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await subscription.get(heartbeat)
+            except StopAsyncIteration:
+                return
+            yield ": heartbeat\n\n" if event is None else format_sse(event)
+    finally:
+        subscription.close()
@@ -0,0 +1,124 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import logging
+import os
+import time
+
+logger = logging.getLogger("homefax.sql")
+
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "true").lower() in ("1", "true", "yes")
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+SQL_EXPLAIN_SLOW_QUERIES = os.getenv("SQL_EXPLAIN_SLOW_QUERIES", "true").lower() in ("1", "true", "yes")
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SLOWEST_KEPT = 5
+
+class RequestQueryStats:
+    """Statements executed while serving one request"""
+
+    __slots__ = ("count", "total", "slowest", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+        self.statements: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total += duration
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+        if len(self.slowest) < SLOWEST_KEPT or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+    def repeated_statements(self) -> List[Tuple[str, int]]:
+        """Identical statements run often enough to look like lazy loads in a loop"""
+        return [(statement, count) for statement, count in self.statements.items()
+                if count >= SQL_N_PLUS_ONE_THRESHOLD]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total * 1000:.2f};desc="{self.count} queries"'
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("homefax_query_stats", default=None)
+
+def current_query_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    conn.info["homefax_explaining"] = True
+    try:
+        rows = conn.exec_driver_sql(prefix + statement, parameters).fetchall()
+    finally:
+        conn.info["homefax_explaining"] = False
+    return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("homefax_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["homefax_query_start"].pop()
+    if conn.info.get("homefax_explaining"):
+        return
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= SQL_SLOW_QUERY_MS:
+        plan = None
+        if SQL_EXPLAIN_SLOW_QUERIES and not executemany and statement.lstrip().upper().startswith("SELECT"):
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as e:
+                plan = f"<EXPLAIN failed: {e}>"
+        logger.warning(
+            "Slow query (%.1f ms): %s\nParameters: %r%s",
+            duration * 1000, statement, parameters, f"\nPlan:\n{plan}" if plan else ""
+        )
+
+def install_query_hooks():
+    """Time every statement on every engine (async engines run on a sync Engine underneath)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+class QueryStatsMiddleware:
+    """Per-request query count / DB time, Server-Timing header and N+1 warnings"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and stats.count:
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            for statement, count in stats.repeated_statements():
+                logger.warning(
+                    "Probable N+1: statement ran %d times in %s %s: %s",
+                    count, scope["method"], scope["path"], statement
+                )
+            if stats.count:
+                logger.debug(
+                    "%s %s: %d queries, %.1f ms in DB, slowest %s",
+                    scope["method"], scope["path"], stats.count, stats.total * 1000,
+                    [(round(duration * 1000, 2), statement) for duration, statement in stats.slowest]
+                )
@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple, Type
+
+@lru_cache(maxsize=None)
+def row_class(name: str, fields: Tuple[str, ...]):
+    """Compact row type with one slot per selected column (no per-instance __dict__)"""
+    # Generated __init__ like dataclasses: a loop of setattr() costs more than the row itself
+    args = ", ".join(f"_{i}" for i in range(len(fields)))
+    body = "".join(f"    self.{field} = _{i}\n" for i, field in enumerate(fields)) or "    pass\n"
+    namespace = {}
+    exec(f"def __init__(self, {args}):\n{body}", namespace)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{f}={getattr(self, f)!r}' for f in fields)})"
+
+    def _asdict(self):
+        return {field: getattr(self, field) for field in fields}
+
+    return type(name, (), {
+        "__slots__": fields,
+        "_fields": fields,
+        "__init__": namespace["__init__"],
+        "__repr__": __repr__,
+        "_asdict": _asdict,
+    })
+
+def response_columns(model, response_model: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+    """Table columns backing the response model's fields (or the requested subset)"""
+    names = list(fields) if fields else list(response_model.model_fields)
+    table = model.__table__
+    missing = [name for name in names if name not in table.c]
+    if missing:
+        raise ValueError(f"{response_model.__name__} fields without a {table.name} column: {missing}")
+    return [table.c[name] for name in names]
+
+def select_for(model, response_model: Type[BaseModel], fields: Optional[Sequence[str]] = None):
+    """Core select of only the columns a response needs; no ORM entities, no identity map"""
+    return select(*response_columns(model, response_model, fields))
+
+async def fetch_rows(db: AsyncSession, stmt, name: str = "Row", as_tuples: bool = False) -> List:
+    """Execute a column select and materialize slotted rows (or plain tuples)"""
+    result = await db.execute(stmt)
+    if as_tuples:
+        return [tuple(row) for row in result]
+    cls = row_class(name, tuple(result.keys()))
+    return [cls(*row) for row in result]
+
+async def fetch_page(db: AsyncSession, model, response_model: Type[BaseModel], *where,
+                     fields: Optional[Sequence[str]] = None, order_by=None, skip: int = 0,
+                     limit: int = 100, as_tuples: bool = False) -> List:
+    """One page of a list endpoint through the Core read path"""
+    stmt = select_for(model, response_model, fields).where(*where)
+    stmt = stmt.order_by(*(order_by if order_by is not None else model.__table__.primary_key.columns))
+    return await fetch_rows(db, stmt.offset(skip).limit(limit), f"{model.__name__}Row", as_tuples)
@@ -0,0 +1,97 @@
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+import math
+
+from utils.geo import BBox, bbox_around, bboxes_intersect, geometry_bbox, geometry_distance_m
+
+# ~1.1 km cells; a few-hundred-meter radius query touches at most 4-9 of them
+DEFAULT_CELL_DEGREES = 0.01
+# Geometries spanning more cells than this (a long road, a whole district)
+# are kept in a short list that every query checks by bbox instead
+MAX_CELLS_PER_ITEM = 256
+
+class GridIndex:
+    """Uniform lon/lat grid over geometry bounding boxes, with exact distance on candidates"""
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = defaultdict(set)
+        self._items: Dict[Hashable, Tuple[BBox, dict, Any, List[Tuple[int, int]]]] = {}
+        self._oversized: Set[Hashable] = set()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def _cell_range(self, bbox: BBox):
+        size = self.cell_degrees
+        return (
+            range(math.floor(bbox[0] / size), math.floor(bbox[2] / size) + 1),
+            range(math.floor(bbox[1] / size), math.floor(bbox[3] / size) + 1),
+        )
+
+    def insert(self, key: Hashable, geometry: dict, payload: Any = None):
+        """Add or replace the geometry stored under key"""
+        if key in self._items:
+            self.remove(key)
+        bbox = geometry_bbox(geometry)
+        xs, ys = self._cell_range(bbox)
+        cells = []
+        if len(xs) * len(ys) > MAX_CELLS_PER_ITEM:
+            self._oversized.add(key)
+        else:
+            cells = [(x, y) for x in xs for y in ys]
+            for cell in cells:
+                self._cells[cell].add(key)
+        self._items[key] = (bbox, geometry, payload, cells)
+
+    def remove(self, key: Hashable):
+        item = self._items.pop(key, None)
+        if item is None:
+            return
+        self._oversized.discard(key)
+        for cell in item[3]:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def query_bbox(self, bbox: BBox) -> Set[Hashable]:
+        """Keys whose bounding box intersects bbox"""
+        xs, ys = self._cell_range(bbox)
+        candidates: Set[Hashable] = set()
+        if len(xs) * len(ys) > len(self._cells):
+            # Huge query window: cheaper to scan occupied cells than to enumerate the window
+            for (x, y), keys in self._cells.items():
+                if x in xs and y in ys:
+                    candidates |= keys
+        else:
+            for x in xs:
+                for y in ys:
+                    keys = self._cells.get((x, y))
+                    if keys:
+                        candidates |= keys
+        candidates |= self._oversized
+        return {key for key in candidates if bboxes_intersect(self._items[key][0], bbox)}
+
+    def nearby(self, lon: float, lat: float, radius_m: float,
+               limit: Optional[int] = None) -> List[Tuple[Hashable, Any, float]]:
+        """(key, payload, distance_m) within radius_m of the point, nearest first"""
+        results = []
+        for key in self.query_bbox(bbox_around(lon, lat, radius_m)):
+            _, geometry, payload, _ = self._items[key]
+            distance = geometry_distance_m(geometry, lon, lat)
+            if distance <= radius_m:
+                results.append((key, payload, distance))
+        results.sort(key=lambda item: item[2])
+        return results[:limit] if limit else results
+
+    def rebuild(self, items: Iterable[Tuple[Hashable, dict, Any]]):
+        self._cells.clear()
+        self._items.clear()
+        self._oversized.clear()
+        for key, geometry, payload in items:
+            self.insert(key, geometry, payload)